@@ -0,0 +1,250 @@
+"""Word timestamps for Kokoro TTS Local
+
+Timings come from the durations the model predicts for every phoneme, so no
+separate forced-alignment pass is needed. English pipelines already attach
+start/end times to each word token; for other languages the phoneme
+durations are summed per space-separated word.
+
+Example:
+    audio, alignment = generate_speech_with_alignment(model, text, "af_bella")
+    alignment.save("output.wav")  # writes output.json, output.srt, output.vtt
+"""
+
+import json
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 24000
+# Each predicted duration frame covers 600 samples at 24 kHz
+SAMPLES_PER_FRAME = 600
+
+
+def _phoneme_word_timings(phonemes: str, pred_dur, vocab: Dict[str, int]):
+    """Sum per-phoneme durations into (start, end) seconds per word"""
+    durations = np.asarray(pred_dur, dtype=np.float64).reshape(-1)
+    # The model sees only phonemes in its vocab, wrapped in start/end tokens
+    kept = [p for p in phonemes if p in vocab]
+    if len(durations) != len(kept) + 2:
+        return []
+    # times[i] is where phoneme i starts; times[-1] is where the last one ends
+    times = np.cumsum(durations)[:-1] * SAMPLES_PER_FRAME / SAMPLE_RATE
+
+    words = []
+    start = None
+    for i, p in enumerate(kept):
+        if p == " ":
+            if start is not None:
+                words.append((start, times[i]))
+                start = None
+        elif start is None:
+            start = times[i]
+    if start is not None:
+        words.append((start, times[len(kept)]))
+    return words
+
+
+class Alignment:
+    """Word and segment timings for one clip, stored as parallel arrays
+
+    Times are in seconds from the start of the clip, kept in compact
+    ``array`` buffers that grow in place; the properties return numpy copies,
+    so the buffers can keep growing while callers hold them.
+    """
+
+    def __init__(self):
+        self.words: List[str] = []
+        self.segments: List[str] = []
+        self.phonemes: List[str] = []
+        self._word_segments = array("i")
+        self._starts = array("f")
+        self._ends = array("f")
+        self._segment_starts = array("f")
+        self._segment_ends = array("f")
+        self.duration = 0.0
+
+    @property
+    def word_segments(self) -> np.ndarray:
+        return np.array(self._word_segments, dtype=np.int32)
+
+    @property
+    def starts(self) -> np.ndarray:
+        return np.array(self._starts, dtype=np.float32)
+
+    @property
+    def ends(self) -> np.ndarray:
+        return np.array(self._ends, dtype=np.float32)
+
+    @property
+    def segment_starts(self) -> np.ndarray:
+        return np.array(self._segment_starts, dtype=np.float32)
+
+    @property
+    def segment_ends(self) -> np.ndarray:
+        return np.array(self._segment_ends, dtype=np.float32)
+
+    def _add_word(self, word: str, segment: int, start: float, end: float):
+        self.words.append(word)
+        self._word_segments.append(segment)
+        self._starts.append(start)
+        self._ends.append(end)
+
+    def add_segment(
+        self,
+        graphemes: str,
+        phonemes: str,
+        n_samples: int,
+        tokens: Optional[Sequence] = None,
+        pred_dur=None,
+        vocab: Optional[Dict[str, int]] = None,
+    ):
+        """Append a synthesized segment and its word timings"""
+        offset = self.duration
+        index = len(self.segments)
+        self.segments.append(graphemes)
+        self.phonemes.append(phonemes)
+        self.duration = offset + n_samples / SAMPLE_RATE
+        self._segment_starts.append(offset)
+        self._segment_ends.append(self.duration)
+
+        if tokens:
+            for token in tokens:
+                if token.start_ts is None or token.end_ts is None:
+                    continue
+                self._add_word(
+                    token.text, index, offset + token.start_ts, offset + token.end_ts
+                )
+        elif pred_dur is not None and vocab:
+            timings = _phoneme_word_timings(phonemes, pred_dur, vocab)
+            labels = graphemes.split()
+            if len(labels) != len(timings):
+                labels = phonemes.split()
+            for label, (start, end) in zip(labels, timings):
+                self._add_word(label, index, offset + start, offset + end)
+
+    def retimed(
+        self, layout: Sequence[Optional[Tuple[int, int, int]]], sample_rate: int
+    ) -> "Alignment":
+        """Map timings onto post-processed audio
+
+        Args:
+            layout: Per segment, (trim_start, trim_end, output_start) in
+                samples at sample_rate as recorded by PostProcessor, or None
+                for a segment that was dropped
+            sample_rate: Rate of the layout (the post-processor's input rate)
+        """
+        aligned = Alignment()
+        starts, ends = self.segment_starts, self.segment_ends
+        word_segments = self.word_segments
+        word_starts, word_ends = self.starts, self.ends
+        for index, placement in enumerate(layout):
+            if placement is None:
+                continue
+            trim_start, trim_end, out_start = (x / sample_rate for x in placement)
+            offset = float(starts[index])
+            kept = trim_end - trim_start
+
+            def place(t: float) -> float:
+                local = min(max(t - offset - trim_start, 0.0), kept)
+                return out_start + local
+
+            new_index = len(aligned.segments)
+            aligned.segments.append(self.segments[index])
+            aligned.phonemes.append(self.phonemes[index])
+            aligned._segment_starts.append(out_start)
+            aligned._segment_ends.append(out_start + kept)
+            aligned.duration = max(aligned.duration, out_start + kept)
+            for w in np.flatnonzero(word_segments == index):
+                start, end = place(word_starts[w]), place(word_ends[w])
+                if end > start:
+                    aligned._add_word(self.words[w], new_index, start, end)
+        return aligned
+
+    def to_dict(self) -> Dict:
+        return {
+            "duration": round(self.duration, 3),
+            "segments": [
+                {
+                    "text": text,
+                    "phonemes": ps,
+                    "start": round(float(s), 3),
+                    "end": round(float(e), 3),
+                }
+                for text, ps, s, e in zip(
+                    self.segments,
+                    self.phonemes,
+                    self.segment_starts,
+                    self.segment_ends,
+                )
+            ],
+            "words": [
+                {
+                    "word": word,
+                    "start": round(float(s), 3),
+                    "end": round(float(e), 3),
+                    "segment": seg,
+                }
+                for word, s, e, seg in zip(
+                    self.words, self.starts, self.ends, self.word_segments
+                )
+            ],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def _cues(self, max_chars: int = 42):
+        """Group words into caption cues, never crossing a segment boundary"""
+        cues = []
+        words: List[str] = []
+        start = end = 0.0
+        segment = -1
+        for word, s, e, seg in zip(
+            self.words, self.starts, self.ends, self.word_segments
+        ):
+            too_long = len(" ".join(words + [word])) > max_chars
+            if words and (seg != segment or too_long):
+                cues.append((start, end, " ".join(words)))
+                words = []
+            if not words:
+                start = float(s)
+            words.append(word)
+            end = float(e)
+            segment = seg
+        if words:
+            cues.append((start, end, " ".join(words)))
+        return cues
+
+    def to_srt(self, max_chars: int = 42) -> str:
+        lines = []
+        for i, (start, end, text) in enumerate(self._cues(max_chars), 1):
+            lines += [str(i), f"{_timestamp(start, ',')} --> {_timestamp(end, ',')}"]
+            lines += [text, ""]
+        return "\n".join(lines)
+
+    def to_vtt(self, max_chars: int = 42) -> str:
+        lines = ["WEBVTT", ""]
+        for start, end, text in self._cues(max_chars):
+            lines += [f"{_timestamp(start, '.')} --> {_timestamp(end, '.')}"]
+            lines += [text, ""]
+        return "\n".join(lines)
+
+    def save(self, audio_path, formats: Sequence[str] = ("json", "srt", "vtt")):
+        """Write timing files next to an audio file, returning their paths"""
+        writers = {"json": self.to_json, "srt": self.to_srt, "vtt": self.to_vtt}
+        paths = []
+        for fmt in formats:
+            path = Path(audio_path).with_suffix(f".{fmt}")
+            path.write_text(writers[fmt](), encoding="utf-8")
+            paths.append(path)
+        return paths
+
+
+def _timestamp(seconds: float, separator: str) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
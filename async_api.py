@@ -0,0 +1,199 @@
+"""Asyncio API for Kokoro TTS Local
+
+Inference runs on a managed thread pool; results are handed to the event loop
+through a bounded asyncio.Queue. When the consumer falls behind, the worker
+blocks after max_buffered segments instead of synthesizing ahead. When the
+consumer stops (task cancelled, async for abandoned, aclose()) or the
+request's CancelToken fires, the worker stops at the next segment boundary.
+A worker blocked on the queue holds no pipeline, since pipelines are only
+checked out while a chunk is being synthesized.
+
+Example:
+    tts = AsyncSynthesizer(voice="af_bella")
+    audio = await tts.synthesize("Hello there.")
+    async for chunk in tts.stream("First line.\\nSecond line."):
+        ...
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import AsyncIterator, Optional
+
+import numpy as np
+
+from cancellation import CancelToken
+from models import MAX_CONCURRENCY
+from synthesizer import Synthesizer
+
+# How often a blocked worker rechecks whether its consumer went away
+POLL_INTERVAL = 0.1
+
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Return the shared inference thread pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Pipelines are checked out per chunk, so workers blocked on slow
+            # consumers hold a thread but no pipeline; allow a few spare threads
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=MAX_CONCURRENCY + 4, thread_name_prefix="kokoro-async"
+            )
+        return _executor
+
+
+def shutdown_executor(wait: bool = True):
+    """Shut the shared thread pool down; it is recreated on next use"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+class AsyncSynthesizer:
+    """Awaitable counterpart of Synthesizer
+
+    Takes the same arguments as Synthesizer, plus max_buffered (segments the
+    worker may run ahead of the consumer) and an optional executor.
+    """
+
+    def __init__(
+        self,
+        *args,
+        max_buffered: int = 2,
+        executor: Optional[concurrent.futures.Executor] = None,
+        **kwargs,
+    ):
+        self.synthesizer = Synthesizer(*args, **kwargs)
+        self.max_buffered = max_buffered
+        self._executor = executor
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        return self._executor or get_executor()
+
+    @property
+    def sample_rate(self) -> int:
+        return self.synthesizer.sample_rate
+
+    async def load(self) -> "AsyncSynthesizer":
+        """Load the model without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.synthesizer.load)
+        return self
+
+    def _produce(self, text, voice, speed, queue, loop, token, gone):
+        """Worker thread: push segments into the queue until done or stopped
+
+        token stops synthesis between segments; gone is set once the consumer
+        has left, after which nothing more is queued.
+        """
+
+        def put(item) -> bool:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=POLL_INTERVAL)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if gone.is_set():
+                        future.cancel()
+                        return False
+
+        segments = self.synthesizer.stream(text, voice, speed, token)
+        try:
+            for chunk in segments:
+                if not put(chunk):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(_Failure(e))
+        finally:
+            segments.close()
+
+    async def stream(
+        self,
+        text: str,
+        voice: Optional[str] = None,
+        speed: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> AsyncIterator[np.ndarray]:
+        """Yield float32 audio chunks as each segment is synthesized
+
+        Raises Cancelled if cancel fires before the stream finishes.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.max_buffered))
+        token = cancel.child() if cancel is not None else CancelToken()
+        gone = threading.Event()
+        loop.run_in_executor(
+            self.executor, self._produce, text, voice, speed, queue, loop, token, gone
+        )
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            gone.set()
+            token.cancel("consumer stopped")
+
+    async def synthesize(
+        self,
+        text: str,
+        voice: Optional[str] = None,
+        speed: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> np.ndarray:
+        """Return float32 audio for the whole text"""
+        segments = [chunk async for chunk in self.stream(text, voice, speed, cancel)]
+        if not segments:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(segments)
+
+
+_default: Optional[AsyncSynthesizer] = None
+
+
+def _get_default() -> AsyncSynthesizer:
+    global _default
+    if _default is None:
+        _default = AsyncSynthesizer()
+    return _default
+
+
+async def synthesize(
+    text: str,
+    voice: Optional[str] = None,
+    speed: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
+) -> np.ndarray:
+    """Synthesize text with a shared AsyncSynthesizer"""
+    return await _get_default().synthesize(text, voice, speed, cancel)
+
+
+async def stream(
+    text: str,
+    voice: Optional[str] = None,
+    speed: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
+) -> AsyncIterator[np.ndarray]:
+    """Stream segments of text with a shared AsyncSynthesizer"""
+    async for chunk in _get_default().stream(text, voice, speed, cancel):
+        yield chunk
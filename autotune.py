@@ -0,0 +1,182 @@
+"""Torch CPU thread tuning for Kokoro TTS Local
+
+torch's default intra-op thread count is one per core for every thread that
+runs inference, so several concurrent requests oversubscribe the CPU, while a
+count picked for concurrent use leaves cores idle for single long jobs. At
+warmup the auto mode times a fixed forward pass at the configured
+concurrency for a few thread counts and keeps the fastest. The result is
+persisted per host, torch version and concurrency level, so later startups
+apply it without measuring.
+
+Settings accepted by configure_threads (and build_model's ``threads``):
+    None      leave torch's defaults alone
+    "auto"    tune, or reuse the persisted result
+    int       use exactly this many intra-op threads
+Set KOKORO_THREADS to choose the default for every entry point.
+"""
+
+import json
+import logging
+import os
+import platform
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import torch
+
+# Kept next to this module, so the result does not depend on the working directory
+TUNING_FILE = Path(__file__).resolve().with_name("thread_tuning.json")
+DEFAULT_THREADS = os.environ.get("KOKORO_THREADS") or None
+ROUNDS = 3
+
+ThreadSetting = Union[None, int, str]
+
+
+def host_key(concurrency: int) -> str:
+    """Identify the host and workload a tuning result applies to"""
+    return (
+        f"{platform.node()}|{platform.machine()}|cpus={os.cpu_count()}"
+        f"|torch={torch.__version__}|concurrency={concurrency}"
+    )
+
+
+def candidate_threads(concurrency: int) -> List[int]:
+    """Intra-op thread counts worth trying for a concurrency level"""
+    cores = os.cpu_count() or 1
+    share = max(1, cores // max(1, concurrency))
+    candidates = {1, share, max(1, share // 2), min(cores, share * 2)}
+    candidates |= {n for n in (2, 4, 8) if n < share}
+    return sorted(candidates)
+
+
+def default_interop(concurrency: int) -> int:
+    """Inter-op threads: requests already run in parallel, so keep it small"""
+    return 1 if concurrency > 1 else min(2, os.cpu_count() or 1)
+
+
+def apply_threads(threads: int, interop: Optional[int] = None):
+    """Set torch's intra-op (and, if still possible, inter-op) thread counts"""
+    torch.set_num_threads(max(1, int(threads)))
+    if interop is not None:
+        try:
+            torch.set_num_interop_threads(max(1, int(interop)))
+        except RuntimeError:
+            # Only allowed before inter-op work has started in this process
+            logging.debug("Inter-op threads already fixed for this process")
+
+
+def measure(run: Callable[[], None], concurrency: int, rounds: int = ROUNDS) -> float:
+    """Return runs per second with ``concurrency`` threads calling run"""
+    barrier = threading.Barrier(concurrency + 1)
+    errors: List[BaseException] = []
+
+    def worker():
+        barrier.wait()
+        try:
+            with torch.inference_mode():
+                for _ in range(rounds):
+                    run()
+        except BaseException as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return concurrency * rounds / elapsed
+
+
+def _load(path: Path) -> Dict[str, Dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(path: Path, key: str, result: Dict):
+    results = _load(path)
+    results[key] = result
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def tune_threads(
+    run: Callable[[], None],
+    concurrency: int = 1,
+    path=TUNING_FILE,
+    force: bool = False,
+) -> Tuple[int, int]:
+    """Pick the fastest intra-op thread count and persist it
+
+    Args:
+        run: One representative inference call
+        concurrency: Number of requests expected to run at once
+        path: JSON file holding results per host_key
+        force: Measure even if a persisted result exists
+
+    Returns:
+        (intra-op threads, inter-op threads)
+    """
+    path = Path(path)
+    key = host_key(concurrency)
+    saved = _load(path).get(key)
+    if saved and not force:
+        return saved["threads"], saved["interop"]
+
+    interop = default_interop(concurrency)
+    original = torch.get_num_threads()
+    timings = {}
+    try:
+        run()  # first call pays one-off allocation costs
+        for threads in candidate_threads(concurrency):
+            torch.set_num_threads(threads)
+            timings[threads] = measure(run, concurrency)
+            logging.debug(f"{threads} threads: {timings[threads]:.2f} runs/s")
+    finally:
+        torch.set_num_threads(original)
+    best = max(timings, key=timings.get)
+    _save(
+        path,
+        key,
+        {
+            "threads": best,
+            "interop": interop,
+            "runs_per_second": {str(k): round(v, 3) for k, v in timings.items()},
+        },
+    )
+    logging.info(f"Thread tuning for concurrency {concurrency}: {best} threads")
+    return best, interop
+
+
+def configure_threads(
+    setting: ThreadSetting,
+    run: Optional[Callable[[], None]] = None,
+    concurrency: int = 1,
+    path=TUNING_FILE,
+) -> Optional[int]:
+    """Apply a thread setting, tuning with run when it is "auto"
+
+    Returns the intra-op thread count in effect, or None if left at default.
+    """
+    if setting is None or setting == "":
+        return None
+    if isinstance(setting, str) and setting.lower() != "auto":
+        setting = int(setting)
+    if isinstance(setting, int):
+        apply_threads(setting, default_interop(concurrency))
+        return setting
+    if run is None:
+        logging.debug("No warmup run available; leaving torch threads at default")
+        return None
+    threads, interop = tune_threads(run, concurrency, path)
+    apply_threads(threads, interop)
+    return threads
@@ -0,0 +1,121 @@
+"""Cancellation tokens and deadlines for Kokoro TTS Local
+
+A CancelToken is passed along with a request and checked between segments,
+so a cancelled or overdue request stops after at most one more segment.
+Tokens can be chained: a child is cancelled whenever its parent is.
+
+Example:
+    token = CancelToken(timeout=30)
+    with cancel_on_interrupt(token):  # Ctrl-C cancels instead of killing
+        audio, ps, gs = generate_speech(model, text, voice, cancel=token)
+"""
+
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class Cancelled(Exception):
+    """Raised when work stops because its token was cancelled"""
+
+
+class DeadlineExceeded(Cancelled):
+    """Raised when work stops because its token's deadline passed"""
+
+
+class CancelToken:
+    """Thread-safe cancellation flag with an optional deadline
+
+    Args:
+        timeout: Seconds from now after which the token counts as cancelled
+        deadline: Absolute time.monotonic() deadline (overrides timeout)
+        parent: Token whose cancellation also cancels this one
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        parent: Optional["CancelToken"] = None,
+    ):
+        if deadline is None and timeout is not None:
+            deadline = time.monotonic() + timeout
+        self.deadline = deadline
+        self.parent = parent
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def cancelled(self) -> bool:
+        return (
+            self._event.is_set()
+            or self.expired
+            or (self.parent is not None and self.parent.cancelled)
+        )
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without one"""
+        deadlines = [t.deadline for t in self._chain() if t.deadline is not None]
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def check(self):
+        """Raise Cancelled (or DeadlineExceeded) if the token is cancelled"""
+        for token in self._chain():
+            if token._event.is_set():
+                raise Cancelled(token.reason)
+            if token.expired:
+                raise DeadlineExceeded("deadline exceeded")
+
+    def child(self, timeout: Optional[float] = None) -> "CancelToken":
+        """Return a token cancelled along with this one"""
+        return CancelToken(timeout=timeout, parent=self)
+
+    def _chain(self):
+        token = self
+        while token is not None:
+            yield token
+            token = token.parent
+
+
+def check(token: Optional[CancelToken]):
+    """Check a token that may be None"""
+    if token is not None:
+        token.check()
+
+
+@contextmanager
+def cancel_on_interrupt(token: CancelToken):
+    """Turn Ctrl-C into cancelling token while the block runs
+
+    A second Ctrl-C raises KeyboardInterrupt as usual. Only takes effect in
+    the main thread, where signal handlers can be installed.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield token
+        return
+
+    previous = signal.getsignal(signal.SIGINT)
+
+    def handler(signum, frame):
+        if token.cancelled:
+            signal.default_int_handler(signum, frame)
+        token.cancel("interrupted")
+
+    signal.signal(signal.SIGINT, handler)
+    try:
+        yield token
+    finally:
+        signal.signal(signal.SIGINT, previous)
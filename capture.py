@@ -0,0 +1,107 @@
+"""Thread-scoped stdout/stderr capture for Kokoro TTS Local
+
+Model initialization prints download progress and library warnings. Rather
+than pointing ``sys.stdout``/``sys.stderr`` at ``os.devnull`` for the whole
+process, the streams are wrapped once by a router that sends writes from a
+capturing thread into an in-memory buffer and passes everything else through.
+No file descriptors are opened, and other threads keep their output.
+"""
+
+import io
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+
+_local = threading.local()
+_install_lock = threading.Lock()
+
+
+class _ThreadRouter:
+    """Stream proxy that redirects writes from capturing threads"""
+
+    def __init__(self, original):
+        self._original = original
+
+    def _target(self):
+        buffers = getattr(_local, "buffers", None)
+        return buffers[-1] if buffers else self._original
+
+    def write(self, s):
+        return self._target().write(s)
+
+    def writelines(self, lines):
+        return self._target().writelines(lines)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        # fileno, encoding, isatty, ... come from the real stream
+        return getattr(self._original, name)
+
+
+class _ThreadRecordHandler(logging.Handler):
+    """Collect log records emitted by one thread without consuming them"""
+
+    def __init__(self, thread_id: int, records: List[logging.LogRecord]):
+        super().__init__(logging.NOTSET)
+        self.thread_id = thread_id
+        self.records = records
+
+    def emit(self, record):
+        if record.thread == self.thread_id:
+            self.records.append(record)
+
+
+class CapturedOutput:
+    """Output and log records captured inside a capture_output block"""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.records: List[logging.LogRecord] = []
+
+    @property
+    def text(self) -> str:
+        return self.buffer.getvalue()
+
+
+def _install():
+    """Wrap sys.stdout and sys.stderr with thread routers (idempotent)"""
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadRouter):
+            sys.stdout = _ThreadRouter(sys.stdout)
+        if not isinstance(sys.stderr, _ThreadRouter):
+            sys.stderr = _ThreadRouter(sys.stderr)
+
+
+@contextmanager
+def capture_output(enabled: bool = True) -> Iterator[CapturedOutput]:
+    """Capture stdout/stderr written by the current thread
+
+    Log records emitted by the thread are still handled normally and are
+    also collected on the returned object. Captured text is re-emitted at
+    debug level when the block exits, so nothing is lost.
+
+    Args:
+        enabled: If False, output passes through and nothing is captured
+    """
+    captured = CapturedOutput()
+    if not enabled:
+        yield captured
+        return
+
+    _install()
+    buffers = _local.__dict__.setdefault("buffers", [])
+    buffers.append(captured.buffer)
+    handler = _ThreadRecordHandler(threading.get_ident(), captured.records)
+    root = logging.getLogger()
+    root.addHandler(handler)
+    try:
+        yield captured
+    finally:
+        root.removeHandler(handler)
+        buffers.pop()
+        if captured.text.strip():
+            logging.debug(f"Captured output:\n{captured.text.rstrip()}")
@@ -1,12 +1,23 @@
-from models import build_model, generate_speech, list_available_voices
+from models import (
+    build_model,
+    generate_speech,
+    generate_speech_with_alignment,
+    list_available_voices,
+)
 from pathlib import Path
 from view.abstract import AbstractView
 from view.lib import NoView
 from view.cli import CLIView
+from autotune import DEFAULT_THREADS, ThreadSetting
+from cancellation import CancelToken, Cancelled, cancel_on_interrupt
+from capture import capture_output
+from postprocess import PostProcessor
+from markup import is_markup, parse_markup, render_plan
+from incremental import regenerate
+from typing import Optional
+import numpy as np
 import torch
 import logging
-import sys
-import os
 
 SAMPLE_RATE = 24000
 DEFAULT_MODEL_PATH = "kokoro-v1_0.pth"
@@ -23,14 +34,40 @@ class Controller:
         speed: float = 1.0,
         output_file: str = DEFAULT_OUTPUT_FILE,
         text: str = DEFAULT_TEXT,
+        compiled: bool = False,
+        sample_rate: int = SAMPLE_RATE,
+        postprocessor: Optional[PostProcessor] = None,
+        stretch: bool = False,
+        timestamps: bool = False,
+        timeout: Optional[float] = None,
+        threads: ThreadSetting = DEFAULT_THREADS,
+        incremental: bool = False,
     ):
         self.OUTPUT = output_file
         self.view = view
         self.text = text
         self.speed = speed
         self.debug = debug
+        self.compiled = compiled
+        self.stretch = stretch
+        # Write word timings (.json/.srt/.vtt) next to the output file; they
+        # follow post-processing, but stretched audio has no model durations
+        if timestamps and stretch:
+            raise ValueError("timestamps cannot be combined with stretch")
+        self.timestamps = timestamps
+        # Give up on a generation after this many seconds (None waits forever)
+        self.timeout = timeout
+        # Torch CPU threads: None (default), an int, or "auto" to tune at load
+        self.threads = threads
+        # Re-synthesize only the sentences that changed since the last run
+        self.incremental = incremental
+        # Resampling only by default; pass a PostProcessor to trim, normalize, etc.
+        self.postprocessor = postprocessor or PostProcessor(
+            SAMPLE_RATE, sample_rate, trim=False
+        )
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.model = None
+        self.cancel: Optional[CancelToken] = None
         self.voices = []
         self.choices = {
             "list": self.handle_list_voices,
@@ -40,14 +77,14 @@ class Controller:
         }
 
     def __init_model__(self):
-        logging.debug(f"Building model to {self.OUTPUT}")
-        if not self.debug:
-            sys.stdout = open(os.devnull, "w")
-            sys.stderr = open(os.devnull, "w")
-        model = build_model(self.OUTPUT, self.device)
-        if not self.debug:
-            sys.stdout = sys.__stdout__
-            sys.stderr = sys.__stderr__
+        logging.debug(f"Building model from {DEFAULT_MODEL_PATH}")
+        with capture_output(enabled=not self.debug):
+            model = build_model(
+                DEFAULT_MODEL_PATH,
+                self.device,
+                compiled=self.compiled,
+                threads=self.threads,
+            )
         if not model:
             logging.error("Failed to initialize model")
             raise (KeyboardInterrupt)
@@ -72,24 +109,106 @@ class Controller:
         )
         if text != "":
             self.text = text
-        # Generate speech
-        all_audio, ps, gs = generate_speech(
-            self.model, self.text, self.voice, self.speed
-        )
+        # Generate speech; Ctrl-C or the timeout stops at the next segment
+        alignment = manifest = final_audio = None
+        self.cancel = CancelToken(timeout=self.timeout)
+        try:
+            with cancel_on_interrupt(self.cancel):
+                if is_markup(self.text):
+                    all_audio, ps, gs = self._generate_from_markup()
+                elif self.timestamps:
+                    all_audio, alignment = self._generate_with_alignment()
+                    if alignment and alignment.segments:
+                        ps, gs = alignment.phonemes[0], alignment.segments[0]
+                    else:
+                        ps = gs = None
+                elif self.incremental:
+                    final_audio, manifest = self._generate_incremental()
+                    all_audio, ps, gs = None, None, self.text
+                else:
+                    all_audio, ps, gs = generate_speech(
+                        self.model,
+                        self.text,
+                        self.voice,
+                        self.device,
+                        self.speed,
+                        stretch=self.stretch,
+                        cancel=self.cancel,
+                    )
+        except Cancelled as e:
+            logging.info(f"Generation stopped: {e}")
+            all_audio = None
 
         # Save audio
         if all_audio:
-            final_audio = torch.cat(all_audio, dim=0)
+            layout = [] if alignment is not None else None
+            final_audio = self.postprocessor((a.numpy() for a in all_audio), layout)
+            if alignment is not None:
+                # Follow trimming, gaps and crossfades into the output file
+                alignment = alignment.retimed(layout, self.postprocessor.in_rate)
+        if final_audio is not None and len(final_audio):
+            sample_rate = self.postprocessor.out_rate
             self.view.show_generated_segment(gs, ps)
             if self.view.prompt_play_audio() and not quiet:
-                self.view.play_audio(final_audio, SAMPLE_RATE)
+                self.view.play_audio(final_audio, sample_rate)
             output_path = Path(self.OUTPUT)
-            self.view.save_audio_with_retry(
-                final_audio.numpy(), SAMPLE_RATE, output_path
-            )
+            self.view.save_audio_with_retry(final_audio, sample_rate, output_path)
+            if alignment is not None:
+                alignment.save(output_path)
+            if manifest is not None:
+                manifest.save(output_path)
         else:
             self.view.show_no_audio_generated()
 
+    def _generate_from_markup(self):
+        try:
+            plan = parse_markup(self.text, self.voice, self.speed)
+            chunks = list(render_plan(self.model, plan, self.device, self.cancel))
+        except Cancelled:
+            raise
+        except Exception as e:
+            logging.debug(f"Error generating speech from markup: {e}")
+            return None, None, None
+        if not chunks:
+            return None, None, None
+        # One continuous segment, so post-processing keeps the breaks intact
+        text = " ".join(entry.text for entry in plan if hasattr(entry, "text"))
+        return [torch.from_numpy(np.concatenate(chunks))], None, text
+
+    def _generate_with_alignment(self):
+        try:
+            return generate_speech_with_alignment(
+                self.model, self.text, self.voice, self.device, self.speed, self.cancel
+            )
+        except Cancelled:
+            raise
+        except Exception as e:
+            logging.debug(f"Error generating speech: {e}")
+            return None, None
+
+    def _generate_incremental(self):
+        try:
+            audio, manifest, synthesized = regenerate(
+                self.model,
+                self.text,
+                self.voice,
+                self.device,
+                self.speed,
+                self.OUTPUT,
+                self.postprocessor,
+                self.stretch,
+                self.cancel,
+            )
+        except Cancelled:
+            raise
+        except Exception as e:
+            logging.debug(f"Error generating speech incrementally: {e}")
+            return None, None
+        logging.info(
+            f"Re-synthesized {synthesized} of {len(manifest.texts)} segments"
+        )
+        return audio, manifest
+
     def handle_list_voices(self):
         return self.view.show_available_voices(self.voices)
 
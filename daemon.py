@@ -0,0 +1,319 @@
+"""Persistent synthesis daemon for Kokoro TTS Local
+
+Loads the model and voices once, warms the pipeline up, then serves
+requests from tts_client.py over a Unix domain socket, streaming each
+segment back as soon as it is synthesized. Requests run concurrently up to
+the pipeline pool size (KOKORO_MAX_CONCURRENCY); a client that disconnects
+cancels its request at the next segment boundary.
+
+With --stub no model is loaded: each segment sleeps in proportion to its
+length and returns silence, so the serving path can be load-tested (see
+loadtest.py) without weights, torch or a GPU.
+
+Usage:
+    python daemon.py [--socket PATH] [--voice af_bella] [--preload bm_george ...]
+    python daemon.py --stub [--stub-seconds-per-char 0.002]
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+from contextlib import closing
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from cancellation import CancelToken, check
+from capture import capture_output
+from limits import iter_chunks
+from tts_client import DEFAULT_SOCKET, ERROR_FRAME, FRAME, MAX_REQUEST, write_frame
+
+SAMPLE_RATE = 24000
+DEFAULT_MODEL_PATH = "kokoro-v1_0.pth"
+DEFAULT_VOICE = "af_bella"
+WARMUP_TEXT = "Warming up."
+ENCODINGS = ("pcm16", "f32")
+MAX_CONCURRENCY = int(os.environ.get("KOKORO_MAX_CONCURRENCY", "1"))
+
+# Stub timing: about 15 characters of speech per second of audio, and a
+# compute cost in the range of a CPU forward pass
+STUB_SECONDS_PER_CHAR = 0.002
+STUB_CHARS_PER_AUDIO_SECOND = 15
+STUB_VOICES = ["af_bella", "af_heart", "am_adam", "bf_emma", "bm_george"]
+
+
+def encode(audio: np.ndarray, encoding: str) -> bytes:
+    if encoding == "pcm16":
+        return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    return np.asarray(audio, dtype="<f4").tobytes()
+
+
+class ModelBackend:
+    """Synthesis with the Kokoro model, loaded and warmed up once"""
+
+    def __init__(
+        self,
+        model_path: str = DEFAULT_MODEL_PATH,
+        voices: Optional[List[str]] = None,
+        threads=None,
+    ):
+        # Imported here so that --stub runs without torch or kokoro installed
+        import torch
+
+        import models
+        from autotune import DEFAULT_THREADS
+
+        self._models = models
+        self.sample_rate = models.SAMPLE_RATE
+        self.concurrency = models.MAX_CONCURRENCY
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        threads = DEFAULT_THREADS if threads is None else threads
+        self.model = models.build_model(model_path, self.device, threads=threads)
+        voices = voices or [DEFAULT_VOICE]
+        models.preload_voices(self.model, voices, self.device)
+        # One synthesis initializes G2P and any lazily built kernels
+        for _ in self.stream(WARMUP_TEXT, voices[0], prompts=False):
+            pass
+
+    def voices(self) -> List[str]:
+        return self._models.list_available_voices()
+
+    def stream(
+        self,
+        text: str,
+        voice: str,
+        speed: float = 1.0,
+        cancel: Optional[CancelToken] = None,
+        prompts: bool = True,
+    ) -> Iterator[np.ndarray]:
+        segments = self._models.stream_speech(
+            self.model, text, voice, self.device, speed, prompts=prompts, cancel=cancel
+        )
+        with closing(segments):
+            for _, _, audio in segments:
+                yield audio.numpy()
+
+
+class StubBackend:
+    """Stand-in for the model that sleeps per segment and returns silence"""
+
+    device = "stub"
+    sample_rate = SAMPLE_RATE
+
+    def __init__(
+        self,
+        seconds_per_char: float = STUB_SECONDS_PER_CHAR,
+        concurrency: int = MAX_CONCURRENCY,
+    ):
+        self.seconds_per_char = seconds_per_char
+        self.concurrency = concurrency
+
+    def voices(self) -> List[str]:
+        return STUB_VOICES
+
+    def stream(
+        self,
+        text: str,
+        voice: str,
+        speed: float = 1.0,
+        cancel: Optional[CancelToken] = None,
+    ) -> Iterator[np.ndarray]:
+        for chunk in iter_chunks(text):
+            check(cancel)
+            time.sleep(len(chunk) * self.seconds_per_char)
+            seconds = len(chunk) / STUB_CHARS_PER_AUDIO_SECOND / speed
+            yield np.zeros(int(seconds * self.sample_rate), dtype=np.float32)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _send_json(self, message: dict):
+        self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+    def handle(self):
+        try:
+            message = json.loads(self.rfile.readline(MAX_REQUEST) or b"{}")
+        except ValueError:
+            message = None
+        if not isinstance(message, dict):
+            self._send_json({"ok": False, "error": "Invalid request"})
+            return
+        command = message.get("cmd", "synthesize")
+        if command == "ping":
+            self._send_json({"ok": True, **self.server.status()})
+        elif command == "synthesize":
+            self._synthesize(message)
+        else:
+            self._send_json({"ok": False, "error": f"Unknown command: {command}"})
+
+    def _synthesize(self, message: dict):
+        received = time.perf_counter()
+        server = self.server
+        backend = server.backend
+        text = message.get("text", "")
+        voice = message.get("voice") or server.voice
+        if not isinstance(text, str):
+            self._send_json({"ok": False, "error": "Invalid text"})
+            return
+        if not isinstance(voice, str):
+            self._send_json({"ok": False, "error": "Invalid voice"})
+            return
+        voice = voice.replace(".pt", "")
+        encoding = message.get("encoding", "pcm16")
+        try:
+            speed = float(message.get("speed", 1.0))
+        except (TypeError, ValueError):
+            speed = None
+        if speed is None or not 0.1 <= speed <= 4.0:
+            self._send_json({"ok": False, "error": "Invalid speed"})
+            return
+        if encoding not in ENCODINGS:
+            self._send_json({"ok": False, "error": f"Unknown encoding: {encoding}"})
+            return
+        if voice not in backend.voices():
+            self._send_json({"ok": False, "error": f"Unknown voice: {voice}"})
+            return
+
+        token = CancelToken()
+        self._send_json(
+            {
+                "ok": True,
+                "sample_rate": backend.sample_rate,
+                "encoding": encoding,
+                "voice": voice,
+            }
+        )
+        server.count_request()
+        try:
+            # Wait for a free slot here, so the wait is reported as queue time
+            with server.slots:
+                started = time.perf_counter()
+                segments = backend.stream(text, voice, speed, token)
+                with closing(segments):
+                    for audio in segments:
+                        write_frame(self.wfile, encode(audio, encoding))
+                        self.wfile.flush()
+                finished = time.perf_counter()
+            self.wfile.write(FRAME.pack(0))
+            self._send_json(
+                {
+                    "queue": round(started - received, 6),
+                    "compute": round(finished - started, 6),
+                }
+            )
+        except (BrokenPipeError, ConnectionResetError):
+            token.cancel("client disconnected")
+            logging.debug("Client disconnected; request cancelled")
+        except Exception as e:
+            logging.debug(f"Error generating speech: {e}")
+            try:
+                self.wfile.write(FRAME.pack(ERROR_FRAME))
+                self._send_json({"error": str(e)})
+            except OSError:
+                pass
+
+
+class SynthesisDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server holding a warm model (or a stub backend)"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, backend, voice: str = DEFAULT_VOICE):
+        self.backend = backend
+        self.voice = voice
+        self.slots = threading.BoundedSemaphore(max(1, backend.concurrency))
+        self.started = time.time()
+        self._requests = 0
+        self._count_lock = threading.Lock()
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+
+    def count_request(self):
+        with self._count_lock:
+            self._requests += 1
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "device": self.backend.device,
+            "voice": self.voice,
+            "voices": self.backend.voices(),
+            "concurrency": self.backend.concurrency,
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self._requests,
+        }
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def _remove_stale_socket(socket_path: str):
+    """Remove a socket file left behind by a daemon that is no longer running"""
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+    else:
+        raise RuntimeError(f"A daemon is already listening on {socket_path}")
+    finally:
+        probe.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kokoro TTS daemon")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--voice", default=DEFAULT_VOICE, help="Default voice")
+    parser.add_argument("--preload", nargs="*", default=[], help="Voices to load")
+    parser.add_argument("--threads", default=None, help='Torch CPU threads, or "auto"')
+    parser.add_argument(
+        "--stub", action="store_true", help="Serve silence without a model"
+    )
+    parser.add_argument(
+        "--stub-seconds-per-char", type=float, default=STUB_SECONDS_PER_CHAR
+    )
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    start = time.perf_counter()
+    if args.stub:
+        backend = StubBackend(args.stub_seconds_per_char)
+    else:
+        with capture_output(enabled=not args.debug):
+            backend = ModelBackend(
+                args.model, [args.voice, *args.preload], args.threads
+            )
+    logging.info(f"Model ready in {time.perf_counter() - start:.1f}s")
+
+    server = SynthesisDaemon(args.socket, backend, args.voice)
+    # shutdown() blocks until serve_forever returns, so call it off-thread
+    signal.signal(
+        signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start()
+    )
+    logging.info(f"Listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logging.info("Daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
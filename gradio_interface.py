@@ -22,17 +22,20 @@ import gradio as gr
 import os
 import sys
 import platform
-from datetime import datetime
+import threading
 import shutil
 from pathlib import Path
 import soundfile as sf
 from pydub import AudioSegment
 import torch
-import numpy as np
 from models import (
-    list_available_voices, build_model,
+    list_available_voices, build_model, download_voice_files,
     generate_speech
 )
+from cancellation import CancelToken, Cancelled
+from output_store import OutputStore
+from scheduler import BATCH, INTERACTIVE, Scheduler
+from singleflight import SingleFlight
 
 # Global configuration
 CONFIG_FILE = "tts_config.json"  # Stores user preferences and paths
@@ -43,8 +46,54 @@ SAMPLE_RATE = 24000  # Updated from 22050 to match new model
 device = 'cuda' if torch.cuda.is_available() else 'cpu'
 model = None
 
+# Identical requests running at the same time share one synthesis
+inflight = SingleFlight()
+
+# KOKORO_STUB=1 serves silence from daemon.py's stub backend instead of the
+# model (paced by KOKORO_STUB_SECONDS_PER_CHAR), to load test the web serving
+# path without weights (see loadtest.py --target gradio)
+STUB = os.environ.get("KOKORO_STUB") == "1"
+
+# Seconds before an interactive request is abandoned (unset waits forever)
+REQUEST_TIMEOUT = float(os.environ.get("KOKORO_REQUEST_TIMEOUT", "0")) or None
+
+# Cancellation tokens of in-progress requests, by browser session
+active_requests = {}
+active_lock = threading.Lock()
+
+# Generated files, named by request hash and evicted by age and total size
+output_store = None
+
+# Priority scheduler shared by interactive and batch requests
+scheduler = None
+scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Return the shared scheduler, building the model if needed."""
+    global model, scheduler
+    with scheduler_lock:
+        if scheduler is None and STUB:
+            from daemon import STUB_SECONDS_PER_CHAR, StubBackend
+            backend = StubBackend(float(os.environ.get(
+                "KOKORO_STUB_SECONDS_PER_CHAR", STUB_SECONDS_PER_CHAR
+            )))
+            scheduler = Scheduler(None, backend.device, backend.concurrency, backend)
+        elif scheduler is None:
+            if model is None:
+                print("Initializing model...")
+                model = build_model(None, device)
+            scheduler = Scheduler(model, device)
+    return scheduler
+
+def submit_batch(voice_name, text, speed=1.0, tenant=None):
+    """Queue a bulk synthesis job behind interactive traffic."""
+    return get_scheduler().submit(text, voice_name, speed, priority=BATCH, tenant=tenant)
+
 def get_available_voices():
     """Get list of available voice models."""
+    if STUB:
+        from daemon import STUB_VOICES
+        return list(STUB_VOICES)
     try:
         # Initialize model to trigger voice downloads
         global model
@@ -79,60 +128,108 @@ def convert_audio(input_path: str, output_path: str, format: str):
         print(f"Error converting audio: {e}")
         return input_path
 
-def generate_tts_with_logs(voice_name, text, format):
+def cancel_session(request: gr.Request):
+    """Cancel every in-progress request of a browser session."""
+    session = getattr(request, "session_hash", None)
+    with active_lock:
+        tokens = active_requests.pop(session, set())
+    for token in tokens:
+        token.cancel("client cancelled")
+
+def generate_tts_with_logs(voice_name, text, format, speed=1.0, request: gr.Request = None):
     """Generate TTS audio with progress logging."""
-    global model
-    
+    # Cancelled by the Cancel button, closing the tab or the request timeout;
+    # synthesis stops at the next segment boundary
+    session = getattr(request, "session_hash", None)
+    token = CancelToken(timeout=REQUEST_TIMEOUT)
+    with active_lock:
+        active_requests.setdefault(session, set()).add(token)
     try:
-        # Initialize model if needed
-        if model is None:
-            print("Initializing model...")
-            model = build_model(None, device)
-        
-        # Create output directory
-        os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
-        
-        # Generate base filename from text
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_name = f"tts_{timestamp}"
-        wav_path = os.path.join(DEFAULT_OUTPUT_DIR, f"{base_name}.wav")
+        # Identical requests share one synthesis; it is only cancelled once
+        # every session waiting for it has cancelled
+        key = (text, voice_name, speed, format)
+        result = inflight.do(
+            key, _generate_tts, voice_name, text, format, speed, cancel=token
+        )
+    except Cancelled as e:
+        print(f"Generation stopped: {e}")
+        result = None
+    finally:
+        with active_lock:
+            tokens = active_requests.get(session)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del active_requests[session]
+    stats = inflight.stats()
+    print(f"Requests: {stats['requests']}, synthesized: {stats['executed']}, "
+          f"deduplicated: {stats['deduplicated']}")
+    return result
+
+def get_output_store():
+    """Return the store for generated files in the outputs directory."""
+    global output_store
+    with scheduler_lock:
+        if output_store is None:
+            output_store = OutputStore(DEFAULT_OUTPUT_DIR)
+    return output_store
+
+def _generate_tts(voice_name, text, format, speed=1.0, cancel=None):
+    """Synthesize one request and write it to the outputs directory."""
+    try:
+        # Identical earlier requests are answered from the store
+        store = get_output_store()
+        cached = store.get(text, voice_name, speed, format)
+        if cached is not None:
+            print(f"\nReusing stored output for: '{text}'")
+            return cached
+        wav_path = store.get(text, voice_name, speed, "wav")
+        if wav_path is not None:
+            return _convert_stored(store, wav_path, voice_name, text, format, speed)
         
         # Generate speech
         print(f"\nGenerating speech for: '{text}'")
         print(f"Using voice: {voice_name}")
         
-        generator = model(text, voice=f"voices/{voice_name}.pt", speed=1.0, split_pattern=r'\n+')
+        # Interactive requests run ahead of queued batch jobs
+        final_audio = get_scheduler().submit(
+            text, voice_name, speed, priority=INTERACTIVE, cancel=cancel
+        ).result()
         
-        all_audio = []
-        for gs, ps, audio in generator:
-            if audio is not None:
-                if isinstance(audio, np.ndarray):
-                    audio = torch.from_numpy(audio).float()
-                all_audio.append(audio)
-                print(f"Generated segment: {gs}")
-                print(f"Phonemes: {ps}")
-        
-        if not all_audio:
+        if not len(final_audio):
             raise Exception("No audio generated")
             
-        # Combine audio segments and save
-        final_audio = torch.cat(all_audio, dim=0)
-        sf.write(wav_path, final_audio.numpy(), SAMPLE_RATE)
+        # Save combined audio
+        with store.write(text, voice_name, speed, "wav") as tmp_path:
+            sf.write(tmp_path, final_audio, SAMPLE_RATE, format="WAV")
+        wav_path = str(store.path_for(text, voice_name, speed, "wav"))
         
         # Convert to requested format if needed
-        if format != "wav":
-            output_path = os.path.join(DEFAULT_OUTPUT_DIR, f"{base_name}.{format}")
-            return convert_audio(wav_path, output_path, format)
-        
-        return wav_path
+        return _convert_stored(store, wav_path, voice_name, text, format, speed)
         
+    except Cancelled as e:
+        print(f"Generation stopped: {e}")
+        return None
     except Exception as e:
         print(f"Error generating speech: {e}")
         import traceback
         traceback.print_exc()
         return None
 
-def create_interface(server_name="0.0.0.0", server_port=7860):
+def _convert_stored(store, wav_path, voice_name, text, format, speed):
+    """Store the requested format converted from a stored WAV file."""
+    if format == "wav":
+        return wav_path
+    try:
+        with store.write(text, voice_name, speed, format) as tmp_path:
+            if convert_audio(wav_path, tmp_path, format) != tmp_path:
+                raise Exception(f"Could not convert to {format}")
+    except Exception as e:
+        print(f"Falling back to WAV: {e}")
+        return wav_path
+    return str(store.path_for(text, voice_name, speed, format))
+
+def create_interface(server_name="0.0.0.0", server_port=7860, share=True):
     """Create and launch the Gradio interface."""
     
     # Get available voices
@@ -163,6 +260,7 @@ def create_interface(server_name="0.0.0.0", server_port=7860):
                     label="Output Format"
                 )
                 generate = gr.Button("Generate Speech")
+                cancel = gr.Button("Cancel")
             
             with gr.Column():
                 output = gr.Audio(label="Generated Audio")
@@ -170,14 +268,20 @@ def create_interface(server_name="0.0.0.0", server_port=7860):
         generate.click(
             fn=generate_tts_with_logs,
             inputs=[voice, text, format],
-            outputs=output
+            outputs=output,
+            api_name="generate"
         )
+        cancel.click(fn=cancel_session)
+        
+        # Closing the tab abandons the session's requests
+        if hasattr(interface, "unload"):
+            interface.unload(cancel_session)
         
     # Launch interface
     interface.launch(
         server_name=server_name,
         server_port=server_port,
-        share=True
+        share=share
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+"""Incremental regeneration for Kokoro TTS Local
+
+A long script usually changes by a sentence or two between runs, yet
+synthesizing it again costs as much as the first time. In incremental mode
+the text is split into sentence segments. Next to the output file, a
+manifest records the segment texts and a .segments.npy file keeps each
+segment's audio before crossfading. The next run diffs its segments against
+the manifest with difflib, reuses the clean audio of unchanged segments and
+synthesizes only inserted or edited ones. The output is then spliced again
+from clean clips with short equal-power crossfades, so audio that survives
+many edits is never faded twice.
+
+The manifest is ignored, and everything is synthesized, when the voice,
+speed or post-processing settings differ from the previous run, or when the
+clean audio no longer matches it.
+
+Example:
+    audio, manifest, synthesized = regenerate(
+        model, text, "af_bella", output_path="output.wav", postprocessor=post
+    )
+    sf.write("output.wav", audio, manifest.sample_rate)
+    manifest.save("output.wav")  # writes output.segments.json and .npy
+"""
+
+import json
+import logging
+import re
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cancellation import CancelToken, check
+from limits import split_text
+from models import generate_speech
+from postprocess import PostProcessor, _equal_power_fades
+
+MANIFEST_SUFFIX = ".segments.json"
+CLEAN_SUFFIX = ".segments.npy"
+MANIFEST_VERSION = 2
+CROSSFADE_MS = 10.0
+
+SENTENCE_END = re.compile(r"(?<=[.!?。！？…])[\"')\]]*\s+")
+
+
+def manifest_path(audio_path) -> Path:
+    return Path(audio_path).with_suffix(MANIFEST_SUFFIX)
+
+
+def clean_path(audio_path) -> Path:
+    return Path(audio_path).with_suffix(CLEAN_SUFFIX)
+
+
+def split_segments(text: str) -> List[str]:
+    """Split text into sentences, cutting any that exceed the chunk limit"""
+    segments = []
+    for paragraph in re.split(r"\n+", text):
+        start = 0
+        cuts = [m.end() for m in SENTENCE_END.finditer(paragraph)]
+        for end in cuts + [len(paragraph)]:
+            segments.extend(split_text(paragraph[start:end]))
+            start = end
+    return segments
+
+
+class Manifest:
+    """Segment texts and their [start, end) sample ranges in the clean audio
+
+    The clean audio holds every segment's clip back to back, before the
+    crossfades that join them in the output file. It is saved next to the
+    manifest, so a reused segment is always spliced from its original audio
+    and never faded a second time.
+    """
+
+    def __init__(self, settings: Dict, sample_rate: int):
+        self.settings = settings
+        self.sample_rate = sample_rate
+        self.texts: List[str] = []
+        self.bounds: List[Tuple[int, int]] = []
+        self.audio = np.zeros(0, dtype=np.float32)
+
+    @property
+    def length(self) -> int:
+        return self.bounds[-1][1] if self.bounds else 0
+
+    def clips(self) -> List[np.ndarray]:
+        return [self.audio[start:end] for start, end in self.bounds]
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "settings": self.settings,
+            "sample_rate": self.sample_rate,
+            "segments": [
+                {"text": text, "start": start, "end": end}
+                for text, (start, end) in zip(self.texts, self.bounds)
+            ],
+        }
+
+    def save(self, audio_path):
+        np.save(clean_path(audio_path), self.audio, allow_pickle=False)
+        manifest_path(audio_path).write_text(
+            json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    @classmethod
+    def load(cls, audio_path) -> Optional["Manifest"]:
+        """Read the manifest next to audio_path, or None if missing or stale"""
+        try:
+            data = json.loads(manifest_path(audio_path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        manifest = cls(data["settings"], data["sample_rate"])
+        for segment in data["segments"]:
+            manifest.texts.append(segment["text"])
+            manifest.bounds.append((segment["start"], segment["end"]))
+        try:
+            manifest.audio = np.load(
+                clean_path(audio_path), mmap_mode="r", allow_pickle=False
+            )
+        except (OSError, ValueError) as e:
+            logging.debug(f"Cannot read clean segment audio for {audio_path}: {e}")
+            return None
+        if manifest.audio.ndim != 1 or len(manifest.audio) != manifest.length:
+            logging.debug("Clean segment audio does not match its manifest")
+            return None
+        return manifest
+
+
+def _settings(voice: str, speed: float, stretch: bool, post: PostProcessor) -> Dict:
+    """Everything besides the text that changes the audio of a segment"""
+    return {
+        "voice": voice.replace(".pt", ""),
+        "speed": round(float(speed), 3),
+        "stretch": bool(stretch),
+        "postprocessor": {k: v for k, v in sorted(vars(post).items())},
+    }
+
+
+def _load_previous(audio_path, settings: Dict, sample_rate: int):
+    """Return the manifest of the last run if its segments can be reused"""
+    manifest = Manifest.load(audio_path)
+    if manifest is None or manifest.settings != settings:
+        return None
+    if manifest.sample_rate != sample_rate:
+        return None
+    return manifest
+
+
+def splice(clips: List[np.ndarray], fade: int) -> np.ndarray:
+    """Join clips end to end, crossfading each onto the one before it"""
+    parts: List[np.ndarray] = []
+    for clip in clips:
+        n = min(fade, len(clip), len(parts[-1]) if parts else 0)
+        if n:
+            fade_out, fade_in = _equal_power_fades(n)
+            tail = parts[-1][-n:] * fade_out + clip[:n] * fade_in
+            parts[-1] = np.concatenate([parts[-1][:-n], tail])
+            clip = clip[n:]
+        parts.append(clip)
+    if not parts:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(parts).astype(np.float32, copy=False)
+
+
+def regenerate(
+    model,
+    text: str,
+    voice: str,
+    device: str = "cpu",
+    speed: float = 1.0,
+    output_path="output.wav",
+    postprocessor: Optional[PostProcessor] = None,
+    stretch: bool = False,
+    cancel: Optional[CancelToken] = None,
+    crossfade_ms: float = CROSSFADE_MS,
+) -> Tuple[np.ndarray, Manifest, int]:
+    """Synthesize text, reusing unchanged segments of the previous output
+
+    Args:
+        model: KPipeline instance
+        text: Full text of the new version
+        voice: Voice name (e.g. 'af_bella')
+        device: Device to use ('cuda' or 'cpu')
+        speed: Speech speed multiplier
+        output_path: Audio file of the previous run; its manifest sits next to it
+        postprocessor: Applied to each synthesized segment
+        stretch: Passed on to generate_speech
+        cancel: Token checked between segments
+        crossfade_ms: Overlap between consecutive segments
+
+    Returns:
+        Tuple of (audio, manifest, number of segments synthesized). Neither is
+        written to disk; save the audio, then the manifest.
+    """
+    post = postprocessor or PostProcessor(trim=False)
+    settings = _settings(voice, speed, stretch, post)
+    sample_rate = post.out_rate
+    previous = _load_previous(output_path, settings, sample_rate)
+    old_texts = previous.texts if previous is not None else []
+    old_clips = previous.clips() if previous is not None else []
+
+    segments = split_segments(text)
+    clips: List[np.ndarray] = []
+    synthesized = 0
+    matcher = SequenceMatcher(None, old_texts, segments, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        check(cancel)
+        if tag == "equal":
+            clips.extend(old_clips[i1:i2])
+            continue
+        for segment in segments[j1:j2]:
+            audio, _, _ = generate_speech(
+                model, segment, voice, device, speed, stretch=stretch, cancel=cancel
+            )
+            clip = post(a.numpy() for a in audio) if audio else np.zeros(0, np.float32)
+            clips.append(np.asarray(clip, dtype=np.float32))
+            synthesized += 1
+
+    manifest = Manifest(settings, sample_rate)
+    manifest.texts = list(segments)
+    offset = 0
+    for clip in clips:
+        manifest.bounds.append((offset, offset + len(clip)))
+        offset += len(clip)
+    manifest.audio = (
+        np.concatenate(clips).astype(np.float32, copy=False)
+        if clips
+        else np.zeros(0, dtype=np.float32)
+    )
+
+    logging.debug(f"Synthesized {synthesized} of {len(segments)} segments")
+    fade = int(sample_rate * crossfade_ms / 1000)
+    return splice(manifest.clips(), fade), manifest, synthesized
@@ -0,0 +1,159 @@
+"""Per-segment length limits and a memory budget for Kokoro TTS Local
+
+Kokoro's model sees at most 510 phonemes per forward pass; longer segments
+are silently truncated, and very long ones make memory use spike. Text is
+therefore cut into chunks of at most max_chars characters before G2P,
+preferring sentence ends, then clause punctuation, then spaces. A chunk
+whose phonemes still exceed the limit is split again at its best boundary
+and re-synthesized.
+
+The memory guard bounds the estimated activation memory of all chunks
+being synthesized at once. Chunks estimated above the whole budget are split
+further; otherwise requests over the budget either wait for memory to free
+up ("queue") or fail immediately ("reject").
+
+Environment:
+    KOKORO_MAX_PHONEMES       phonemes per forward pass (default 510)
+    KOKORO_MEMORY_BUDGET_MB   enable the guard with this budget
+    KOKORO_MEMORY_POLICY      "queue" (default) or "reject"
+"""
+
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+# The model's context is 512 tokens including the start and end tokens
+MODEL_MAX_PHONEMES = 510
+MAX_PHONEMES = min(
+    MODEL_MAX_PHONEMES, int(os.environ.get("KOKORO_MAX_PHONEMES", MODEL_MAX_PHONEMES))
+)
+# Phonemes per character is close to 1 for most languages; leave headroom
+CHARS_PER_PHONEME = 0.8
+# Rough activation memory per phoneme of a forward pass on CPU
+BYTES_PER_PHONEME = 2 * 2**20
+
+# Boundaries from best to worst; each pattern matches just after the cut
+BOUNDARIES = [
+    re.compile(r"(?<=[.!?。！？…])[\"')\]]*\s+"),
+    re.compile(r"(?<=[;:；：])\s*|(?<=[,，、])\s*|\s+[-–—]\s+"),
+    re.compile(r"\s+"),
+]
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """Raised when a request does not fit the configured memory budget"""
+
+
+def max_chars(max_phonemes: int = MAX_PHONEMES) -> int:
+    return max(1, int(max_phonemes * CHARS_PER_PHONEME))
+
+
+def best_split(text: str, limit: int) -> int:
+    """Return the cut position at the best boundary at or before limit"""
+    for pattern in BOUNDARIES:
+        cuts = [m.end() for m in pattern.finditer(text, 0, limit + 1) if m.end() > 0]
+        cuts = [cut for cut in cuts if 0 < cut <= limit and cut < len(text)]
+        if cuts:
+            return cuts[-1]
+    return limit
+
+
+def split_text(text: str, limit: Optional[int] = None) -> List[str]:
+    """Split text into chunks of at most limit characters at good boundaries"""
+    limit = limit or max_chars()
+    chunks = []
+    text = text.strip()
+    while len(text) > limit:
+        cut = best_split(text, limit)
+        chunk, text = text[:cut].strip(), text[cut:].strip()
+        if chunk:
+            chunks.append(chunk)
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def halve(text: str) -> List[str]:
+    """Split a chunk in two at the best boundary near its middle"""
+    cut = best_split(text, max(1, len(text) * 3 // 4))
+    parts = [part for part in (text[:cut].strip(), text[cut:].strip()) if part]
+    return parts or [text]
+
+
+def iter_chunks(text: str, limit: Optional[int] = None) -> Iterator[str]:
+    """Yield paragraphs (split on newlines), cutting long ones into chunks"""
+    for paragraph in re.split(r"\n+", text):
+        yield from split_text(paragraph, limit)
+
+
+def estimate_bytes(chunk: str) -> int:
+    """Estimated peak activation memory of synthesizing one chunk"""
+    return len(chunk) * BYTES_PER_PHONEME
+
+
+class MemoryGuard:
+    """Bound the estimated memory of concurrently synthesized chunks
+
+    Args:
+        budget: Bytes that may be reserved at once
+        policy: "queue" to wait for memory, "reject" to fail at once
+        timeout: Longest wait in queue mode (None waits forever)
+    """
+
+    def __init__(self, budget: int, policy: str = "queue", timeout=None):
+        if policy not in ("queue", "reject"):
+            raise ValueError(f"Unknown memory policy: {policy}")
+        self.budget = budget
+        self.policy = policy
+        self.timeout = timeout
+        self.reserved = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def reserve(self, nbytes: int, timeout=None):
+        """Hold nbytes of the budget for the duration of the block"""
+        if nbytes > self.budget:
+            raise MemoryBudgetExceeded(
+                f"Segment needs ~{nbytes >> 20} MB, over the "
+                f"{self.budget >> 20} MB budget"
+            )
+        timeout = self.timeout if timeout is None else timeout
+        with self._cond:
+            busy = self.reserved + nbytes > self.budget
+            if (busy and self.policy == "reject") or not self._cond.wait_for(
+                lambda: self.reserved + nbytes <= self.budget, timeout
+            ):
+                raise MemoryBudgetExceeded(
+                    f"Memory budget of {self.budget >> 20} MB is in use"
+                )
+            self.reserved += nbytes
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.reserved -= nbytes
+                self._cond.notify_all()
+
+
+_guard: Optional[MemoryGuard] = None
+if os.environ.get("KOKORO_MEMORY_BUDGET_MB"):
+    _guard = MemoryGuard(
+        int(float(os.environ["KOKORO_MEMORY_BUDGET_MB"]) * 2**20),
+        os.environ.get("KOKORO_MEMORY_POLICY", "queue"),
+    )
+
+
+def set_memory_budget(megabytes: Optional[float], policy: str = "queue", timeout=None):
+    """Enable the memory guard with a budget, or disable it with None"""
+    global _guard
+    _guard = (
+        MemoryGuard(int(megabytes * 2**20), policy, timeout)
+        if megabytes is not None
+        else None
+    )
+
+
+def get_memory_guard() -> Optional[MemoryGuard]:
+    return _guard
@@ -0,0 +1,489 @@
+"""Load test for the Kokoro TTS daemon and web interface
+
+Replays a mix of texts and voices against daemon.py (--target daemon) or
+gradio_interface.py (--target gradio) at increasing numbers of concurrent
+users and reports, for each level, throughput, latency percentiles, time
+queued for a synthesis slot versus time computing (daemon only), and the
+error rate. Read together, the levels form a saturation curve: the point
+where throughput stops growing while latency keeps rising is the capacity
+of the server.
+
+Texts are sampled from a JSONL file, one object per line, using its "text"
+field or else "title" and "body" (the format of requests.jsonl). By default
+a stub server is started locally (daemon.py --stub, or the web interface
+with KOKORO_STUB=1), so the serving path itself is measured without a
+model; --server model starts a real one and --server external uses one that
+is already running. The gradio target needs the gradio_client package.
+The web interface answers repeated texts from its output store, so the
+gradio target appends a spoken serial number to every request to keep the
+load on synthesis; --allow-cache sends the texts as they are and reports
+the cache-hit ratio instead.
+
+Usage:
+    python loadtest.py --workload requests.jsonl --users 1 2 4 8 --duration 20
+    python loadtest.py --server model --server-concurrency 2 --output load.json
+    python loadtest.py --target gradio --users 1 4 16
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import wave
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from tts_client import DEFAULT_SOCKET, MAX_REQUEST, DaemonError, read_frames, request
+
+DEFAULT_USERS = [1, 2, 4, 8, 16]
+DEFAULT_DURATION = 15.0
+DEFAULT_MAX_CHARS = 2000
+READY_TIMEOUT = 300.0
+DEFAULT_GRADIO_URL = "http://127.0.0.1:7860"
+# Voices of the stub servers (daemon.STUB_VOICES); the web interface does not
+# list its voices over the API
+STUB_VOICES = ["af_bella", "af_heart", "am_adam", "bf_emma", "bm_george"]
+# A level saturates when doubling users adds less than this much throughput
+SATURATION_GAIN = 1.1
+
+
+def load_workload(path, max_chars: int = DEFAULT_MAX_CHARS) -> List[str]:
+    """Read texts from a JSONL file, truncated to max_chars"""
+    texts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            text = entry.get("text") or ". ".join(
+                part for part in (entry.get("title"), entry.get("body")) if part
+            )
+            if text:
+                texts.append(text[:max_chars])
+    if not texts:
+        raise ValueError(f"No texts found in {path}")
+    return texts
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile, q in [0, 100]"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def run_request(text: str, voice: str, socket_path: str, timeout: float) -> Dict:
+    """Send one request and time it from the client's side"""
+    sample = {"chars": len(text), "voice": voice, "error": None}
+    start = time.perf_counter()
+    try:
+        message = {"cmd": "synthesize", "text": text, "voice": voice}
+        header, stream = request(message, socket_path, timeout)
+        audio_bytes = 0
+        with stream:
+            for frame in read_frames(stream):
+                if "first_audio" not in sample:
+                    sample["first_audio"] = time.perf_counter() - start
+                audio_bytes += len(frame)
+            timings = json.loads(stream.readline(MAX_REQUEST) or b"{}")
+        sample.update(timings)
+        sample["audio"] = audio_bytes / 2 / header["sample_rate"]
+    except (DaemonError, OSError, ValueError) as e:
+        sample["error"] = str(e) or type(e).__name__
+    sample["latency"] = time.perf_counter() - start
+    return sample
+
+
+def run_gradio_request(client, text: str, voice: str) -> Dict:
+    """Call the web interface's generate endpoint and time it"""
+    sample = {"chars": len(text), "voice": voice, "error": None}
+    start = time.perf_counter()
+    try:
+        path = client.predict(voice, text, "wav", api_name="/generate")
+        if not path:
+            raise ValueError("No audio returned")
+        # The endpoint returns a finished file, so first audio is the latency
+        sample["first_audio"] = time.perf_counter() - start
+        with wave.open(str(path), "rb") as f:
+            sample["audio"] = f.getnframes() / f.getframerate()
+    except Exception as e:
+        # gradio_client raises its own error types for failed calls
+        sample["error"] = str(e) or type(e).__name__
+    sample["latency"] = time.perf_counter() - start
+    return sample
+
+
+Sender = Callable[[str, str], Dict]
+
+
+def daemon_sender(socket_path: str, timeout: float = 120.0) -> Callable[[], Sender]:
+    """Return a factory of per-client senders for the daemon"""
+
+    def connect() -> Sender:
+        return lambda text, voice: run_request(text, voice, socket_path, timeout)
+
+    return connect
+
+
+def gradio_sender(url: str, unique: bool = True) -> Callable[[], Sender]:
+    """Return a factory of per-client senders for the web interface
+
+    The web interface answers a repeated (text, voice) from its output store
+    and collapses concurrent repeats into one synthesis. With ``unique``,
+    every request gets a spoken serial number so each one is synthesized;
+    otherwise repeats are flagged so the report can show the cache-hit ratio.
+    """
+    from gradio_client import Client
+
+    seen = set()
+    lock = threading.Lock()
+    counter = itertools.count(1)
+
+    def connect() -> Sender:
+        client = Client(url, verbose=False)
+
+        def send(text: str, voice: str) -> Dict:
+            with lock:
+                if unique:
+                    text = f"{text} {next(counter)}."
+                repeat = (text, voice) in seen
+                seen.add((text, voice))
+            sample = run_gradio_request(client, text, voice)
+            sample["repeat"] = repeat
+            return sample
+
+        return send
+
+    return connect
+
+
+def local_voices() -> List[str]:
+    """Voice names in the voices directory next to this script"""
+    voices_dir = Path(__file__).resolve().parent / "voices"
+    return sorted(path.stem for path in voices_dir.glob("*.pt"))
+
+
+def run_level(
+    users: int,
+    texts: List[str],
+    voices: List[str],
+    connect: Callable[[], Sender],
+    duration: float,
+    seed: int = 0,
+) -> List[Dict]:
+    """Run `users` closed-loop clients for `duration` seconds
+
+    Each client calls connect() once for its own sender.
+    """
+    samples: List[Dict] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(index: int):
+        rng = random.Random(seed * 1000 + index)
+        send = connect()
+        while time.perf_counter() < deadline:
+            sample = send(rng.choice(texts), rng.choice(voices))
+            sample["finished"] = time.perf_counter()
+            with lock:
+                samples.append(sample)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def summarize(users: int, samples: List[Dict], duration: float) -> Dict:
+    ok = [s for s in samples if s["error"] is None]
+    # Requests still running at the deadline stretch the measured window
+    elapsed = 0.0
+    if samples:
+        first = min(s["finished"] - s["latency"] for s in samples)
+        elapsed = max(duration, max(s["finished"] for s in samples) - first)
+
+    def stat(key: str, q: float):
+        value = percentile([s[key] for s in ok if key in s], q)
+        return round(value, 4) if value is not None else None
+
+    def mean(key: str):
+        values = [s[key] for s in ok if key in s]
+        return round(sum(values) / len(values), 4) if values else None
+
+    audio = sum(s.get("audio", 0) for s in ok)
+    errors: Dict[str, int] = {}
+    for s in samples:
+        if s["error"] is not None:
+            errors[s["error"]] = errors.get(s["error"], 0) + 1
+    summary = {
+        "users": users,
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "throughput": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+        "audio_per_second": round(audio / elapsed, 3) if elapsed else 0.0,
+        "latency_p50": stat("latency", 50),
+        "latency_p90": stat("latency", 90),
+        "latency_p99": stat("latency", 99),
+        "first_audio_p50": stat("first_audio", 50),
+        "first_audio_p99": stat("first_audio", 99),
+        "queue_mean": mean("queue"),
+        "queue_p90": stat("queue", 90),
+        "compute_mean": mean("compute"),
+        "error_kinds": errors,
+    }
+    flagged = [s for s in samples if "repeat" in s]
+    if flagged:
+        # Repeats are answered from the output store or by a running twin
+        summary["cache_hit_ratio"] = round(
+            sum(s["repeat"] for s in flagged) / len(flagged), 4
+        )
+    return summary
+
+
+def find_saturation(levels: List[Dict]) -> Optional[int]:
+    """First user count after which more users stop adding throughput"""
+    for before, after in zip(levels, levels[1:]):
+        if before["throughput"] and after["throughput"] < (
+            before["throughput"] * SATURATION_GAIN
+        ):
+            return before["users"]
+    return None
+
+
+def print_report(levels: List[Dict], saturation: Optional[int]):
+    columns = [
+        ("users", "users"),
+        ("req/s", "throughput"),
+        ("audio s/s", "audio_per_second"),
+        ("p50 s", "latency_p50"),
+        ("p90 s", "latency_p90"),
+        ("p99 s", "latency_p99"),
+        ("ttfa p50", "first_audio_p50"),
+        ("queue s", "queue_mean"),
+        ("compute s", "compute_mean"),
+        ("errors", "error_rate"),
+    ]
+    if any("cache_hit_ratio" in level for level in levels):
+        columns.append(("cache hit", "cache_hit_ratio"))
+    print("  ".join(f"{title:>9}" for title, _ in columns))
+    for level in levels:
+        cells = []
+        for _, key in columns:
+            value = level[key]
+            cells.append(f"{'-' if value is None else value:>9}")
+        print("  ".join(cells))
+    peak = max(levels, key=lambda level: level["throughput"])
+    print(f"\nPeak throughput: {peak['throughput']} req/s at {peak['users']} users")
+    if saturation is not None:
+        print(f"Saturates at about {saturation} concurrent users")
+    else:
+        print("No saturation within the tested levels")
+
+
+def ping(socket_path: str) -> Dict:
+    header, stream = request({"cmd": "ping"}, socket_path, timeout=5)
+    stream.close()
+    return header
+
+
+def start_daemon(
+    kind: str, socket_path: str, concurrency: int, extra: Sequence[str] = ()
+) -> subprocess.Popen:
+    """Start daemon.py and wait until it answers a ping"""
+    command = [sys.executable, str(Path(__file__).with_name("daemon.py"))]
+    command += ["--socket", socket_path, *extra]
+    if kind == "stub":
+        command.append("--stub")
+    env = dict(os.environ, KOKORO_MAX_CONCURRENCY=str(concurrency))
+    process = subprocess.Popen(command, env=env)
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Daemon exited with status {process.returncode}")
+        try:
+            ping(socket_path)
+            return process
+        except DaemonError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Daemon did not become ready in time")
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gradio(
+    kind: str, workdir: str, port: int, concurrency: int, extra_env: Dict[str, str]
+) -> subprocess.Popen:
+    """Start the web interface on localhost and wait until it answers
+
+    A stub runs in workdir, so its outputs directory is thrown away
+    afterwards; a model server runs next to this script, where the weights
+    and voices are.
+    """
+    root = str(Path(__file__).resolve().parent)
+    code = (
+        "import gradio_interface; "
+        f"gradio_interface.create_interface('127.0.0.1', {port}, share=False)"
+    )
+    env = dict(os.environ, KOKORO_MAX_CONCURRENCY=str(concurrency), **extra_env)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    if kind == "stub":
+        env["KOKORO_STUB"] = "1"
+    cwd = workdir if kind == "stub" else root
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=cwd, env=env)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Web interface exited with status {process.returncode}")
+        try:
+            urllib.request.urlopen(url, timeout=5).close()
+            return process
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Web interface did not become ready in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kokoro TTS load test")
+    parser.add_argument("--workload", default="requests.jsonl", help="JSONL of texts")
+    parser.add_argument("--users", type=int, nargs="+", default=DEFAULT_USERS)
+    parser.add_argument(
+        "--duration", type=float, default=DEFAULT_DURATION, help="Seconds per level"
+    )
+    parser.add_argument("--voices", nargs="*", help="Voices to mix (default: all)")
+    parser.add_argument("--max-chars", type=int, default=DEFAULT_MAX_CHARS)
+    parser.add_argument("--target", choices=("daemon", "gradio"), default="daemon")
+    parser.add_argument(
+        "--server", choices=("stub", "model", "external"), default="stub"
+    )
+    parser.add_argument("--server-concurrency", type=int, default=1)
+    parser.add_argument(
+        "--stub-seconds-per-char", type=float, help="Stub compute cost per character"
+    )
+    parser.add_argument("--socket", help="Socket of an external daemon")
+    parser.add_argument("--url", help="URL of an external web interface")
+    parser.add_argument(
+        "--allow-cache",
+        action="store_true",
+        help="Let the web interface answer repeated texts from its output store "
+        "(default: make every request unique) and report the cache-hit ratio",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    texts = load_workload(args.workload, args.max_chars)
+    process = None
+    tmpdir = None
+    if args.server != "external":
+        tmpdir = tempfile.TemporaryDirectory()
+    try:
+        if args.target == "gradio":
+            try:
+                url = args.url or DEFAULT_GRADIO_URL
+                if args.server != "external":
+                    port = free_port()
+                    extra_env = {}
+                    if args.stub_seconds_per_char is not None:
+                        extra_env["KOKORO_STUB_SECONDS_PER_CHAR"] = str(
+                            args.stub_seconds_per_char
+                        )
+                    process = start_gradio(
+                        args.server,
+                        tmpdir.name,
+                        port,
+                        args.server_concurrency,
+                        extra_env,
+                    )
+                    url = f"http://127.0.0.1:{port}"
+                connect = gradio_sender(url, unique=not args.allow_cache)
+            except ImportError:
+                print("Error: --target gradio needs gradio_client", file=sys.stderr)
+                return 1
+            voices = args.voices or (
+                STUB_VOICES if args.server == "stub" else local_voices()
+            )
+            if not voices:
+                print("Error: no voices found; pass --voices", file=sys.stderr)
+                return 1
+            status = {
+                "target": "gradio",
+                "url": url,
+                "server": args.server,
+                "unique_requests": not args.allow_cache,
+            }
+            print(f"{len(texts)} texts, {len(voices)} voices, web interface {url}\n")
+        else:
+            if args.server == "external":
+                socket_path = args.socket or DEFAULT_SOCKET
+            else:
+                socket_path = os.path.join(tmpdir.name, "loadtest.sock")
+                extra = []
+                if args.stub_seconds_per_char is not None:
+                    extra += [
+                        "--stub-seconds-per-char",
+                        str(args.stub_seconds_per_char),
+                    ]
+                process = start_daemon(
+                    args.server, socket_path, args.server_concurrency, extra
+                )
+            connect = daemon_sender(socket_path)
+            status = ping(socket_path)
+            voices = args.voices or status.get("voices") or [status["voice"]]
+            print(
+                f"{len(texts)} texts, {len(voices)} voices, server {status['device']} "
+                f"with {status.get('concurrency', '?')} synthesis slots\n"
+            )
+
+        levels = []
+        for i, users in enumerate(args.users):
+            samples = run_level(
+                users, texts, voices, connect, args.duration, args.seed + i
+            )
+            levels.append(summarize(users, samples, args.duration))
+        saturation = find_saturation(levels)
+        print_report(levels, saturation)
+        if args.output:
+            report = {
+                "server": status,
+                "workload": args.workload,
+                "duration": args.duration,
+                "levels": levels,
+                "saturation_users": saturation,
+            }
+            Path(args.output).write_text(json.dumps(report, indent=2))
+            print(f"Report: {args.output}")
+    except (DaemonError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""SSML-lite markup for Kokoro TTS Local
+
+Supported tags:
+
+    <speak>                               optional root element
+    <break time="500ms"/>                 pause ("ms" or "s", default 500ms)
+    <voice name="bm_george">...</voice>   switch voice for a span
+    <prosody rate="1.2">...</prosody>     speed for a span ("1.2" or "120%")
+    <say-as interpret-as="cardinal">42</say-as>
+        cardinal, ordinal, year, digits, characters, telephone
+
+Markup is compiled into a plan of Segment and Break entries, which
+render_plan executes in one pass: voices are loaded up front, segments are
+synthesized grouped by voice, and audio is yielded in plan order.
+
+Example:
+    markup = '<speak>Hi <break time="1s"/> <voice name="bm_george">you</voice></speak>'
+    plan = parse_markup(markup, "af_bella")
+    audio = np.concatenate(list(render_plan(model, plan)))
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from cancellation import CancelToken
+from models import SAMPLE_RATE, preload_voices, stream_speech
+from normalize import _num2words, number_to_words
+
+DEFAULT_BREAK = 0.5
+
+
+class Segment(NamedTuple):
+    text: str
+    voice: str
+    speed: float
+
+
+class Break(NamedTuple):
+    seconds: float
+
+
+PlanEntry = Union[Segment, Break]
+
+
+def is_markup(text: str) -> bool:
+    """Return True if text should be parsed as markup"""
+    return text.lstrip().startswith("<speak")
+
+
+def _parse_time(value: str) -> float:
+    match = re.fullmatch(r"\s*([\d.]+)\s*(ms|s)?\s*", value or "")
+    if not match:
+        raise ValueError(f"Invalid break time: {value!r}")
+    amount = float(match.group(1))
+    return amount / 1000 if match.group(2) in (None, "ms") else amount
+
+
+def _parse_rate(value: str, speed: float) -> float:
+    value = (value or "").strip()
+    named = {"x-slow": 0.6, "slow": 0.8, "medium": 1.0, "fast": 1.2, "x-fast": 1.4}
+    if value in named:
+        return named[value]
+    if value.endswith("%"):
+        return speed * float(value[:-1]) / 100
+    return float(value)
+
+
+def say_as(text: str, interpret_as: str, lang: str = "a") -> str:
+    """Spell out text the way a say-as element asks for"""
+    text = text.strip()
+    kind = interpret_as.lower()
+    if kind in ("characters", "spell-out"):
+        return " ".join(ch for ch in text if not ch.isspace())
+    if kind in ("digits", "telephone"):
+        digits = [d for d in text if d.isdigit()]
+        words = [_num2words(int(d), lang) for d in digits]
+        return ", ".join(words) if kind == "telephone" else " ".join(words)
+    if kind in ("ordinal", "year"):
+        return number_to_words(text.split(".")[0], lang, to=kind)
+    return number_to_words(text, lang)
+
+
+def parse_markup(text: str, voice: str, speed: float = 1.0) -> List[PlanEntry]:
+    """Compile markup into a list of Segment and Break entries
+
+    Args:
+        text: Markup, with or without a <speak> root element
+        voice: Voice used outside any <voice> element
+        speed: Speed used outside any <prosody> element
+    """
+    if not is_markup(text):
+        text = f"<speak>{text}</speak>"
+    try:
+        root = ET.fromstring(text)
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid markup: {e}")
+
+    plan: List[PlanEntry] = []
+
+    def add_text(chunk: str, voice: str, speed: float):
+        chunk = re.sub(r"[ \t]+", " ", chunk or "")
+        last = plan[-1] if plan else None
+        same = isinstance(last, Segment) and (last.voice, last.speed) == (voice, speed)
+        if not chunk.strip():
+            # Whitespace only separates words or paragraphs of the open segment
+            if chunk and same:
+                plan[-1] = last._replace(text=last.text + chunk)
+            return
+        if same:
+            plan[-1] = last._replace(text=last.text + chunk)
+        else:
+            plan.append(Segment(chunk, voice, speed))
+
+    def walk(element: ET.Element, voice: str, speed: float):
+        tag = element.tag.lower()
+        if tag == "break":
+            time = element.get("time")
+            plan.append(Break(_parse_time(time) if time else DEFAULT_BREAK))
+        elif tag == "say-as":
+            kind = element.get("interpret-as", "")
+            spoken = say_as(element.text or "", kind, voice[:1])
+            add_text(f" {spoken} ", voice, speed)
+        else:
+            if tag == "voice":
+                voice = element.get("name", voice)
+            elif tag == "prosody":
+                speed = _parse_rate(element.get("rate", ""), speed)
+            elif tag not in ("speak", "p", "s"):
+                raise ValueError(f"Unsupported markup tag: <{element.tag}>")
+            add_text(element.text, voice, speed)
+            for child in element:
+                walk(child, voice, speed)
+                add_text(child.tail, voice, speed)
+            if tag in ("p", "s"):
+                add_text("\n", voice, speed)
+
+    walk(root, voice, speed)
+    return [
+        entry._replace(text=_tidy(entry.text)) if isinstance(entry, Segment) else entry
+        for entry in plan
+    ]
+
+
+def _tidy(text: str) -> str:
+    """Collapse runs of spaces, keeping one newline between paragraphs"""
+    text = re.sub(r"\s*\n\s*", "\n", text)
+    return re.sub(r"[ \t]+", " ", text).strip()
+
+
+def render_plan(
+    model,
+    plan: List[PlanEntry],
+    device: str = "cpu",
+    cancel: Optional[CancelToken] = None,
+) -> Iterator[np.ndarray]:
+    """Synthesize a plan and yield float32 audio in plan order
+
+    All voices are loaded before synthesis starts. Segments are synthesized
+    grouped by voice, and each piece is yielded as soon as everything before
+    it in the plan is ready, so no intermediate files are written.
+    """
+    segments = [i for i, entry in enumerate(plan) if isinstance(entry, Segment)]
+    preload_voices(model, {plan[i].voice for i in segments}, device)
+
+    # Stable sort by first appearance of each voice keeps plan order within a voice
+    first_seen: Dict[str, int] = {}
+    for i in segments:
+        first_seen.setdefault(plan[i].voice, i)
+    order = sorted(segments, key=lambda i: first_seen[plan[i].voice])
+
+    ready: Dict[int, np.ndarray] = {}
+    position = 0
+
+    def flush() -> Iterator[np.ndarray]:
+        nonlocal position
+        while position < len(plan):
+            entry = plan[position]
+            if isinstance(entry, Break):
+                yield np.zeros(int(entry.seconds * SAMPLE_RATE), dtype=np.float32)
+            elif position in ready:
+                yield ready.pop(position)
+            else:
+                return
+            position += 1
+
+    for i in order:
+        entry = plan[i]
+        chunks = [
+            audio.numpy().astype(np.float32, copy=False)
+            for _, _, audio in stream_speech(
+                model, entry.text, entry.voice, device, entry.speed, cancel=cancel
+            )
+        ]
+        ready[i] = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        yield from flush()
+    yield from flush()
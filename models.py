@@ -1,16 +1,29 @@
 """Models module for Kokoro TTS Local"""
 
 from numbers import Number
-from typing import Optional, Tuple, List, cast
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Dict, Iterator, Optional, Tuple, List, cast
 import torch
 from kokoro import KPipeline
+from kokoro.model import KModel
+from voice_registry import LANGUAGES as VOICE_LANGUAGES, get_voice_registry
+from timestretch import StretchCache, can_stretch, time_stretch
+from alignment import Alignment
+from normalize import normalize_text
+from prompt_pack import lookup_prompt
+from cancellation import CancelToken, Cancelled, check
+from autotune import DEFAULT_THREADS, ThreadSetting, configure_threads
+from limits import MAX_PHONEMES, estimate_bytes, get_memory_guard, halve, iter_chunks
 import os
 import json
 import codecs
 from pathlib import Path
 import numpy as np
 import shutil
+import hashlib
 import logging
+import threading
+import time
 
 # Set environment variables for proper encoding
 os.environ["PYTHONIOENCODING"] = "utf-8"
@@ -81,18 +94,24 @@ original_load_voice = KPipeline.load_voice
 
 def patched_load_voice(self, voice_path):
     """Load voice model with weights_only=False for compatibility"""
+    # Cached voices are served without touching the filesystem
+    voice_name = Path(voice_path).stem
+    voice_model = self.voices.get(voice_name)
+    if voice_model is not None:
+        return voice_model
     if not os.path.exists(voice_path):
         raise FileNotFoundError(f"Voice file not found: {voice_path}")
-    voice_name = Path(voice_path).stem
     voice_model = torch.load(voice_path, weights_only=False)
     if voice_model is None:
         raise ValueError(f"Failed to load voice model from {voice_path}")
     # Ensure device is set
     if not hasattr(self, "device"):
         self.device = "cpu"
-    # Move model to device and store in voices dictionary
-    self.voices[voice_name] = voice_model.to(self.device)
-    return self.voices[voice_name]
+    # Move model to device and store in voices dictionary; the first
+    # concurrent loader wins so every caller sees the same tensor
+    voice_model = voice_model.to(self.device)
+    with _voices_lock:
+        return self.voices.setdefault(voice_name, voice_model)
 
 
 KPipeline.load_voice = patched_load_voice
@@ -174,9 +193,33 @@ except ImportError as e:
     EspeakWrapper.library_path = library_path
     EspeakWrapper.data_path = data_path
 
+# Output sample rate of the Kokoro model
+SAMPLE_RATE = 24000
+
 # Initialize pipeline globally
 _pipeline = None
 
+# Per-language pipeline pools, all sharing the default pipeline's model and voices
+_pools: Dict[str, "PipelinePool"] = {}
+
+# Serializes first-time model initialization (single-flight)
+_init_lock = threading.Lock()
+# Guards creation of per-language pools
+_pipelines_lock = threading.Lock()
+# Guards writes to the shared voices dictionary
+_voices_lock = threading.Lock()
+
+# Pipelines per language that may run inference concurrently
+MAX_CONCURRENCY = int(os.environ.get("KOKORO_MAX_CONCURRENCY", "1"))
+# How often a request waiting for a pooled pipeline checks its cancel token
+CANCEL_POLL_INTERVAL = 0.1
+
+# Speed-1.0 audio kept as the source for time-stretched speed variants
+_stretch_cache = StretchCache()
+
+# Directory holding compiled model artifacts, keyed by torch version and model hash
+COMPILE_CACHE_DIR = "compiled"
+
 
 def download_voice_files():
     """Download voice files from Hugging Face."""
@@ -229,16 +272,279 @@ def download_voice_files():
     return downloaded_voices
 
 
-def build_model(model_path: str, device: str, lang: str = "a") -> KPipeline:
-    """Build and return the Kokoro pipeline with proper encoding configuration"""
-    global _pipeline
+def _model_hash(model, model_path: Optional[str] = None) -> str:
+    """Hash the model weights, preferring the checkpoint file when available"""
+    digest = hashlib.sha256()
+    if model_path and os.path.isfile(model_path):
+        with open(model_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        for name, tensor in model.state_dict().items():
+            digest.update(name.encode("utf-8"))
+            digest.update(tensor.detach().cpu().numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _compile_cache_path(model, model_path: Optional[str], cache_dir: str) -> Path:
+    """Return the cache directory for this torch version and model"""
+    key = f"torch-{torch.__version__}-{_model_hash(model, model_path)}"
+    return Path(cache_dir) / key.replace("+", "_")
+
+
+def compile_pipeline(
+    pipeline: KPipeline,
+    model_path: Optional[str] = None,
+    cache_dir: str = COMPILE_CACHE_DIR,
+) -> bool:
+    """Compile the pipeline's model with torch.compile, reusing cached artifacts
+
+    The compiled forward replaces ``forward_with_tokens`` on the model instance.
+    If compilation or the warmup run fails the eager forward is kept, and a
+    compiled forward that fails later falls back to eager permanently.
+
+    Args:
+        pipeline: KPipeline whose model should be compiled
+        model_path: Checkpoint used to key the cache (hashes weights if missing)
+        cache_dir: Directory holding compiled artifacts
+
+    Returns:
+        True if the compiled forward is active, False if running eager
+    """
+    model = getattr(pipeline, "model", None)
+    if model is None or not hasattr(torch, "compile"):
+        logging.debug("torch.compile unavailable, running eager")
+        return False
+
+    eager = model.forward_with_tokens
+    try:
+        cache_path = _compile_cache_path(model, model_path, cache_dir)
+        cache_path.mkdir(parents=True, exist_ok=True)
+        # Inductor keeps its FX graph and kernel caches here across processes
+        os.environ["TORCHINDUCTOR_CACHE_DIR"] = str(cache_path.absolute())
+
+        artifacts_file = cache_path / "artifacts.bin"
+        compiler = getattr(torch, "compiler", None)
+        if artifacts_file.exists() and hasattr(compiler, "load_cache_artifacts"):
+            logging.debug(f"Loading compiled artifacts from {artifacts_file}")
+            compiler.load_cache_artifacts(artifacts_file.read_bytes())  # type: ignore
+
+        compiled = torch.compile(eager, dynamic=True)
+
+        # Compilation is lazy, so run a short warmup to surface failures now
+        voice = next(iter(pipeline.voices.values()), None)
+        if voice is not None:
+            input_ids = torch.LongTensor([[0, *range(1, 17), 0]]).to(model.device)
+            compiled(input_ids, voice[16].to(model.device), 1.0)
+
+            can_save = hasattr(compiler, "save_cache_artifacts")
+            if can_save and not artifacts_file.exists():
+                saved = compiler.save_cache_artifacts()  # type: ignore
+                if saved is not None:
+                    artifacts_file.write_bytes(saved[0])
+                    logging.debug(f"Saved compiled artifacts to {artifacts_file}")
+    except Exception as e:
+        logging.debug(f"Warning: model compilation failed, running eager: {e}")
+        return False
+
+    def forward_with_tokens(*args, **kwargs):
+        try:
+            return compiled(*args, **kwargs)
+        except Exception as e:
+            logging.debug(f"Warning: compiled forward failed, reverting to eager: {e}")
+            model.forward_with_tokens = eager
+            return eager(*args, **kwargs)
+
+    model.forward_with_tokens = forward_with_tokens
+    return True
+
+
+def _warmup_run(pipeline: KPipeline):
+    """Return a callable running one mid-sized forward pass, for tuning"""
+    model = getattr(pipeline, "model", None)
+    voice = next(iter(pipeline.voices.values()), None)
+    if model is None or voice is None:
+        return None
+    input_ids = torch.LongTensor([[0, *range(1, 121), 0]]).to(model.device)
+    ref_s = voice[120].to(model.device)
+    return lambda: model.forward_with_tokens(input_ids, ref_s, 1.0)
+
+
+def lang_from_voice(voice: str, default: str = "a") -> str:
+    """Return the pipeline language code implied by a voice name prefix"""
+    prefix = Path(voice).stem[:1].lower()
+    return prefix if prefix in VOICE_LANGUAGES else default
+
+
+def _new_pipeline(lang: str, model, voices: Dict[str, torch.Tensor]) -> KPipeline:
+    """Create a pipeline for ``lang`` around an already loaded model"""
+    # model=False stops KPipeline from loading its own copy of the weights
+    pipeline = KPipeline(lang_code=lang, model=False)
+    pipeline.model = model
+    pipeline.voices = voices
+    return pipeline
+
+
+class PipelinePool:
+    """Bounded pool of pipelines for one language sharing one model
+
+    G2P frontends are not safe to share between threads, so each concurrent
+    request checks out its own pipeline. Extra pipelines are created lazily up
+    to ``size``; further callers block until one is returned.
+    """
+
+    def __init__(self, primary: KPipeline, size: int):
+        self.primary = primary
+        self.size = max(1, size)
+        self._idle: List[KPipeline] = [primary]
+        self._created = 1
+        self._cond = threading.Condition()
+
+    def resize(self, size: int):
+        with self._cond:
+            self.size = max(1, size)
+            self._cond.notify_all()
+
+    @contextmanager
+    def acquire(
+        self, timeout: Optional[float] = None, cancel: Optional[CancelToken] = None
+    ) -> Iterator[KPipeline]:
+        """Check out a pipeline for the duration of the block
+
+        Waiting raises TimeoutError after ``timeout`` seconds, and the
+        token's Cancelled or DeadlineExceeded as soon as ``cancel`` fires.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        create = False
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                check(cancel)
+                wait = CANCEL_POLL_INTERVAL if cancel is not None else None
+                if deadline is not None:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        raise TimeoutError(
+                            f"No pipeline available for '{self.primary.lang_code}'"
+                        )
+                    wait = left if wait is None else min(wait, left)
+                self._cond.wait(wait)
+            if self._idle:
+                pipeline = self._idle.pop()
+            else:
+                self._created += 1
+                create = True
+        if create:
+            try:
+                pipeline = _new_pipeline(
+                    self.primary.lang_code, self.primary.model, self.primary.voices
+                )
+                pipeline.device = self.primary.device
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+        try:
+            yield pipeline
+        finally:
+            with self._cond:
+                self._idle.append(pipeline)
+                self._cond.notify()
+
+
+def set_max_concurrency(size: int):
+    """Set how many requests per language may run inference at once"""
+    global MAX_CONCURRENCY
+    MAX_CONCURRENCY = max(1, size)
+    with _pipelines_lock:
+        for pool in set(_pools.values()):
+            pool.resize(MAX_CONCURRENCY)
+
+
+def _get_pool(lang: str) -> PipelinePool:
+    """Return the pool for a language code, building its first pipeline lazily"""
     if _pipeline is None:
+        raise ValueError("Model is None - call build_model first")
+    pool = _pools.get(lang)
+    if pool is not None:
+        return pool
+    with _pipelines_lock:
+        if lang not in _pools:
+            try:
+                pipeline = _new_pipeline(lang, _pipeline.model, _pipeline.voices)
+                pipeline.device = _pipeline.device
+                _pools[lang] = PipelinePool(pipeline, MAX_CONCURRENCY)
+                logging.debug(f"Initialized pipeline for language '{lang}'")
+            except Exception as e:
+                # Missing G2P extras (e.g. misaki[ja]) should not break synthesis
+                logging.debug(
+                    f"Warning: Failed to initialize pipeline for '{lang}', "
+                    f"falling back to '{_pipeline.lang_code}': {e}"
+                )
+                _pools[lang] = _pools[_pipeline.lang_code]
+        return _pools[lang]
+
+
+def get_pipeline(lang: str) -> KPipeline:
+    """Return the pipeline for a language code, building it lazily
+
+    Pipelines share the model weights and voice packs of the pipeline created
+    by build_model, so each extra language only adds its G2P frontend. The
+    returned pipeline is not reserved; concurrent callers should use
+    acquire_pipeline instead.
+    """
+    return _get_pool(lang).primary
+
+
+def acquire_pipeline(
+    lang: str, timeout: Optional[float] = None, cancel: Optional[CancelToken] = None
+):
+    """Check out a pipeline for a language code from its pool
+
+    The wait for a free pipeline stops with Cancelled (or DeadlineExceeded)
+    when ``cancel`` fires.
+
+    Usage:
+        with acquire_pipeline("a") as pipeline:
+            for gs, ps, audio in pipeline(text, voice=voice_path):
+                ...
+    """
+    return _get_pool(lang).acquire(timeout, cancel)
+
+
+def build_model(
+    model_path: str,
+    device: str,
+    lang: str = "a",
+    compiled: bool = False,
+    backend: str = "torch",
+    onnx_path: str = "kokoro.onnx",
+    onnx_threads: Optional[int] = None,
+    threads: ThreadSetting = DEFAULT_THREADS,
+) -> KPipeline:
+    """Build and return the Kokoro pipeline with proper encoding configuration
+
+    Safe to call from several threads: the first caller builds the pipeline and
+    the others wait for it and receive the same instance.
+
+    Set ``compiled`` to run the model through torch.compile (see compile_pipeline).
+    Set ``backend="onnx"`` to run the acoustic model from ``onnx_path`` through
+    onnxruntime with ``onnx_threads`` intra-op threads (see onnx_backend.py).
+    Set ``threads`` to an int or "auto" to fix or tune torch's CPU thread
+    counts for MAX_CONCURRENCY concurrent requests (see autotune.py).
+    """
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+    with _init_lock:
+        if _pipeline is not None:
+            return _pipeline
         try:
             # Patch json loading before initializing pipeline
             patch_json_load()
 
             # Download model if it doesn't exist
-            if model_path is None or "":
+            if not model_path:
                 model_path = "kokoro-v1_0.pth"
 
             if not os.path.exists(model_path):
@@ -271,29 +577,48 @@ def build_model(model_path: str, device: str, lang: str = "a") -> KPipeline:
 
             # Download voice files
             downloaded_voices = download_voice_files()
+            get_voice_registry().refresh()
 
             if not downloaded_voices:
                 logging.debug("Error: No voice files available. Cannot proceed.")
                 raise ValueError("No voice files available")
 
+            # Load the model weights once; every language pipeline shares them
+            if backend == "onnx":
+                from onnx_backend import OnnxKModel
+
+                if not os.path.exists(config_path):
+                    from huggingface_hub import hf_hub_download
+
+                    config_path = hf_hub_download(
+                        repo_id="hexgrad/Kokoro-82M",
+                        filename="config.json",
+                        local_dir=".",
+                    )
+                shared_model = OnnxKModel(
+                    onnx_path, load_config(config_path)["vocab"], onnx_threads
+                )
+            else:
+                shared_model = (
+                    KModel(repo_id="hexgrad/Kokoro-82M", model=model_path)
+                    .to(device)
+                    .eval()
+                )
+
             # Initialize pipeline with American English by default
-            _pipeline = KPipeline(lang_code=lang)
-            if _pipeline is None:
+            pipeline = _new_pipeline(lang, shared_model, {})
+            if pipeline is None:
                 raise ValueError("Failed to initialize KPipeline - pipeline is None")
 
             # Store device parameter for reference in other operations
-            _pipeline.device = device
-
-            # Initialize voices dictionary if it doesn't exist
-            if not hasattr(_pipeline, "voices"):
-                _pipeline.voices = {}
+            pipeline.device = device
 
             # Try to load the first available voice
             for voice_file in downloaded_voices:
                 voice_path = f"voices/{voice_file}"
                 if os.path.exists(voice_path):
                     try:
-                        _pipeline.load_voice(voice_path)
+                        pipeline.load_voice(voice_path)
                         logging.debug(f"Successfully loaded voice: {voice_file}")
                         break  # Successfully loaded a voice
                     except Exception as e:
@@ -302,6 +627,19 @@ def build_model(model_path: str, device: str, lang: str = "a") -> KPipeline:
                         )
                         continue
 
+            if compiled and backend == "torch":
+                compile_pipeline(pipeline, model_path)
+
+            if threads is not None and backend == "torch":
+                # Only CPU inference is worth tuning; explicit counts always apply
+                run = _warmup_run(pipeline) if device == "cpu" else None
+                configure_threads(threads, run, MAX_CONCURRENCY)
+
+            # Publish only once fully initialized so readers never see a partial one
+            with _pipelines_lock:
+                _pools[lang] = PipelinePool(pipeline, MAX_CONCURRENCY)
+            _pipeline = pipeline
+
         except Exception as e:
             logging.debug(f"Error initializing pipeline: {e}")
             raise
@@ -310,38 +648,12 @@ def build_model(model_path: str, device: str, lang: str = "a") -> KPipeline:
 
 def list_available_voices() -> List[str]:
     """List all available voice models"""
-    voices_dir = Path("voices")
-
-    # Create voices directory if it doesn't exist
-    if not voices_dir.exists():
-        logging.debug(f"Creating voices directory at {voices_dir.absolute()}")
-        voices_dir.mkdir(exist_ok=True)
-        return []
-
-    # Get all .pt files in the voices directory
-    voice_files = list(voices_dir.glob("*.pt"))
-
-    # If no voice files found in voices directory
-    if not voice_files:
-        logging.debug(f"No voice files found in {voices_dir.absolute()}")
-        # Try to find voice files in the root directory's voices folder
-        root_voices = list(Path(".").glob("voices/*.pt"))
-        if root_voices:
-            logging.debug("Found voice files in root voices directory, moving them...")
-            for voice_file in root_voices:
-                target_path = voices_dir / voice_file.name
-                if not target_path.exists():
-                    shutil.move(str(voice_file), str(target_path))
-            # Recheck voices directory
-            voice_files = list(voices_dir.glob("*.pt"))
-
-    if not voice_files:
+    voices = get_voice_registry().names()
+    if not voices:
         logging.debug(
             "No voice files found. Please run the application again to download voices."
         )
-        return []
-
-    return [f.stem for f in voice_files]
+    return voices
 
 
 def load_voice(voice_name: str, device: str) -> torch.Tensor:
@@ -349,10 +661,197 @@ def load_voice(voice_name: str, device: str) -> torch.Tensor:
     pipeline = build_model("", device)
     # Format voice path correctly - strip .pt if it was included
     voice_name = voice_name.replace(".pt", "")
+    info = get_voice_registry().get(voice_name)
+    if info is None:
+        raise ValueError(f"Voice file not found: voices/{voice_name}.pt")
+    return pipeline.load_voice(info.path)
+
+
+def _prepare_voice(model: KPipeline, voice: str, device: str) -> Tuple[str, str]:
+    """Validate a voice and make sure it is loaded, returning (name, path)"""
+    if model is None:
+        raise ValueError("Model is None - pipeline not properly initialized")
+
+    # Initialize voices dictionary if it doesn't exist
+    if not hasattr(model, "voices"):
+        model.voices = {}
+
+    # Ensure device is set
+    if not hasattr(model, "device"):
+        model.device = device
+
+    # Format voice path; loaded voices and the registry avoid filesystem calls
+    voice_name = voice.replace(".pt", "")
     voice_path = f"voices/{voice_name}.pt"
-    if not os.path.exists(voice_path):
+    if voice_name in model.voices:
+        return voice_name, voice_path
+    if voice_name not in get_voice_registry():
         raise ValueError(f"Voice file not found: {voice_path}")
-    return pipeline.load_voice(voice_path)
+
+    # Ensure voice is loaded before generating
+    if voice_name not in model.voices:
+        logging.debug(f"Loading voice {voice_name}...")
+        model.load_voice(voice_path)
+
+    if voice_name not in model.voices:
+        raise ValueError(f"Failed to load voice {voice_name}")
+    return voice_name, voice_path
+
+
+def preload_voices(model: KPipeline, voices, device: str = "cpu"):
+    """Load several voices up front so synthesis never waits on disk"""
+    for voice in voices:
+        _prepare_voice(model, voice, device)
+
+
+def _iter_results(
+    model: KPipeline,
+    text: str,
+    voice: str,
+    device: str,
+    speed: float,
+    cancel: Optional[CancelToken] = None,
+) -> Iterator["KPipeline.Result"]:
+    """Yield the pipeline's Result for every segment that produced audio
+
+    The cancel token is checked before each segment is synthesized. A pooled
+    pipeline is checked out for each chunk's synthesis and returned before
+    the chunk's results are yielded, so a slow consumer never holds one.
+    """
+    check(cancel)
+    voice_name, voice_path = _prepare_voice(model, voice, device)
+
+    # Route through the G2P frontend matching the voice's language, checking
+    # out a pipeline so concurrent requests never share a G2P frontend
+    lang = lang_from_voice(voice_name, model.lang_code)
+    text = normalize_text(text, lang)
+    if _pipeline is not None and getattr(model, "model", None) is _pipeline.model:
+
+        def checkout():
+            return acquire_pipeline(lang, cancel=cancel)
+
+    else:
+
+        def checkout():
+            return nullcontext(model)
+
+    cast_speed: Number = cast(Number, speed)
+    for chunk in iter_chunks(text):
+        yield from _synthesize_chunk(checkout, chunk, voice_path, cast_speed, cancel)
+
+
+def _synthesize_chunk(
+    checkout: Callable[[], ContextManager[KPipeline]],
+    chunk: str,
+    voice_path: str,
+    speed: Number,
+    cancel: Optional[CancelToken] = None,
+) -> Iterator["KPipeline.Result"]:
+    """Synthesize one bounded chunk, re-splitting it if its phonemes overflow
+
+    Results are held until the whole chunk has been checked, so a chunk that
+    has to be re-split never yields partial audio.
+    """
+    guard = get_memory_guard()
+    if guard is not None and estimate_bytes(chunk) > guard.budget:
+        halves = halve(chunk)
+        if len(halves) > 1:
+            for part in halves:
+                yield from _synthesize_chunk(checkout, part, voice_path, speed, cancel)
+            return
+    reservation = (
+        guard.reserve(estimate_bytes(chunk), cancel.remaining() if cancel else None)
+        if guard is not None
+        else nullcontext()
+    )
+    results = []
+    parts: Optional[List[str]] = None
+    with reservation, checkout() as pipeline:
+        logging.debug(f"Generating speech with device: {pipeline.device}")
+        generator = pipeline(
+            chunk, voice=voice_path, speed=speed, split_pattern=None
+        )
+        for result in generator:
+            check(cancel)
+            # Non-English pipelines truncate at the model limit instead of splitting
+            if len(result.phonemes or "") >= MAX_PHONEMES:
+                halves = halve(chunk)
+                if len(halves) > 1:
+                    logging.debug(f"Re-splitting overflowing segment: {chunk[:40]}...")
+                    parts = halves
+                    break
+                logging.debug(f"Warning: segment may be truncated: {chunk[:40]}...")
+            results.append(result)
+    if parts is None:
+        yield from (result for result in results if result.audio is not None)
+        return
+    for part in parts:
+        yield from _synthesize_chunk(checkout, part, voice_path, speed, cancel)
+
+
+def stream_speech(
+    model: KPipeline,
+    text: str,
+    voice: str,
+    device: str = "cpu",
+    speed: float = 1.0,
+    prompts: bool = True,
+    cancel: Optional[CancelToken] = None,
+) -> Iterator[Tuple[str, str, torch.Tensor]]:
+    """Generate speech segment by segment
+
+    Yields (graphemes, phonemes, audio) for every segment as soon as it is
+    synthesized. Errors are raised rather than swallowed. A pooled pipeline
+    is only checked out while a chunk is being synthesized. Text found
+    in the prompt pack (see prompt_pack.py) is answered from the pack as a
+    single segment with empty phonemes, unless prompts is False. A cancelled
+    cancel token raises Cancelled at the next segment boundary.
+    """
+    check(cancel)
+    if prompts:
+        audio = lookup_prompt(text, voice, speed)
+        if audio is not None:
+            yield text, "", torch.from_numpy(audio)
+            return
+
+    for result in _iter_results(model, text, voice, device, speed, cancel):
+        audio = result.audio
+        # Convert numpy arrays to tensors if needed
+        if isinstance(audio, np.ndarray):
+            audio = torch.from_numpy(audio).float()
+        yield result.graphemes, result.phonemes, audio
+
+
+def generate_speech_with_alignment(
+    model: KPipeline,
+    text: str,
+    voice: str,
+    device: str = "cpu",
+    speed: float = 1.0,
+    cancel: Optional[CancelToken] = None,
+) -> Tuple[List[torch.Tensor], Alignment]:
+    """Generate speech along with word timings from the predicted durations
+
+    Returns:
+        Tuple of (audio segments, Alignment covering their concatenation)
+    """
+    all_audio = []
+    alignment = Alignment()
+    vocab = getattr(getattr(model, "model", None), "vocab", None)
+    for result in _iter_results(model, text, voice, device, speed, cancel):
+        audio = result.audio
+        if isinstance(audio, np.ndarray):
+            audio = torch.from_numpy(audio).float()
+        all_audio.append(audio)
+        alignment.add_segment(
+            result.graphemes,
+            result.phonemes,
+            len(audio),
+            tokens=result.tokens,
+            pred_dur=result.pred_dur,
+            vocab=vocab,
+        )
+    return all_audio, alignment
 
 
 def generate_speech(
@@ -361,6 +860,8 @@ def generate_speech(
     voice: str,
     device: str = "cpu",
     speed: float = 1.0,
+    stretch: bool = False,
+    cancel: Optional[CancelToken] = None,
 ) -> Tuple[Optional[List[torch.Tensor]], Optional[str], Optional[str]]:
     """Generate speech using the Kokoro pipeline
 
@@ -370,57 +871,48 @@ def generate_speech(
         voice: Voice name (e.g. 'af_bella')
         device: Device to use ('cuda' or 'cpu')
         speed: Speech speed multiplier (default: 1.0)
+        stretch: Derive speeds within MAX_STRETCH of 1.0 by time-stretching
+            cached speed-1.0 audio instead of running the model again
+        cancel: Token checked between segments; Cancelled is raised, not
+            swallowed, when it fires
 
     Returns:
-        Tuple of (audio tensor, phonemes string) or (None, None) on error
+        Tuple of (audio segments, phonemes, graphemes) for the whole text,
+        with phonemes and graphemes of the first segment, or
+        (None, None, None) on error
     """
-    try:
-        if model is None:
-            raise ValueError("Model is None - pipeline not properly initialized")
-
-        # Initialize voices dictionary if it doesn't exist
-        if not hasattr(model, "voices"):
-            model.voices = {}
-
-        # Ensure device is set
-        if not hasattr(model, "device"):
-            model.device = device
-
-        # Format voice path and ensure voice is loaded
-        voice_name = voice.replace(".pt", "")
-        voice_path = f"voices/{voice_name}.pt"
-        if not os.path.exists(voice_path):
-            raise ValueError(f"Voice file not found: {voice_path}")
-
-        # Ensure voice is loaded before generating
-        if voice_name not in model.voices:
-            logging.debug(f"Loading voice {voice_name}...")
-            model.load_voice(voice_path)
-
-        if voice_name not in model.voices:
-            raise ValueError(f"Failed to load voice {voice_name}")
-
-        cast_speed: Number = cast(Number, speed)
-        # Generate speech with the new API
-        logging.debug(f"Generating speech with device: {model.device}")
-        generator = model(
-            text, voice=voice_path, speed=cast_speed, split_pattern=r"\n+"
-        )
+    if stretch and can_stretch(speed):
+        key = (text, voice.replace(".pt", ""))
+        base = _stretch_cache.get(key)
+        if base is None:
+            base = generate_speech(model, text, voice, device, 1.0, cancel=cancel)
+            if base[0] is None:
+                return base
+            _stretch_cache.put(key, base)
+        base_audio, ps, gs = base
+        if speed == 1.0:
+            return list(base_audio), ps, gs
+        stretched = [
+            torch.from_numpy(time_stretch(audio.numpy(), speed))
+            for audio in base_audio
+        ]
+        return stretched, ps, gs
 
-        # Get first generated segment and convert numpy array to tensor if needed
+    try:
         all_audio = []
-        for gs, ps, audio in generator:
-            if audio is not None:
-                if isinstance(audio, np.ndarray):
-                    audio = torch.from_numpy(audio).float()
-                all_audio.append(audio)
-                return (
-                    all_audio,
-                    ps if isinstance(ps, str) else None,
-                    gs if isinstance(gs, str) else None,
-                )
-        # TODO: check if this is the correct return location
-
+        first_ps = first_gs = None
+        for gs, ps, audio in stream_speech(
+            model, text, voice, device, speed, cancel=cancel
+        ):
+            if not all_audio:
+                first_ps = ps if isinstance(ps, str) else None
+                first_gs = gs if isinstance(gs, str) else None
+            all_audio.append(audio)
+        if all_audio:
+            return all_audio, first_ps, first_gs
+
+    except Cancelled:
+        raise
     except Exception as e:
         logging.debug(f"Error generating speech: {e}")
     return None, None, None
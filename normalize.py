@@ -0,0 +1,340 @@
+"""Text normalization for Kokoro TTS Local
+
+Expands numbers, currencies, percentages, dates, times, URLs and email
+addresses into words before the text reaches G2P. Each language has one
+precompiled regex that alternates between all of its rules, so the text is
+scanned once, and every matched token is expanded through an LRU cache.
+
+Run this module directly for a quick per-character timing benchmark:
+    python normalize.py
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Pattern, Tuple
+
+# num2words language for each voice language code
+NUM2WORDS_LANGS = {
+    "a": "en",
+    "b": "en",
+    "e": "es",
+    "f": "fr",
+    "h": "hi",
+    "i": "it",
+    "j": "ja",
+    "p": "pt_BR",
+    "z": "zh",
+}
+
+CURRENCIES = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "₹": "INR"}
+# Used when num2words has no forms for a currency in the language
+CURRENCY_NAMES = {
+    "USD": ("dollar", "dollars"),
+    "EUR": ("euro", "euros"),
+    "GBP": ("pound", "pounds"),
+    "JPY": ("yen", "yen"),
+    "INR": ("rupee", "rupees"),
+}
+MAGNITUDES = r"thousand|million|billion|trillion"
+
+# Words spoken for symbols, per language code; English is the fallback
+SPOKEN_WORDS: Dict[str, Dict[str, str]] = {
+    "a": {"point": "point", "minus": "minus", "dot": "dot", "slash": "slash",
+          "at": "at", "percent": "percent"},
+    "e": {"point": "coma", "minus": "menos", "dot": "punto", "slash": "barra",
+          "at": "arroba", "percent": "por ciento"},
+    "f": {"point": "virgule", "minus": "moins", "dot": "point", "slash": "slash",
+          "at": "arobase", "percent": "pour cent"},
+    "h": {"point": "दशमलव", "minus": "ऋण", "dot": "डॉट", "slash": "स्लैश",
+          "at": "एट", "percent": "प्रतिशत"},
+    "i": {"point": "virgola", "minus": "meno", "dot": "punto", "slash": "barra",
+          "at": "chiocciola", "percent": "percento"},
+    "j": {"point": "点", "minus": "マイナス", "dot": "ドット", "slash": "スラッシュ",
+          "at": "アット", "percent": "パーセント"},
+    "p": {"point": "vírgula", "minus": "menos", "dot": "ponto", "slash": "barra",
+          "at": "arroba", "percent": "por cento"},
+    "z": {"point": "点", "minus": "负", "dot": "点", "slash": "斜杠",
+          "at": "艾特", "percent": "百分之"},
+}
+# Languages that say the percent word before the number
+PERCENT_FIRST = {"z"}
+
+# Misaki reads plain integers (years included) well, so English G2P gets
+# them as digits; spelling them out only adds commas and pauses
+G2P_READS_INTEGERS = {"a", "b"}
+# Languages where num2words' year form is the usual reading; Japanese gives
+# era names and others have no year form, so they read years as cardinals
+YEAR_LANGS = {"a", "b", "e", "f", "i", "p"}
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December",
+]
+
+NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+# A final "." after am/pm is kept when it ends the sentence
+TIME = (
+    r"\b\d{1,2}:\d{2}"
+    r"(?:\s?[ap]\.?m\b(?:\.(?!\s+(?-i:[A-Z])|\s*$))?)?(?=\W|$)"
+)
+
+# Rules shared by every language, in priority order
+COMMON_RULES: List[Tuple[str, str]] = [
+    ("url", r"\b(?:https?://|www\.)[^\s<>\"]+[^\s<>\".,;:!?)]"),
+    ("email", r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b"),
+    ("currency", rf"[$€£¥₹](?:{NUMBER})(?:\s(?:{MAGNITUDES})\b)?"),
+    ("percent", rf"-?(?:{NUMBER})%"),
+]
+
+# Extra rules per language code, tried after the common ones
+LANGUAGE_RULES: Dict[str, List[Tuple[str, str]]] = {
+    "a": [
+        ("iso_date", r"\b\d{4}-\d{2}-\d{2}\b"),
+        ("us_date", r"\b\d{1,2}/\d{1,2}/\d{4}\b"),
+        ("time", TIME),
+        ("ordinal", r"\b\d+(?:st|nd|rd|th)\b"),
+    ],
+    "b": [
+        ("iso_date", r"\b\d{4}-\d{2}-\d{2}\b"),
+        ("eu_date", r"\b\d{1,2}/\d{1,2}/\d{4}\b"),
+        ("time", TIME),
+        ("ordinal", r"\b\d+(?:st|nd|rd|th)\b"),
+    ],
+}
+
+# Dotted numbers such as versions, hyphenated digit groups such as phone
+# numbers, years, then plain numbers go last so the more specific rules win.
+# Numbers next to ":" are left alone, so languages without a time rule pass
+# times to G2P unchanged.
+NUMBER_RULES = [
+    ("version", r"(?<![\w.])\d+(?:\.\d+){2,}\b"),
+    ("digits", r"(?<![\w-])(?:\d{3}-\d{4}|\d{3,4}-\d{3}-\d{3,4})(?![\w-])"),
+    ("year", r"(?<![\w.,:-])(?:1\d{3}|20\d{2})\b(?![.,:]\d)"),
+    ("number", rf"(?<![\w.:])-?(?:{NUMBER})\b(?![.:]\d)"),
+]
+
+
+def spoken_word(key: str, lang: str) -> str:
+    """Return the word for a symbol such as "minus" or "dot" in a language"""
+    return SPOKEN_WORDS.get(lang, SPOKEN_WORDS["a"])[key]
+
+
+def _num2words(value, lang: str, **kwargs) -> str:
+    from num2words import num2words
+
+    try:
+        return num2words(value, lang=NUM2WORDS_LANGS.get(lang, "en"), **kwargs)
+    except (NotImplementedError, OverflowError, KeyError):
+        return num2words(value, lang="en", **kwargs)
+
+
+def _parse_number(token: str):
+    token = token.replace(",", "")
+    return float(token) if "." in token else int(token)
+
+
+def number_to_words(token: str, lang: str = "a", to: str = "cardinal") -> str:
+    """Spell out a number token such as '1,234.5' or '-7'
+
+    Digits after the decimal point are read one by one, so '3.10' keeps its
+    trailing zero.
+    """
+    whole, _, fraction = token.replace(",", "").partition(".")
+    if not whole.isdigit() or (fraction and not fraction.isdigit()):
+        return token
+    words = _num2words(int(whole), lang, to=to)
+    if not fraction or to != "cardinal":
+        return words
+    digits = " ".join(_num2words(int(digit), lang) for digit in fraction)
+    return f"{words} {spoken_word('point', lang)} {digits}"
+
+
+def _expand_url(token: str, lang: str) -> str:
+    token = re.sub(r"^https?://", "", token)
+    dot, slash = spoken_word("dot", lang), spoken_word("slash", lang)
+    token = token.replace(".", f" {dot} ").replace("/", f" {slash} ")
+    return re.sub(r"\s+", " ", token).strip()
+
+
+def _expand_email(token: str, lang: str) -> str:
+    user, domain = token.split("@", 1)
+    dot = spoken_word("dot", lang)
+    return f"{user} {spoken_word('at', lang)} {domain.replace('.', f' {dot} ')}"
+
+
+def _currency_name(code: str, lang: str, plural: bool) -> str:
+    from num2words import CONVERTER_CLASSES
+
+    converter = CONVERTER_CLASSES.get(NUM2WORDS_LANGS.get(lang, "en"))
+    forms = getattr(converter, "CURRENCY_FORMS", {}).get(code)
+    forms = forms[0] if forms else CURRENCY_NAMES.get(code, (code, code))
+    return forms[1 if plural else 0]
+
+
+def _expand_currency(token: str, lang: str) -> str:
+    code = CURRENCIES[token[0]]
+    amount, _, magnitude = token[1:].partition(" ")
+    if magnitude:
+        # "$1.5 million" reads as "one point five million dollars"
+        words = number_to_words(amount, lang)
+        return f"{words} {magnitude.lower()} {_currency_name(code, lang, True)}"
+    value = _parse_number(amount)
+    if isinstance(value, float) and value != int(value):
+        try:
+            # num2words splits a float into units and cents
+            return _num2words(value, lang, to="currency", currency=code)
+        except Exception:
+            pass
+    words = number_to_words(amount.partition(".")[0], lang)
+    return f"{words} {_currency_name(code, lang, int(value) != 1)}"
+
+
+def _expand_percent(token: str, lang: str) -> str:
+    words = _spell_number(token[:-1], lang)
+    if lang in PERCENT_FIRST:
+        return f"{spoken_word('percent', lang)}{words}"
+    return f"{words} {spoken_word('percent', lang)}"
+
+
+def _say_date(year: int, month: int, day: int, lang: str) -> str:
+    if not 1 <= month <= 12:
+        raise ValueError(f"Invalid month: {month}")
+    day_words = _num2words(day, lang, to="ordinal")
+    return f"{MONTHS[month - 1]} {day_words}, {_num2words(year, lang, to='year')}"
+
+
+def _expand_iso_date(token: str, lang: str) -> str:
+    year, month, day = (int(part) for part in token.split("-"))
+    return _say_date(year, month, day, lang)
+
+
+def _expand_us_date(token: str, lang: str) -> str:
+    month, day, year = (int(part) for part in token.split("/"))
+    return _say_date(year, month, day, lang)
+
+
+def _expand_eu_date(token: str, lang: str) -> str:
+    day, month, year = (int(part) for part in token.split("/"))
+    return _say_date(year, month, day, lang)
+
+
+def _expand_time(token: str, lang: str) -> str:
+    match = re.match(r"(\d{1,2}):(\d{2})\s?([ap])?", token, re.IGNORECASE)
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    suffix = f" {match.group(3).lower()} m" if match.group(3) else ""
+    if minutes == 0:
+        spoken = "o'clock" if suffix == "" else ""
+    elif minutes < 10:
+        spoken = f"oh {_num2words(minutes, lang)}"
+    else:
+        spoken = _num2words(minutes, lang)
+    return f"{_num2words(hours, lang)} {spoken}".strip() + suffix
+
+
+def _expand_ordinal(token: str, lang: str) -> str:
+    return _num2words(int(token[:-2]), lang, to="ordinal")
+
+
+def _expand_version(token: str, lang: str) -> str:
+    point = spoken_word("point", lang)
+    return f" {point} ".join(_num2words(int(part), lang) for part in token.split("."))
+
+
+def _expand_digits(token: str, lang: str) -> str:
+    """Read each group of a phone number digit by digit"""
+    return ", ".join(
+        " ".join(_num2words(int(digit), lang) for digit in group)
+        for group in token.split("-")
+    )
+
+
+def _expand_year(token: str, lang: str) -> str:
+    if lang in G2P_READS_INTEGERS:
+        return token
+    if lang in YEAR_LANGS:
+        return _num2words(int(token), lang, to="year")
+    return _num2words(int(token), lang)
+
+
+def _spell_number(token: str, lang: str) -> str:
+    words = number_to_words(token.lstrip("-"), lang)
+    if token.startswith("-"):
+        return f"{spoken_word('minus', lang)} {words}"
+    return words
+
+
+def _expand_number(token: str, lang: str) -> str:
+    if lang in G2P_READS_INTEGERS and token.replace(",", "").isdigit():
+        return token
+    return _spell_number(token, lang)
+
+
+EXPANDERS: Dict[str, Callable[[str, str], str]] = {
+    "url": _expand_url,
+    "email": _expand_email,
+    "currency": _expand_currency,
+    "percent": _expand_percent,
+    "iso_date": _expand_iso_date,
+    "us_date": _expand_us_date,
+    "eu_date": _expand_eu_date,
+    "time": _expand_time,
+    "ordinal": _expand_ordinal,
+    "version": _expand_version,
+    "digits": _expand_digits,
+    "year": _expand_year,
+    "number": _expand_number,
+}
+
+
+@lru_cache(maxsize=None)
+def _compiled_rules(lang: str) -> Pattern:
+    """Compile the alternation of all rules for a language once"""
+    rules = COMMON_RULES + LANGUAGE_RULES.get(lang, []) + NUMBER_RULES
+    return re.compile(
+        "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules), re.IGNORECASE
+    )
+
+
+@lru_cache(maxsize=8192)
+def expand_token(kind: str, token: str, lang: str) -> str:
+    """Expand one matched token, memoized across calls"""
+    try:
+        return EXPANDERS[kind](token, lang)
+    except Exception:
+        return token
+
+
+def normalize_text(text: str, lang: str = "a") -> str:
+    """Expand numbers, currencies, dates, times, URLs and emails into words
+
+    Args:
+        text: Raw input text
+        lang: Pipeline language code (see models.lang_from_voice)
+    """
+    if "www." not in text.lower() and not any(
+        ch.isdigit() or ch in "@/:" for ch in text
+    ):
+        return text
+    pattern = _compiled_rules(lang)
+    return pattern.sub(
+        lambda m: expand_token(m.lastgroup, m.group(0), lang), text
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    sample = (
+        "On 2024-03-15 at 9:30 am, revenue rose 12.5% to $1,234,567.89 "
+        "(see https://example.com/report or mail info@example.com). "
+        "The 3rd quarter had 42 new customers and 7 returns.\n"
+    ) * 200
+    normalize_text(sample)  # warm the caches
+    start = time.perf_counter()
+    rounds = 20
+    for _ in range(rounds):
+        normalize_text(sample)
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{len(sample)} chars in {elapsed * 1000:.2f} ms")
+    print(f"{elapsed / len(sample) * 1e9:.1f} ns per character")
+    print(normalize_text(sample.splitlines()[0]))
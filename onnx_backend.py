@@ -0,0 +1,232 @@
+"""ONNX export and ONNX Runtime backend for Kokoro TTS Local
+
+Usage:
+    python onnx_backend.py export --output kokoro.onnx
+    python onnx_backend.py parity --onnx kokoro.onnx --voice af_bella
+
+The parity command exits with status 1 when the ONNX audio drifts from the
+torch audio by more than the thresholds (see parity_failures).
+"""
+
+import argparse
+import logging
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+from kokoro.model import KModel
+
+DEFAULT_ONNX_PATH = "kokoro.onnx"
+DEFAULT_OPSET = 17
+REPO_ID = "hexgrad/Kokoro-82M"
+# Parity thresholds: one predicted duration frame is 600 samples at 24 kHz
+MIN_CORRELATION = 0.99
+FRAME_SAMPLES = 600
+
+
+class _ExportWrapper(torch.nn.Module):
+    """Expose KModel.forward_with_tokens as a plain forward for tracing"""
+
+    def __init__(self, model: KModel):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, ref_s, speed):
+        return self.model.forward_with_tokens(input_ids, ref_s, speed)
+
+
+def export_onnx(
+    output_path: str = DEFAULT_ONNX_PATH,
+    model_path: Optional[str] = None,
+    opset: int = DEFAULT_OPSET,
+) -> str:
+    """Export the Kokoro acoustic model to ONNX
+
+    Args:
+        output_path: Where to write the ONNX graph
+        model_path: Local checkpoint (downloaded from Hugging Face if None)
+        opset: ONNX opset version
+
+    Returns:
+        Path to the exported model
+    """
+    # The complex STFT is not exportable, so use the real-valued variant
+    model = KModel(repo_id=REPO_ID, model=model_path, disable_complex=True).eval()
+    wrapper = _ExportWrapper(model).eval()
+
+    input_ids = torch.LongTensor([[0, *range(1, 49), 0]])
+    ref_s = torch.randn(1, 256)
+    speed = torch.tensor([1.0], dtype=torch.float32)
+
+    logging.debug(f"Exporting ONNX model to {output_path}...")
+    torch.onnx.export(
+        wrapper,
+        (input_ids, ref_s, speed),
+        output_path,
+        input_names=["input_ids", "ref_s", "speed"],
+        output_names=["waveform", "duration"],
+        dynamic_axes={
+            "input_ids": {1: "tokens"},
+            "waveform": {0: "samples"},
+            "duration": {0: "tokens"},
+        },
+        opset_version=opset,
+        do_constant_folding=True,
+    )
+    logging.debug(f"ONNX model exported to {output_path}")
+    return output_path
+
+
+class OnnxKModel:
+    """Drop-in replacement for KModel that runs inference through onnxruntime
+
+    KPipeline only needs ``device`` and a ``KModel``-compatible call, so G2P
+    and voice-pack handling stay in the pipeline unchanged.
+    """
+
+    device = "cpu"
+
+    def __init__(
+        self,
+        onnx_path: str,
+        vocab: Dict[str, int],
+        num_threads: Optional[int] = None,
+        context_length: int = 512,
+    ):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            onnx_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.vocab = vocab
+        self.context_length = context_length
+
+    def __call__(
+        self,
+        phonemes: str,
+        ref_s: torch.FloatTensor,
+        speed: float = 1,
+        return_output: bool = False,
+    ):
+        input_ids = [self.vocab[p] for p in phonemes if p in self.vocab]
+        if len(input_ids) + 2 > self.context_length:
+            raise ValueError(
+                f"Phoneme sequence too long: "
+                f"{len(input_ids) + 2} > {self.context_length}"
+            )
+        waveform, duration = self.session.run(
+            None,
+            {
+                "input_ids": np.array([[0, *input_ids, 0]], dtype=np.int64),
+                "ref_s": ref_s.detach().cpu().numpy().astype(np.float32),
+                "speed": np.array([speed], dtype=np.float32),
+            },
+        )
+        audio = torch.from_numpy(waveform).squeeze()
+        pred_dur = torch.from_numpy(duration).long()
+        if return_output:
+            return KModel.Output(audio=audio, pred_dur=pred_dur)
+        return audio
+
+
+def check_parity(
+    onnx_path: str = DEFAULT_ONNX_PATH,
+    voice: str = "af_bella",
+    text: str = "Hello, welcome to this text-to-speech test.",
+    model_path: Optional[str] = None,
+) -> Dict[str, float]:
+    """Synthesize the same text with both backends and compare the audio"""
+    from kokoro import KPipeline
+    from models import load_config
+
+    torch_pipeline = KPipeline(
+        lang_code=voice[0], model=KModel(repo_id=REPO_ID, model=model_path).eval()
+    )
+    onnx_pipeline = KPipeline(lang_code=voice[0], model=False)
+    onnx_pipeline.model = OnnxKModel(onnx_path, load_config("config.json")["vocab"])
+
+    voice_path = f"voices/{voice}.pt"
+    expected = torch.cat(
+        [r.audio for r in torch_pipeline(text, voice=voice_path) if r.audio is not None]
+    ).numpy()
+    actual = torch.cat(
+        [r.audio for r in onnx_pipeline(text, voice=voice_path) if r.audio is not None]
+    ).numpy()
+
+    n = min(len(expected), len(actual))
+    diff = np.abs(expected[:n] - actual[:n])
+    return {
+        "torch_samples": float(len(expected)),
+        "onnx_samples": float(len(actual)),
+        "max_abs_diff": float(diff.max()) if n else 0.0,
+        "mean_abs_diff": float(diff.mean()) if n else 0.0,
+        "correlation": float(np.corrcoef(expected[:n], actual[:n])[0, 1]) if n else 0.0,
+    }
+
+
+def parity_failures(
+    stats: Dict[str, float],
+    min_correlation: float = MIN_CORRELATION,
+    max_length_diff: int = FRAME_SAMPLES,
+) -> List[str]:
+    """Return why the check_parity statistics fail, or an empty list"""
+    failures = []
+    if not stats["correlation"] >= min_correlation:
+        failures.append(
+            f"correlation {stats['correlation']:.4f} is below {min_correlation}"
+        )
+    length_diff = abs(stats["torch_samples"] - stats["onnx_samples"])
+    if length_diff > max_length_diff:
+        failures.append(
+            f"lengths differ by {int(length_diff)} samples, "
+            f"more than {max_length_diff}"
+        )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kokoro ONNX tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Export the model to ONNX")
+    export.add_argument("--output", default=DEFAULT_ONNX_PATH)
+    export.add_argument("--model", default=None, help="Local .pth checkpoint")
+    export.add_argument("--opset", type=int, default=DEFAULT_OPSET)
+
+    parity = sub.add_parser("parity", help="Compare ONNX output against torch")
+    parity.add_argument("--onnx", default=DEFAULT_ONNX_PATH)
+    parity.add_argument("--voice", default="af_bella")
+    parity.add_argument("--model", default=None, help="Local .pth checkpoint")
+    parity.add_argument("--min-correlation", type=float, default=MIN_CORRELATION)
+    parity.add_argument(
+        "--max-length-diff",
+        type=int,
+        default=FRAME_SAMPLES,
+        help="Allowed length difference in samples",
+    )
+
+    args = parser.parse_args()
+    if args.command == "export":
+        print(f"Exported to {export_onnx(args.output, args.model, args.opset)}")
+    elif args.command == "parity":
+        stats = check_parity(args.onnx, args.voice, model_path=args.model)
+        for key, value in stats.items():
+            print(f"{key}: {value}")
+        failures = parity_failures(stats, args.min_correlation, args.max_length_diff)
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if failures:
+            return 1
+        print("Parity OK")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
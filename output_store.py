@@ -0,0 +1,186 @@
+"""Content-addressed output store for the Kokoro TTS web interface
+
+Generated files are named after a hash of the request (text, voice, speed,
+format), so names never collide and an identical request reuses the file
+that is already on disk. Request metadata lives in a small SQLite index,
+which also drives eviction: entries unused for longer than the TTL are
+removed, then the least recently used ones until the store fits its size
+budget. Entries used within the last MIN_AGE seconds are never evicted, so a
+path that was just written or returned stays valid while it is served; an
+entry larger than the whole budget is kept until it ages out.
+
+Example:
+    store = OutputStore("outputs")
+    path = store.get(text, voice, speed, "wav")
+    if path is None:
+        with store.write(text, voice, speed, "wav") as tmp_path:
+            sf.write(tmp_path, audio, 24000, format="WAV")
+        path = store.get(text, voice, speed, "wav")
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+INDEX_NAME = "index.sqlite3"
+DEFAULT_TTL = float(os.environ.get("KOKORO_OUTPUT_TTL", 7 * 24 * 3600))
+DEFAULT_MAX_BYTES = int(float(os.environ.get("KOKORO_OUTPUT_MAX_MB", 1024)) * 2**20)
+MIN_AGE = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    format TEXT NOT NULL,
+    voice TEXT NOT NULL,
+    speed REAL NOT NULL,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS outputs_last_access ON outputs (last_access);
+"""
+
+
+def request_key(text: str, voice: str, speed: float, format: str) -> str:
+    """Hash identifying a request's output file"""
+    payload = json.dumps([text, voice, round(float(speed), 3), format])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class OutputStore:
+    """Directory of generated files indexed by request hash"""
+
+    def __init__(
+        self,
+        root="outputs",
+        ttl: Optional[float] = DEFAULT_TTL,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.root / INDEX_NAME, check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def path_for(self, text: str, voice: str, speed: float, format: str) -> Path:
+        key = request_key(text, voice, speed, format)
+        # Two-level fan-out keeps directory listings short
+        return self.root / key[:2] / f"{key}.{format}"
+
+    def get(self, text: str, voice: str, speed: float, format: str) -> Optional[str]:
+        """Return the stored file for a request, or None"""
+        key = request_key(text, voice, speed, format)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT path FROM outputs WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if not Path(row[0]).exists():
+                self._db.execute("DELETE FROM outputs WHERE key = ?", (key,))
+                return None
+            self._db.execute(
+                "UPDATE outputs SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), key),
+            )
+        return row[0]
+
+    @contextmanager
+    def write(
+        self, text: str, voice: str, speed: float, format: str
+    ) -> Iterator[str]:
+        """Yield a temporary path to write to; it is published on success"""
+        path = self.path_for(text, voice, speed, format)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.partial")
+        try:
+            yield str(tmp)
+            os.replace(tmp, path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        now = time.time()
+        key = request_key(text, voice, speed, format)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO outputs "
+                "(key, path, format, voice, speed, text, size, created, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    str(path),
+                    format,
+                    voice,
+                    float(speed),
+                    text,
+                    path.stat().st_size,
+                    now,
+                    now,
+                ),
+            )
+        self.evict(protect=key)
+
+    def evict(self, protect: Optional[str] = None) -> int:
+        """Drop expired entries, then LRU ones over the size budget
+
+        The key in ``protect`` and entries used within MIN_AGE seconds are
+        kept even if the store stays over budget.
+        """
+        now = time.time()
+        cutoff = now - self.ttl if self.ttl is not None else None
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, path, size, last_access FROM outputs "
+                "ORDER BY last_access"
+            ).fetchall()
+            total = sum(row[2] for row in rows)
+            removed = []
+            for key, path, size, last_access in rows:
+                if last_access > now - MIN_AGE:
+                    break  # rows are ordered by last access
+                if key == protect:
+                    continue
+                expired = cutoff is not None and last_access < cutoff
+                over = self.max_bytes is not None and total > self.max_bytes
+                if not (expired or over):
+                    break
+                removed.append((key, path))
+                total -= size
+            self._db.executemany(
+                "DELETE FROM outputs WHERE key = ?", [(key,) for key, _ in removed]
+            )
+        for _, path in removed:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.debug(f"Could not remove {path}: {e}")
+        return len(removed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size, hits = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) "
+                "FROM outputs"
+            ).fetchone()
+        return {"files": count, "bytes": size, "hits": hits}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
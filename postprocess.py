@@ -0,0 +1,294 @@
+"""Audio post-processing for Kokoro TTS Local
+
+Runs between synthesis and saving, one segment at a time:
+
+1. Trim leading/trailing silence from each segment
+2. Normalize each segment to a target RMS level with a peak ceiling
+3. Join segments with a fixed gap or an equal-power crossfade
+4. Resample the joined stream with a polyphase windowed-sinc filter
+
+Every stage is vectorized NumPy and keeps only a few milliseconds of state
+between segments, so long outputs never need to be buffered whole.
+
+Example:
+    post = PostProcessor(out_rate=16000, gap_ms=150, target_db=-20)
+    for chunk in post.process(segments):
+        ...
+"""
+
+from math import gcd
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SAMPLE_RATE = 24000
+# Where each segment landed: (trim_start, trim_end, output_start) or None
+Layout = List[Optional[Tuple[int, int, int]]]
+
+
+def _db_to_amplitude(db: float) -> float:
+    return float(10.0 ** (db / 20.0))
+
+
+class PolyphaseResampler:
+    """Streaming rational resampler using a Kaiser-windowed sinc filter"""
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int,
+        taps_per_phase: int = 32,
+        beta: float = 8.6,
+        rolloff: float = 0.94,
+    ):
+        divisor = gcd(in_rate, out_rate)
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        self.taps = taps_per_phase
+        num = self.taps * self.up
+
+        # Centre the filter on a multiple of `down` so its group delay is a
+        # whole number of output samples; the unused taps stay zero
+        self._delay = (num - 1) // 2 // self.down
+        centre = self._delay * self.down
+        length = 2 * centre + 1
+
+        # Low-pass at the lower of the two Nyquist rates, in upsampled units
+        cutoff = 0.5 * rolloff / max(self.up, self.down)
+        h = np.zeros(num)
+        h[:length] = 2 * cutoff * np.sinc(2 * cutoff * (np.arange(length) - centre))
+        h[:length] *= np.kaiser(length, beta)
+        # Unity DC gain per phase once zero-stuffing is accounted for
+        h *= self.up / h.sum()
+
+        # phases[p, k] = h[p + k * up], reversed along k to match input windows
+        self.phases = h.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._received = 0  # input samples seen so far
+        self._next = 0  # index of the next output sample
+        self._emitted = 0  # output samples returned, after delay trimming
+
+    def _compute(self, x: np.ndarray) -> np.ndarray:
+        """Produce every output sample computable from the buffered input"""
+        buffered = np.concatenate([self._history, x])
+        # Absolute input index of buffered[0]
+        start = self._received - len(self._history)
+        self._received += len(x)
+        self._history = buffered[len(buffered) - (self.taps - 1):]
+
+        # Output n needs input (n * down) // up, so n < received * up / down
+        count = (self._received * self.up - 1) // self.down - self._next + 1
+        if count <= 0:
+            return np.zeros(0, dtype=np.float32)
+
+        t = (self._next + np.arange(count)) * self.down
+        base = t // self.up
+        windows = sliding_window_view(buffered, self.taps)
+        rows = windows[base - (self.taps - 1) - start]
+        out = np.einsum("ij,ij->i", rows, self.phases[t % self.up])
+        self._next += count
+        return out.astype(np.float32, copy=False)
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Resample a chunk, returning the output that is ready so far"""
+        if self.up == self.down:
+            return x.astype(np.float32, copy=False)
+        out = self._compute(x.astype(np.float32, copy=False))
+        skip = max(0, min(len(out), self._delay - (self._next - len(out))))
+        out = out[skip:]
+        self._emitted += len(out)
+        return out
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining output once the input has ended"""
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        expected = -(-self._received * self.up // self.down)
+        tail = self.process(np.zeros(self.taps, dtype=np.float32))
+        tail = tail[: max(0, expected - (self._emitted - len(tail)))]
+        self.reset()
+        return tail
+
+
+def resample(audio: np.ndarray, in_rate: int, out_rate: int) -> np.ndarray:
+    """Resample a whole clip"""
+    resampler = PolyphaseResampler(in_rate, out_rate)
+    return np.concatenate([resampler.process(audio), resampler.flush()])
+
+
+def trim_silence(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    threshold_db: float = -50.0,
+    pad_ms: float = 20.0,
+    frame_ms: float = 10.0,
+) -> np.ndarray:
+    """Remove leading and trailing frames quieter than threshold_db"""
+    start, end = trim_bounds(audio, sample_rate, threshold_db, pad_ms, frame_ms)
+    return audio[start:end]
+
+
+def trim_bounds(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    threshold_db: float = -50.0,
+    pad_ms: float = 20.0,
+    frame_ms: float = 10.0,
+) -> Tuple[int, int]:
+    """Return the [start, end) range trim_silence keeps"""
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    frames = len(audio) // frame
+    if frames == 0:
+        return 0, len(audio)
+    blocks = audio[: frames * frame].reshape(frames, frame)
+    rms = np.sqrt(np.mean(np.square(blocks, dtype=np.float64), axis=1))
+    loud = np.flatnonzero(rms > _db_to_amplitude(threshold_db))
+    if len(loud) == 0:
+        return 0, 0
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(0, loud[0] * frame - pad)
+    end = min(len(audio), (loud[-1] + 1) * frame + pad)
+    return int(start), int(end)
+
+
+def normalize_loudness(
+    audio: np.ndarray,
+    target_db: float = -20.0,
+    peak_db: float = -1.0,
+    gate_db: float = -60.0,
+    frame: int = 480,
+) -> np.ndarray:
+    """Scale audio to a gated RMS of target_db without exceeding peak_db"""
+    if len(audio) == 0:
+        return audio
+    frames = max(1, len(audio) // frame)
+    blocks = audio[: frames * frame].reshape(frames, -1)
+    power = np.mean(np.square(blocks, dtype=np.float64), axis=1)
+    # Ignore near-silent frames so pauses don't drag the level down
+    gated = power[power > _db_to_amplitude(gate_db) ** 2]
+    if len(gated) == 0:
+        return audio
+    gain = _db_to_amplitude(target_db) / np.sqrt(gated.mean())
+    peak = np.abs(audio).max()
+    if peak > 0:
+        gain = min(gain, _db_to_amplitude(peak_db) / peak)
+    return (audio * gain).astype(np.float32, copy=False)
+
+
+def _equal_power_fades(length: int):
+    t = np.linspace(0.0, np.pi / 2, length, dtype=np.float32)
+    return np.cos(t), np.sin(t)
+
+
+class PostProcessor:
+    """Streaming post-processing of synthesized segments
+
+    Args:
+        in_rate: Sample rate of the synthesized audio
+        out_rate: Sample rate of the output
+        trim: Trim leading/trailing silence from each segment
+        trim_db: Level below which audio counts as silence
+        gap_ms: Silence inserted between segments
+        crossfade_ms: Overlap between segments when gap_ms is 0
+        target_db: RMS level to normalize each segment to (None to disable)
+        peak_db: Peak ceiling applied during normalization
+    """
+
+    def __init__(
+        self,
+        in_rate: int = SAMPLE_RATE,
+        out_rate: int = SAMPLE_RATE,
+        trim: bool = True,
+        trim_db: float = -50.0,
+        gap_ms: float = 0.0,
+        crossfade_ms: float = 0.0,
+        target_db: Optional[float] = None,
+        peak_db: float = -1.0,
+    ):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.trim = trim
+        self.trim_db = trim_db
+        self.gap = int(in_rate * gap_ms / 1000)
+        self.crossfade = 0 if self.gap else int(in_rate * crossfade_ms / 1000)
+        self.target_db = target_db
+        self.peak_db = peak_db
+
+    def _prepare(self, segment: np.ndarray) -> Tuple[np.ndarray, int]:
+        """Trim and normalize a segment; also return where the kept part began"""
+        segment = np.asarray(segment, dtype=np.float32).reshape(-1)
+        start = 0
+        if self.trim:
+            start, end = trim_bounds(segment, self.in_rate, self.trim_db)
+            segment = segment[start:end]
+        if self.target_db is not None:
+            segment = normalize_loudness(segment, self.target_db, self.peak_db)
+        return segment, start
+
+    def _join(
+        self, segments: Iterable[np.ndarray], layout: Optional[Layout] = None
+    ) -> Iterator[np.ndarray]:
+        """Insert gaps or crossfades, holding back only the crossfade tail"""
+        fade_out, fade_in = _equal_power_fades(self.crossfade)
+        tail: Optional[np.ndarray] = None
+        position = 0  # samples of joined output so far, including the tail
+        for segment in segments:
+            segment, trimmed = self._prepare(segment)
+            if len(segment) == 0:
+                if layout is not None:
+                    layout.append(None)
+                continue
+            if tail is None:
+                head = segment
+                start = 0
+            elif self.crossfade:
+                n = min(len(tail), len(segment))
+                mixed = tail[len(tail) - n:] * fade_out[:n] + segment[:n] * fade_in[:n]
+                yield tail[: len(tail) - n]
+                head = np.concatenate([mixed, segment[n:]])
+                start = position - n
+            else:
+                yield tail
+                if self.gap:
+                    yield np.zeros(self.gap, dtype=np.float32)
+                head = segment
+                start = position + self.gap
+            if layout is not None:
+                layout.append((trimmed, trimmed + len(segment), start))
+            position = start + len(segment)
+            keep = min(self.crossfade, len(head))
+            yield head[: len(head) - keep]
+            tail = head[len(head) - keep:]
+        if tail is not None and len(tail):
+            yield tail
+
+    def process(
+        self, segments: Iterable[np.ndarray], layout: Optional[Layout] = None
+    ) -> Iterator[np.ndarray]:
+        """Yield processed output chunks as segments arrive
+
+        If ``layout`` is given, one entry per input segment is appended to it:
+        (trim_start, trim_end, output_start) in input-rate samples, or None
+        for a segment trimmed away. Alignment.retimed uses it.
+        """
+        resampler = PolyphaseResampler(self.in_rate, self.out_rate)
+        for chunk in self._join(segments, layout):
+            out = resampler.process(chunk)
+            if len(out):
+                yield out
+        out = resampler.flush()
+        if len(out):
+            yield out
+
+    def __call__(
+        self, segments: Iterable[np.ndarray], layout: Optional[Layout] = None
+    ) -> np.ndarray:
+        """Process all segments and return one clip"""
+        chunks = list(self.process(segments, layout))
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(chunks)
@@ -0,0 +1,233 @@
+"""Pre-rendered prompt packs for Kokoro TTS Local
+
+A fixed catalogue of prompts (IVR menus, UI messages) is rendered once per
+voice into a single pack file. At serving time stream_speech looks every
+request up in the pack first and answers hits by slicing a memory map, with
+no inference and no per-prompt file open.
+
+Pack layout (little endian):
+
+    magic      8 bytes   b"KPACK001"
+    rate       uint32    sample rate
+    count      uint32    number of entries
+    index_at   uint64    byte offset of the index
+    audio      float32   every prompt's samples, back to back
+    index      count x (uint64 key hash, uint64 sample offset, uint64 length),
+               sorted by key hash
+
+Usage:
+    python prompt_pack.py build prompts.txt --voices af_bella bm_george
+    python prompt_pack.py info prompts.kpack
+
+The serving path loads the pack named by KOKORO_PROMPT_PACK (default
+prompts.kpack) if it exists.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 24000
+MAGIC = b"KPACK001"
+HEADER = struct.Struct("<8sIIQ")
+INDEX_DTYPE = np.dtype([("key", "<u8"), ("offset", "<u8"), ("length", "<u8")])
+DEFAULT_PACK_PATH = os.environ.get("KOKORO_PROMPT_PACK", "prompts.kpack")
+
+_pack = None
+_pack_loaded = False
+_pack_lock = threading.Lock()
+
+
+def prompt_key(text: str, voice: str, speed: float = 1.0) -> int:
+    """Stable 64-bit key for a prompt, ignoring whitespace differences"""
+    text = " ".join(text.split())
+    voice = voice.replace(".pt", "")
+    digest = hashlib.blake2b(
+        f"{voice}\t{speed:.2f}\t{text}".encode("utf-8"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "little")
+
+
+def read_catalogue(path) -> List[str]:
+    """Read prompts from a text file (one per line) or JSONL ({"text": ...})"""
+    prompts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                line = json.loads(line)["text"]
+            prompts.append(line)
+    return list(dict.fromkeys(prompts))
+
+
+class PromptPack:
+    """Read-only view of a pack file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic, self.sample_rate, count, index_at = HEADER.unpack(
+                f.read(HEADER.size)
+            )
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a prompt pack")
+        if count == 0:
+            self._audio = np.zeros(0, dtype=np.float32)
+            self._index = np.zeros(0, dtype=INDEX_DTYPE)
+        else:
+            # Copy-on-write maps stay shared with the page cache but give
+            # torch writable arrays, so tensors can wrap slices without copying
+            self._audio = np.memmap(
+                self.path,
+                dtype=np.float32,
+                mode="c",
+                offset=HEADER.size,
+                shape=((index_at - HEADER.size) // 4,),
+            )
+            self._index = np.memmap(
+                self.path, dtype=INDEX_DTYPE, mode="r", offset=index_at, shape=(count,)
+            )
+        self._keys = self._index["key"]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, text: str, voice: str, speed: float = 1.0) -> Optional[np.ndarray]:
+        """Return the prompt's audio as a slice of the map, or None"""
+        key = prompt_key(text, voice, speed)
+        i = int(np.searchsorted(self._keys, key))
+        if i == len(self._keys) or self._keys[i] != key:
+            return None
+        offset, length = int(self._index[i]["offset"]), int(self._index[i]["length"])
+        return self._audio[offset : offset + length]
+
+
+def load_prompt_pack(path=DEFAULT_PACK_PATH) -> Optional[PromptPack]:
+    """Load (or with path=None, unload) the pack used by the serving path"""
+    global _pack, _pack_loaded
+    with _pack_lock:
+        _pack = None
+        if path is not None and Path(path).exists():
+            try:
+                _pack = PromptPack(path)
+                logging.info(f"Loaded {len(_pack)} pre-rendered prompts from {path}")
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not load prompt pack {path}: {e}")
+        _pack_loaded = True
+        return _pack
+
+
+def lookup_prompt(text: str, voice: str, speed: float = 1.0) -> Optional[np.ndarray]:
+    """Return pre-rendered audio for a request, or None on a miss"""
+    if not _pack_loaded:
+        load_prompt_pack()
+    pack = _pack
+    return pack.get(text, voice, speed) if pack is not None else None
+
+
+def write_pack(path, entries: Iterable[Tuple[int, np.ndarray]], sample_rate=SAMPLE_RATE):
+    """Write (key, audio) entries to a pack file, replacing it atomically"""
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    index = []
+    offset = 0
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, sample_rate, 0, 0))
+        for key, audio in entries:
+            audio = np.ascontiguousarray(audio, dtype="<f4").reshape(-1)
+            f.write(audio.tobytes())
+            index.append((key, offset, len(audio)))
+            offset += len(audio)
+        table = np.array(index, dtype=INDEX_DTYPE)
+        table.sort(order="key")
+        index_at = f.tell()
+        f.write(table.tobytes())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, sample_rate, len(table), index_at))
+    os.replace(tmp, path)
+
+
+def build_pack(
+    prompts: List[str],
+    voices: List[str],
+    output=DEFAULT_PACK_PATH,
+    speed: float = 1.0,
+    workers: int = 4,
+    model_path: str = "kokoro-v1_0.pth",
+    device: Optional[str] = None,
+):
+    """Render every prompt in every voice in parallel and write a pack"""
+    import torch
+    from tqdm import tqdm
+
+    from models import build_model, preload_voices, set_max_concurrency, stream_speech
+
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    set_max_concurrency(workers)
+    model = build_model(model_path, device)
+    preload_voices(model, voices, device)
+
+    def render(text: str, voice: str) -> Tuple[int, np.ndarray]:
+        chunks = [
+            audio.numpy()
+            for _, _, audio in stream_speech(
+                model, text, voice, device, speed, prompts=False
+            )
+        ]
+        audio = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        return prompt_key(text, voice, speed), audio
+
+    def rendered():
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(render, text, voice) for voice in voices for text in prompts
+            ]
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                yield future.result()
+
+    write_pack(output, rendered())
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render prompt packs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Render a catalogue into a pack")
+    build.add_argument("catalogue", help="Text file (one prompt per line) or JSONL")
+    build.add_argument("--voices", nargs="+", default=["af_bella"])
+    build.add_argument("--output", default=DEFAULT_PACK_PATH)
+    build.add_argument("--speed", type=float, default=1.0)
+    build.add_argument("--workers", type=int, default=4)
+    build.add_argument("--model", default="kokoro-v1_0.pth")
+
+    info = sub.add_parser("info", help="Describe a pack")
+    info.add_argument("pack", nargs="?", default=DEFAULT_PACK_PATH)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        prompts = read_catalogue(args.catalogue)
+        print(f"Rendering {len(prompts)} prompts x {len(args.voices)} voices...")
+        build_pack(
+            prompts, args.voices, args.output, args.speed, args.workers, args.model
+        )
+        print(f"Wrote {args.output}")
+    else:
+        pack = PromptPack(args.pack)
+        seconds = len(pack._audio) / pack.sample_rate
+        print(f"{args.pack}: {len(pack)} prompts, {seconds:.1f}s of audio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Priority scheduling of synthesis jobs for Kokoro TTS Local
+
+Jobs are split into segments with limits.iter_chunks (paragraphs, with long
+ones cut at sentence boundaries to the chunk limit) and the workers run one
+segment at a time. After every segment the next segment is picked from the
+highest priority class with pending work, rotating between tenants within a
+class, so a short interactive request waits for at most one chunk of a long
+batch job, even when that job is a single paragraph.
+
+Example:
+    scheduler = Scheduler(build_model(None, "cpu"))
+    future = scheduler.submit("Hello!", "af_bella", priority=INTERACTIVE)
+    audio = future.result()
+"""
+
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Deque, Dict, Hashable, Iterator, List, Optional
+
+import numpy as np
+
+from cancellation import CancelToken
+from limits import iter_chunks
+import models
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITIES = (INTERACTIVE, BATCH)
+
+
+class Job:
+    """A synthesis request split into segments"""
+
+    def __init__(
+        self,
+        text: str,
+        voice: str,
+        speed: float,
+        priority: int,
+        tenant: Hashable,
+        cancel: Optional[CancelToken] = None,
+    ):
+        self.voice = voice
+        self.speed = speed
+        self.priority = priority
+        self.tenant = tenant
+        self.cancel = cancel
+        self.segments: Deque[str] = deque(iter_chunks(text))
+        self.audio: List[np.ndarray] = []
+        self.future: Future = Future()
+        self.running = False
+
+
+class Scheduler:
+    """Run jobs segment by segment in priority order with fair queuing"""
+
+    def __init__(
+        self,
+        model,
+        device: str = "cpu",
+        workers: Optional[int] = None,
+        backend=None,
+    ):
+        self.model = model
+        # Read at call time so set_max_concurrency() applies to new schedulers
+        if workers is None:
+            workers = models.MAX_CONCURRENCY
+        self.device = device
+        # Anything with daemon.py's backend stream(); used instead of the model
+        self.backend = backend
+        self._cond = threading.Condition()
+        # priority -> tenant -> queued jobs; OrderedDict order is the rotation
+        self._queues: Dict[int, "OrderedDict[Hashable, Deque[Job]]"] = {
+            p: OrderedDict() for p in PRIORITIES
+        }
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._run, name=f"scheduler-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        text: str,
+        voice: str,
+        speed: float = 1.0,
+        priority: int = INTERACTIVE,
+        tenant: Optional[Hashable] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> Future:
+        """Queue a job and return a future resolving to float32 audio
+
+        Args:
+            text: Text to synthesize
+            voice: Voice name (e.g. 'af_bella')
+            speed: Speech speed multiplier
+            priority: INTERACTIVE or BATCH
+            tenant: Fairness key within the priority class (defaults to voice)
+            cancel: Token checked before every segment; the future fails with
+                Cancelled once it fires. Cancelling the future also stops the
+                job at the next segment boundary.
+        """
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority: {priority}")
+        job = Job(
+            text, voice, speed, priority, voice if tenant is None else tenant, cancel
+        )
+        if not job.segments:
+            job.future.set_result(np.zeros(0, dtype=np.float32))
+            return job.future
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            self._queues[priority].setdefault(job.tenant, deque()).append(job)
+            self._cond.notify()
+        return job.future
+
+    def _next_job(self) -> Optional[Job]:
+        """Pop the next runnable job; caller holds the lock"""
+        for priority in PRIORITIES:
+            tenants = self._queues[priority]
+            for _ in range(len(tenants)):
+                tenant, jobs = next(iter(tenants.items()))
+                # Rotate the tenant to the back so others get the next turn
+                tenants.move_to_end(tenant)
+                for job in jobs:
+                    if not job.running:
+                        job.running = True
+                        return job
+        return None
+
+    def _requeue(self, job: Job):
+        """Return a job to its queue after a segment; caller holds the lock"""
+        job.running = False
+        jobs = self._queues[job.priority].get(job.tenant)
+        if not job.segments or job.future.done():
+            if jobs is not None:
+                jobs.remove(job)
+                if not jobs:
+                    del self._queues[job.priority][job.tenant]
+        self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._closed:
+                    self._cond.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+                text = job.segments.popleft()
+
+            try:
+                if job.future.cancelled():
+                    job.segments.clear()
+                    continue
+                if job.cancel is not None:
+                    job.cancel.check()
+                for audio in self._synthesize(job, text):
+                    job.audio.append(audio.astype(np.float32, copy=False))
+                if not job.segments:
+                    job.future.set_result(
+                        np.concatenate(job.audio)
+                        if job.audio
+                        else np.zeros(0, dtype=np.float32)
+                    )
+            except Exception as e:
+                logging.debug(f"Error generating speech: {e}")
+                job.segments.clear()
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._requeue(job)
+
+    def _synthesize(self, job: Job, text: str) -> Iterator[np.ndarray]:
+        if self.backend is not None:
+            yield from self.backend.stream(
+                text, job.voice, job.speed, cancel=job.cancel
+            )
+            return
+        for gs, ps, audio in models.stream_speech(
+            self.model, text, job.voice, self.device, job.speed, cancel=job.cancel
+        ):
+            logging.debug(f"Generated segment: {gs}")
+            yield audio.numpy()
+
+    def pending(self) -> Dict[int, int]:
+        """Return the number of queued jobs per priority class"""
+        with self._cond:
+            return {
+                p: sum(len(jobs) for jobs in tenants.values())
+                for p, tenants in self._queues.items()
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and let workers exit once the queues drain"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
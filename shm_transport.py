@@ -0,0 +1,371 @@
+"""Shared-memory audio transport for multi-process synthesis
+
+A worker process writes each synthesized segment once into a
+multiprocessing.shared_memory ring buffer, and the parent reads it back as a
+numpy view of the same memory, so no audio is pickled through a pipe.
+
+The ring holds variable-size records. Its first 64 bytes store two running
+byte counters (head, written by the producer, and tail, advanced by the
+consumer); a Condition shared by both processes guards them. Each record is
+a 16-byte header (payload size, tag) followed by the payload, aligned to 16
+bytes. A record that would run past the end of the buffer is preceded by a
+skip marker and written at the start instead.
+
+Lifetime: the process that creates a ring owns it and unlinks it on close().
+Other processes attach() and only close their mapping. Rings that are still
+open when the creating process exits are reported as leaks and unlinked.
+
+Example:
+    for audio in synthesize_in_process("Hello there.", "af_bella"):
+        sf.write(...)  # audio is only valid until the next iteration
+
+Run this module directly to compare it against plain pickling:
+    python shm_transport.py
+"""
+
+import atexit
+import logging
+import multiprocessing as mp
+import threading
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+HEADER_BYTES = 64
+RECORD_HEADER = 16
+ALIGN = 16
+DEFAULT_CAPACITY = 64 * 1024 * 1024  # ~11 minutes of float32 audio at 24 kHz
+
+# Record tags; tags >= 0 are segment indices
+TAG_SKIP = -1
+TAG_END = -2
+TAG_ERROR = -3
+
+# Rings created by this process and not yet closed, by shared memory name
+_live_rings: Dict[str, "AudioRing"] = {}
+_live_lock = threading.Lock()
+
+
+class RingClosed(Exception):
+    """Raised when reading from a ring whose producer has finished"""
+
+
+def _aligned(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+class AudioRing:
+    """Single-producer, single-consumer ring of float32 audio segments
+
+    Create the ring in the parent, pass it to a child process as an argument
+    (it pickles by shared memory name), and call attach() on it there.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, ctx=None):
+        ctx = ctx or mp.get_context()
+        self.capacity = _aligned(capacity)
+        self._cond = ctx.Condition()
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=HEADER_BYTES + self.capacity
+        )
+        self.name = self._shm.name
+        self._owner = True
+        self._map()
+        self._counters[:] = 0
+        with _live_lock:
+            _live_rings[self.name] = self
+
+    def __getstate__(self):
+        return {"name": self.name, "capacity": self.capacity, "cond": self._cond}
+
+    def __setstate__(self, state):
+        self.name = state["name"]
+        self.capacity = state["capacity"]
+        self._cond = state["cond"]
+        self._owner = False
+        self._shm = None
+
+    def attach(self) -> "AudioRing":
+        """Map the ring in a process that did not create it"""
+        if self._shm is None:
+            # Child processes share the creator's resource tracker, so
+            # attaching does not schedule a second unlink
+            self._shm = shared_memory.SharedMemory(name=self.name)
+            self._map()
+        return self
+
+    def _map(self):
+        self._counters = np.ndarray((2,), dtype=np.int64, buffer=self._shm.buf)
+        self._data = self._shm.buf[HEADER_BYTES:]
+
+    @property
+    def _head(self) -> int:
+        return int(self._counters[0])
+
+    @property
+    def _tail(self) -> int:
+        return int(self._counters[1])
+
+    def _write_header(self, pos: int, nbytes: int, tag: int):
+        header = np.ndarray((2,), dtype=np.int64, buffer=self._data, offset=pos)
+        header[:] = (nbytes, tag)
+
+    def _write(self, payload: memoryview, tag: int, timeout: Optional[float]):
+        size = _aligned(RECORD_HEADER + payload.nbytes)
+        if size > self.capacity:
+            raise ValueError(
+                f"Segment of {payload.nbytes} bytes does not fit in a "
+                f"{self.capacity} byte ring"
+            )
+        with self._cond:
+            head = self._head
+            pos = head % self.capacity
+            skip = self.capacity - pos if pos + size > self.capacity else 0
+            if not self._cond.wait_for(
+                lambda: self.capacity - (head - self._tail) >= skip + size, timeout
+            ):
+                raise TimeoutError("Timed out waiting for the reader")
+        # The reader never looks past head, so the payload is copied unlocked
+        if skip:
+            self._write_header(pos, 0, TAG_SKIP)
+            pos = 0
+        start = pos + RECORD_HEADER
+        self._data[start : start + payload.nbytes] = payload
+        self._write_header(pos, payload.nbytes, tag)
+        with self._cond:
+            self._counters[0] = head + skip + size
+            self._cond.notify_all()
+
+    def put(self, audio: np.ndarray, index: int = 0, timeout: Optional[float] = None):
+        """Copy one segment into the ring, waiting for space if needed"""
+        audio = np.ascontiguousarray(audio, dtype=np.float32).reshape(-1)
+        self._write(memoryview(audio).cast("B"), index, timeout)
+
+    def close_writer(self, error: Optional[str] = None):
+        """Mark the end of the stream, optionally with an error message"""
+        if error is None:
+            self._write(memoryview(b""), TAG_END, None)
+        else:
+            self._write(memoryview(error.encode("utf-8")), TAG_ERROR, None)
+
+    def get(self, timeout: Optional[float] = None) -> Tuple[int, np.ndarray]:
+        """Return (index, audio) for the next segment without copying
+
+        The array is a view into the ring and stays valid only until
+        release() is called; copy it to keep it longer.
+        """
+        while True:
+            with self._cond:
+                if not self._cond.wait_for(lambda: self._head > self._tail, timeout):
+                    raise TimeoutError("Timed out waiting for the writer")
+                tail = self._tail
+            pos = tail % self.capacity
+            nbytes, tag = np.ndarray(
+                (2,), dtype=np.int64, buffer=self._data, offset=pos
+            ).tolist()
+            if tag == TAG_SKIP:
+                self._advance(tail + self.capacity - pos)
+                continue
+            start = pos + RECORD_HEADER
+            if tag == TAG_END:
+                self._advance(tail + _aligned(RECORD_HEADER))
+                raise RingClosed()
+            if tag == TAG_ERROR:
+                message = bytes(self._data[start : start + nbytes]).decode("utf-8")
+                self._advance(tail + _aligned(RECORD_HEADER + nbytes))
+                raise RuntimeError(f"Worker failed: {message}")
+            self._pending = tail + _aligned(RECORD_HEADER + nbytes)
+            audio = np.ndarray(
+                (nbytes // 4,), dtype=np.float32, buffer=self._data, offset=start
+            )
+            return tag, audio
+
+    def release(self):
+        """Give the space of the last segment returned by get() back"""
+        pending = getattr(self, "_pending", None)
+        if pending is not None:
+            self._pending = None
+            self._advance(pending)
+
+    def _advance(self, tail: int):
+        with self._cond:
+            self._counters[1] = tail
+            self._cond.notify_all()
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Yield zero-copy segments until the writer closes the stream"""
+        try:
+            while True:
+                try:
+                    _, audio = self.get()
+                except RingClosed:
+                    return
+                yield audio
+                del audio
+                self.release()
+        finally:
+            self.release()
+
+    def close(self):
+        """Unmap the ring, and unlink it if this process created it"""
+        if self._shm is None:
+            return
+        self._counters = None
+        try:
+            self._data.release()
+            self._shm.close()
+        except BufferError:
+            logging.warning(
+                f"Shared memory {self.name} still has live views; "
+                "copy segments you keep past release()"
+            )
+            return
+        if self._owner:
+            self._shm.unlink()
+            with _live_lock:
+                _live_rings.pop(self.name, None)
+        self._shm = None
+
+    def __enter__(self) -> "AudioRing":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def live_rings() -> list:
+    """Names of rings created by this process that are still open"""
+    with _live_lock:
+        return list(_live_rings)
+
+
+@atexit.register
+def _report_leaks():
+    for name in live_rings():
+        logging.warning(f"Shared memory ring {name} was never closed; unlinking")
+        ring = _live_rings.get(name)
+        try:
+            ring.close()
+        except Exception:
+            try:
+                shared_memory.SharedMemory(name=name).unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _synthesis_worker(
+    ring: AudioRing,
+    text: str,
+    voice: str,
+    speed: float,
+    model_path: str,
+    device: str,
+):
+    """Child process entry point: synthesize text into the ring"""
+    ring.attach()
+    try:
+        from models import build_model, stream_speech
+
+        model = build_model(model_path, device)
+        for index, (_, _, audio) in enumerate(
+            stream_speech(model, text, voice, device, speed)
+        ):
+            ring.put(audio.numpy(), index)
+        ring.close_writer()
+    except Exception as e:
+        ring.close_writer(error=str(e))
+    finally:
+        ring.close()
+
+
+def synthesize_in_process(
+    text: str,
+    voice: str,
+    speed: float = 1.0,
+    model_path: str = "kokoro-v1_0.pth",
+    device: str = "cpu",
+    capacity: int = DEFAULT_CAPACITY,
+) -> Iterator[np.ndarray]:
+    """Synthesize in a child process and yield its segments zero-copy
+
+    Each yielded array is only valid until the next iteration.
+    """
+    ctx = mp.get_context("spawn")
+    with AudioRing(capacity, ctx) as ring:
+        worker = ctx.Process(
+            target=_synthesis_worker,
+            args=(ring, text, voice, speed, model_path, device),
+            daemon=True,
+        )
+        worker.start()
+        try:
+            yield from ring
+        finally:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+
+def _bench_ring_producer(ring: AudioRing, go, segments: int, samples: int):
+    ring.attach()
+    audio = np.random.default_rng(0).standard_normal(samples).astype(np.float32)
+    go.wait()
+    for i in range(segments):
+        ring.put(audio, i)
+    ring.close_writer()
+    ring.close()
+
+
+def _bench_queue_producer(queue, go, segments: int, samples: int):
+    audio = np.random.default_rng(0).standard_normal(samples).astype(np.float32)
+    go.wait()
+    for _ in range(segments):
+        queue.put(audio)
+    queue.put(None)
+
+
+if __name__ == "__main__":
+    import time
+
+    ctx = mp.get_context("spawn")
+    for seconds in (5, 30, 120):
+        samples = seconds * 24000
+        segments = 20
+
+        # Producers wait for the go signal so process startup is not timed
+        go = ctx.Event()
+        with AudioRing(4 * samples * 4 + 4096, ctx) as ring:
+            worker = ctx.Process(
+                target=_bench_ring_producer, args=(ring, go, segments, samples)
+            )
+            worker.start()
+            time.sleep(2)
+            go.set()
+            start = time.perf_counter()
+            total = 0.0
+            for audio in ring:
+                total += float(audio[0])
+            ring_time = time.perf_counter() - start
+            worker.join()
+
+        go = ctx.Event()
+        queue = ctx.Queue(maxsize=4)
+        worker = ctx.Process(
+            target=_bench_queue_producer, args=(queue, go, segments, samples)
+        )
+        worker.start()
+        time.sleep(2)
+        go.set()
+        start = time.perf_counter()
+        while (audio := queue.get()) is not None:
+            total += float(audio[0])
+        queue_time = time.perf_counter() - start
+        worker.join()
+
+        print(
+            f"{segments} x {seconds:>3}s segments: "
+            f"shared memory {ring_time * 1000:8.1f} ms, "
+            f"pickled queue {queue_time * 1000:8.1f} ms"
+        )
+    print(f"Leaked rings: {live_rings()}")
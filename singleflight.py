@@ -0,0 +1,143 @@
+"""In-flight request deduplication for Kokoro TTS Local
+
+Concurrent calls with the same key attach to the one running call and share
+its result instead of repeating the work. Keys are only deduplicated while
+a call is in flight; finished results are not cached here.
+
+Cancellable calls (``do`` with ``cancel``) run on a background thread with a
+token of their own. Each caller stops waiting as soon as its own token
+fires, and the shared token is cancelled only once every attached caller
+has given up, so one user cancelling never cancels anyone else.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from cancellation import CancelToken, Cancelled
+
+# How often a waiting caller checks its own token
+POLL_INTERVAL = 0.1
+
+
+class _Call:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+        # Callers still waiting for the result, and the token they share
+        self.attached = 1
+        self.token: Optional[CancelToken] = None
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls by key and count how often that happens"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._requests = 0
+        self._executed = 0
+        self._deduplicated = 0
+
+    def _join(self, key: Hashable, cancellable: bool = False):
+        """Return (call, is_leader) for key, registering a new call if needed"""
+        with self._lock:
+            self._requests += 1
+            call = self._calls.get(key)
+            # A call whose callers have all cancelled is winding down; start over
+            if call is not None and not (call.token and call.token.cancelled):
+                call.attached += 1
+                self._deduplicated += 1
+                return call, False
+            call = _Call()
+            if cancellable:
+                call.token = CancelToken()
+            self._calls[key] = call
+            self._executed += 1
+            return call, True
+
+    def _detach(self, call: _Call):
+        """Drop a caller that stopped waiting; cancel the call if it was the last"""
+        with self._lock:
+            call.attached -= 1
+            if call.attached == 0 and call.token is not None and not call.done:
+                call.token.cancel("all callers cancelled")
+
+    def _finish(self, key: Hashable, call: _Call):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        with call.cond:
+            call.done = True
+            call.cond.notify_all()
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable,
+        *args,
+        cancel: Optional[CancelToken] = None,
+        **kwargs,
+    ):
+        """Run fn once for all concurrent callers with the same key
+
+        With ``cancel``, fn runs on a background thread and receives the
+        call's shared token as its ``cancel`` argument. Cancelled is raised
+        to a caller whose own token fires; the others keep waiting.
+        """
+        if cancel is not None:
+            return self._do_cancellable(key, fn, args, kwargs, cancel)
+        call, leader = self._join(key)
+        if leader:
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                self._finish(key, call)
+            return call.result
+
+        with call.cond:
+            while not call.done:
+                call.cond.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _do_cancellable(self, key, fn, args, kwargs, cancel: CancelToken):
+        call, leader = self._join(key, cancellable=True)
+        if leader:
+
+            def run():
+                try:
+                    call.result = fn(*args, cancel=call.token, **kwargs)
+                except BaseException as e:
+                    call.error = e
+                finally:
+                    self._finish(key, call)
+
+            threading.Thread(target=run, name="singleflight", daemon=True).start()
+
+        try:
+            with call.cond:
+                while not call.done:
+                    cancel.check()
+                    call.cond.wait(POLL_INTERVAL)
+        except Cancelled:
+            self._detach(call)
+            raise
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        """Return request, execution and deduplication counters"""
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "executed": self._executed,
+                "deduplicated": self._deduplicated,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,115 @@
+"""Headless programmatic API for Kokoro TTS Local
+
+Example:
+    from synthesizer import Synthesizer
+
+    tts = Synthesizer(voice="af_bella")
+    audio = tts.synthesize("Hello there.")  # float32 numpy array at 24 kHz
+    for chunk in tts.stream("First line.\nSecond line."):
+        ...
+"""
+
+import logging
+from typing import Iterator, List, Optional
+
+import numpy as np
+import torch
+
+from cancellation import CancelToken
+from capture import capture_output
+from postprocess import PostProcessor
+from models import (
+    SAMPLE_RATE,
+    build_model,
+    list_available_voices,
+    stream_speech,
+)
+
+DEFAULT_MODEL_PATH = "kokoro-v1_0.pth"
+DEFAULT_VOICE = "af_bella"
+
+
+class Synthesizer:
+    """Text-to-speech that returns audio in memory
+
+    Unlike Controller, nothing is written to disk and no audio device is
+    opened. The model is loaded on first use and shared by every call (and by
+    every Synthesizer in the process, since build_model caches it). Pass a
+    PostProcessor to resample, trim or normalize the output.
+    """
+
+    def __init__(
+        self,
+        voice: str = DEFAULT_VOICE,
+        speed: float = 1.0,
+        device: Optional[str] = None,
+        model_path: str = DEFAULT_MODEL_PATH,
+        quiet: bool = True,
+        postprocessor: Optional[PostProcessor] = None,
+        **model_options,
+    ):
+        self.voice = voice
+        self.speed = speed
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.model_path = model_path
+        self.quiet = quiet
+        self.model_options = model_options
+        self.postprocessor = postprocessor
+        self.model = None
+
+    @property
+    def sample_rate(self) -> int:
+        return self.postprocessor.out_rate if self.postprocessor else SAMPLE_RATE
+
+    def load(self) -> "Synthesizer":
+        """Load the model now instead of on the first call"""
+        if self.model is None:
+            with capture_output(enabled=self.quiet):
+                self.model = build_model(
+                    self.model_path, self.device, **self.model_options
+                )
+        return self
+
+    @property
+    def voices(self) -> List[str]:
+        return list_available_voices()
+
+    def stream(
+        self,
+        text: str,
+        voice: Optional[str] = None,
+        speed: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> Iterator[np.ndarray]:
+        """Yield float32 audio chunks as soon as each segment is synthesized
+
+        If cancel fires, Cancelled is raised at the next segment boundary.
+        """
+        self.load()
+        voice = voice or self.voice
+        speed = self.speed if speed is None else speed
+
+        def segments():
+            for gs, ps, audio in stream_speech(
+                self.model, text, voice, self.device, speed, cancel=cancel
+            ):
+                logging.debug(f"Synthesized segment: {gs}")
+                yield audio.numpy().astype(np.float32, copy=False)
+
+        if self.postprocessor is None:
+            yield from segments()
+        else:
+            yield from self.postprocessor.process(segments())
+
+    def synthesize(
+        self,
+        text: str,
+        voice: Optional[str] = None,
+        speed: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> np.ndarray:
+        """Return float32 audio for the whole text"""
+        segments = list(self.stream(text, voice, speed, cancel))
+        if not segments:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(segments)
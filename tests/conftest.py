@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The modules live at the repository root rather than in a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def models(tmp_path, monkeypatch):
+    """models.py imported against stubbed Kokoro classes (needs torch)"""
+    pytest.importorskip("torch")
+    from kokoro_stubs import load_models
+
+    yield load_models(tmp_path, monkeypatch)
+    # Modules imported against the stubs must not leak into other tests
+    for name in ("models", "markup", "incremental", "scheduler"):
+        sys.modules.pop(name, None)
@@ -0,0 +1,109 @@
+"""Stand-ins for the Kokoro classes and espeak-ng setup used by models.py
+
+KPipeline and KModel are replaced with small fakes, and the espeak-ng setup
+with no-op modules, so no weights, voices or G2P data are needed.
+"""
+
+import importlib
+import sys
+import time
+import types
+
+import torch
+
+
+class FakeResult:
+    def __init__(self, text, audio):
+        self.graphemes = text
+        self.phonemes = text
+        self.audio = audio
+        self.tokens = None
+        self.pred_dur = None
+
+
+class FakeKModel:
+    builds = 0
+
+    def __init__(self, repo_id=None, model=None):
+        FakeKModel.builds += 1
+        time.sleep(0.05)  # widen the window for racing initializers
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+
+class FakeKPipeline:
+    Result = FakeResult
+
+    def __init__(self, lang_code="a", model=None, **kwargs):
+        self.lang_code = lang_code
+        self.model = model
+        self.voices = {}
+
+    def load_voice(self, voice_path):
+        raise AssertionError("models.py should patch load_voice")
+
+    def __call__(self, text, voice=None, speed=1.0, split_pattern=None):
+        for sentence in text.split(". "):
+            yield FakeResult(sentence, torch.zeros(2400))
+
+
+def _stub_modules():
+    kokoro = types.ModuleType("kokoro")
+    kokoro.KPipeline = FakeKPipeline
+    kokoro_model = types.ModuleType("kokoro.model")
+    kokoro_model.KModel = FakeKModel
+    wrapper = types.ModuleType("phonemizer.backend.espeak.wrapper")
+    wrapper.EspeakWrapper = type("EspeakWrapper", (), {})
+    phonemizer = types.ModuleType("phonemizer")
+    phonemizer.phonemize = lambda text, language=None: text
+    loader = types.ModuleType("espeakng_loader")
+    loader.get_library_path = lambda: ""
+    loader.get_data_path = lambda: ""
+    loader.make_library_available = lambda: None
+    return {
+        "kokoro": kokoro,
+        "kokoro.model": kokoro_model,
+        "phonemizer": phonemizer,
+        "phonemizer.backend": types.ModuleType("phonemizer.backend"),
+        "phonemizer.backend.espeak": types.ModuleType("phonemizer.backend.espeak"),
+        "phonemizer.backend.espeak.wrapper": wrapper,
+        "espeakng_loader": loader,
+    }
+
+
+class FakeRegistry:
+    def __init__(self, names):
+        self._names = names
+
+    def refresh(self):
+        pass
+
+    def names(self):
+        return list(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+
+def load_models(tmp_path, monkeypatch):
+    """Import models.py against the fakes, with one voice in tmp_path"""
+    for name, module in _stub_modules().items():
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.delitem(sys.modules, "models", raising=False)
+    models = importlib.import_module("models")
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "voices").mkdir()
+    torch.save(torch.ones(510, 1, 256), str(tmp_path / "voices" / "af_bella.pt"))
+    (tmp_path / "kokoro-v1_0.pth").write_bytes(b"")
+    FakeKModel.builds = 0
+    monkeypatch.setattr(models, "download_voice_files", lambda: ["af_bella.pt"])
+    registry = FakeRegistry(["af_bella"])
+    monkeypatch.setattr(models, "get_voice_registry", lambda: registry)
+    monkeypatch.setattr(models, "_pipeline", None)
+    monkeypatch.setattr(models, "_pools", {})
+    return models
@@ -0,0 +1,70 @@
+"""Word timings stay in step with post-processed audio"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from alignment import SAMPLE_RATE, Alignment  # noqa: E402
+from postprocess import PostProcessor  # noqa: E402
+
+
+class Token:
+    def __init__(self, text, start_ts, end_ts):
+        self.text = text
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+
+
+def _segment(lead: float, speech: float, trail: float) -> np.ndarray:
+    """Silence, a tone, then silence again"""
+    t = np.arange(int(speech * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    return np.concatenate(
+        [
+            np.zeros(int(lead * SAMPLE_RATE), np.float32),
+            tone,
+            np.zeros(int(trail * SAMPLE_RATE), np.float32),
+        ]
+    )
+
+
+def test_buffers_grow_and_properties_are_copies():
+    alignment = Alignment()
+    alignment.add_segment("Hi there", "", SAMPLE_RATE, [Token("Hi", 0.1, 0.3)])
+    starts = alignment.starts
+    alignment.add_segment("Again", "", SAMPLE_RATE, [Token("Again", 0.2, 0.6)])
+    assert starts.tolist() == pytest.approx([0.1])
+    assert alignment.starts.tolist() == pytest.approx([0.1, 1.2])
+    assert alignment.word_segments.tolist() == [0, 1]
+    assert alignment.segment_ends.tolist() == pytest.approx([1.0, 2.0])
+
+
+def test_retimed_follows_trim_and_gaps():
+    segments = [_segment(0.5, 1.0, 0.5), _segment(0.5, 1.0, 0.5)]
+    alignment = Alignment()
+    for audio in segments:
+        # One word spanning the tone of each segment
+        alignment.add_segment("word", "", len(audio), [Token("word", 0.5, 1.5)])
+
+    post = PostProcessor(trim=True, gap_ms=250)
+    layout = []
+    output = post(segments, layout)
+    aligned = alignment.retimed(layout, post.in_rate)
+
+    loud = np.flatnonzero(np.abs(output) > 0.01) / SAMPLE_RATE
+    first_end = loud[loud < aligned.segment_ends[0] + 0.1].max()
+    second_start = loud[loud > aligned.segment_ends[0] + 0.1].min()
+    assert aligned.starts[0] == pytest.approx(loud.min(), abs=0.01)
+    assert aligned.ends[0] == pytest.approx(first_end, abs=0.01)
+    assert aligned.starts[1] == pytest.approx(second_start, abs=0.01)
+    assert aligned.ends[1] == pytest.approx(loud.max(), abs=0.01)
+    assert aligned.duration == pytest.approx(len(output) / post.out_rate, abs=0.01)
+
+
+def test_retimed_drops_segments_trimmed_away():
+    alignment = Alignment()
+    alignment.add_segment("gone", "", 2400, [Token("gone", 0.0, 0.1)])
+    alignment.add_segment("kept", "", 2400, [Token("kept", 0.0, 0.1)])
+    aligned = alignment.retimed([None, (0, 2400, 0)], SAMPLE_RATE)
+    assert aligned.words == ["kept"]
+    assert aligned.word_segments.tolist() == [0]
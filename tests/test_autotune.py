@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+import autotune  # noqa: E402
+
+
+@pytest.fixture
+def threads(monkeypatch):
+    """Record thread counts set on torch instead of changing them"""
+    calls = {"intra": [], "interop": []}
+    monkeypatch.setattr(torch, "set_num_threads", calls["intra"].append)
+    monkeypatch.setattr(torch, "set_num_interop_threads", calls["interop"].append)
+    monkeypatch.setattr(torch, "get_num_threads", lambda: 3)
+    return calls
+
+
+def test_tuning_file_does_not_depend_on_cwd():
+    path = Path(autotune.TUNING_FILE)
+    assert path.is_absolute()
+    assert path.parent == Path(autotune.__file__).resolve().parent
+
+
+@pytest.mark.parametrize(
+    "cores, concurrency, expected",
+    [
+        (1, 1, [1]),
+        (8, 1, [1, 2, 4, 8]),
+        (8, 2, [1, 2, 4, 8]),
+        (8, 4, [1, 2, 4]),
+        (4, 8, [1, 2]),
+        (16, 1, [1, 2, 4, 8, 16]),
+    ],
+)
+def test_candidate_threads(monkeypatch, cores, concurrency, expected):
+    monkeypatch.setattr(autotune.os, "cpu_count", lambda: cores)
+    assert autotune.candidate_threads(concurrency) == expected
+
+
+def test_configure_threads_default_and_fixed(threads, tmp_path):
+    path = tmp_path / "tuning.json"
+    assert autotune.configure_threads(None, path=path) is None
+    assert autotune.configure_threads("", path=path) is None
+    assert threads["intra"] == []
+    assert autotune.configure_threads("4", concurrency=2, path=path) == 4
+    assert autotune.configure_threads(2, path=path) == 2
+    assert threads["intra"] == [4, 2]
+    assert not path.exists()
+
+
+def test_configure_threads_auto_without_run_keeps_defaults(threads, tmp_path):
+    path = tmp_path / "tuning.json"
+    assert autotune.configure_threads("auto", path=path) is None
+    assert threads["intra"] == []
+
+
+def test_auto_tuning_is_persisted_and_reused(threads, monkeypatch, tmp_path):
+    path = tmp_path / "tuning.json"
+    monkeypatch.setattr(autotune, "candidate_threads", lambda concurrency: [1, 2, 4])
+    speed = {1: 1.0, 2: 3.0, 4: 2.0}
+    monkeypatch.setattr(
+        autotune, "measure", lambda run, concurrency: speed[threads["intra"][-1]]
+    )
+    runs = []
+
+    def run():
+        runs.append(1)
+
+    assert autotune.configure_threads("auto", run, 1, path) == 2
+    # The original count is restored after measuring, then the winner applied
+    assert threads["intra"] == [1, 2, 4, 3, 2]
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved[autotune.host_key(1)]["threads"] == 2
+    assert len(runs) == 1  # the warmup call; measure is faked
+
+    monkeypatch.setattr(autotune, "measure", pytest.fail)
+    assert autotune.configure_threads("AUTO", run, 1, path) == 2
+    assert len(runs) == 1
+    assert threads["intra"][-1] == 2
+
+
+def test_results_are_kept_per_concurrency(threads, monkeypatch, tmp_path):
+    path = tmp_path / "tuning.json"
+    monkeypatch.setattr(autotune, "candidate_threads", lambda concurrency: [1])
+    monkeypatch.setattr(autotune, "measure", lambda run, concurrency: 1.0)
+    autotune.tune_threads(lambda: None, 1, path)
+    autotune.tune_threads(lambda: None, 2, path)
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert set(saved) == {autotune.host_key(1), autotune.host_key(2)}
+    assert saved[autotune.host_key(2)]["interop"] == 1
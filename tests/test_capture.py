@@ -0,0 +1,68 @@
+"""capture_output must not leak descriptors or swallow other threads' output"""
+
+import io
+import os
+import sys
+import threading
+
+import pytest
+
+from capture import capture_output
+
+FD_DIR = "/proc/self/fd"
+
+
+def _open_fds() -> int:
+    return len(os.listdir(FD_DIR))
+
+
+def _stub_build(index: int):
+    """Stand-in for model initialization: progress bars and warnings"""
+    print(f"Downloading model {index}: 100%")
+    print(f"warning from build {index}", file=sys.stderr)
+
+
+@pytest.mark.skipif(not os.path.isdir(FD_DIR), reason="needs /proc/self/fd")
+def test_capture_keeps_fds_and_other_threads_output(monkeypatch):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    monkeypatch.setattr(sys, "stdout", stdout)
+    monkeypatch.setattr(sys, "stderr", stderr)
+    with capture_output():
+        pass  # install the routers before counting
+    before = _open_fds()
+
+    captured = {}
+    stop = threading.Event()
+
+    def builder(index: int):
+        for block in range(25):
+            with capture_output() as output:
+                _stub_build(index * 100 + block)
+            captured[index * 100 + block] = output.text
+
+    def chatter():
+        count = 0
+        while not stop.is_set() or count < 50:
+            print(f"other thread line {count}")
+            count += 1
+
+    other = threading.Thread(target=chatter)
+    other.start()
+    builders = [threading.Thread(target=builder, args=(i,)) for i in range(4)]
+    for thread in builders:
+        thread.start()
+    for thread in builders:
+        thread.join()
+    stop.set()
+    other.join()
+
+    assert _open_fds() <= before
+    assert len(captured) == 100
+    for key, text in captured.items():
+        assert f"Downloading model {key}: 100%" in text
+        assert f"warning from build {key}" in text
+    real = stdout.getvalue()
+    assert "other thread line 0" in real
+    assert "other thread line 49" in real
+    assert "Downloading model" not in real
+    assert "warning from build" not in stderr.getvalue()
@@ -0,0 +1,60 @@
+import json
+import socket
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from daemon import StubBackend, SynthesisDaemon  # noqa: E402
+from tts_client import DaemonError, read_frames, request  # noqa: E402
+
+if not hasattr(socket, "AF_UNIX"):
+    pytest.skip("Unix domain sockets are not available", allow_module_level=True)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = str(tmp_path / "kokoro.sock")
+    server = SynthesisDaemon(path, StubBackend(seconds_per_char=0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def send_raw(socket_path, line: bytes) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        stream = sock.makefile("rwb")
+        stream.write(line + b"\n")
+        stream.flush()
+        return json.loads(stream.readline())
+
+
+@pytest.mark.parametrize("line", [b"[1]", b'"text"', b"5", b"null", b"{"])
+def test_non_object_request_is_rejected(socket_path, line):
+    assert send_raw(socket_path, line) == {"ok": False, "error": "Invalid request"}
+
+
+@pytest.mark.parametrize(
+    "message, error",
+    [
+        ({"text": 5}, "Invalid text"),
+        ({"text": ["Hello."]}, "Invalid text"),
+        ({"text": "Hello.", "voice": 1}, "Invalid voice"),
+    ],
+)
+def test_invalid_fields_are_rejected_before_the_header(socket_path, message, error):
+    with pytest.raises(DaemonError, match=error):
+        request(message, socket_path)
+
+
+def test_synthesize_streams_frames(socket_path):
+    header, stream = request({"text": "Hello there. Bye."}, socket_path)
+    with stream:
+        frames = list(read_frames(stream))
+    assert header["ok"] and header["voice"] == "af_bella"
+    assert frames and all(frames)
@@ -0,0 +1,58 @@
+"""Incremental regeneration must not erode reused segments"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+class _Audio:
+    def __init__(self, data):
+        self.data = data
+
+    def numpy(self):
+        return self.data
+
+
+def _fake_generate_speech(calls):
+    def generate_speech(model, text, voice, device, speed, stretch=False, cancel=None):
+        calls.append(text)
+        rng = np.random.default_rng(len(text))
+        audio = rng.uniform(-0.5, 0.5, 80 * len(text)).astype(np.float32)
+        return [_Audio(audio)], None, None
+
+    return generate_speech
+
+
+def test_repeated_edits_keep_neighbouring_segments_intact(models, tmp_path, monkeypatch):
+    import incremental
+    from postprocess import PostProcessor
+
+    calls = []
+    monkeypatch.setattr(incremental, "generate_speech", _fake_generate_speech(calls))
+    post = PostProcessor(trim=False)
+    output = tmp_path / "output.wav"
+
+    def run(middle):
+        text = f"The first sentence stays. {middle} The last one stays too."
+        audio, manifest, synthesized = incremental.regenerate(
+            None, text, "af_bella", output_path=output, postprocessor=post
+        )
+        manifest.save(output)
+        return audio, manifest, synthesized
+
+    audio, first, synthesized = run("Edit number 0.")
+    assert synthesized == 3
+    for i in range(1, 7):
+        calls.clear()
+        edited, manifest, synthesized = run(f"Edit number {i}.")
+        assert calls == [f"Edit number {i}."]
+        assert synthesized == 1
+        # Reused segments keep their exact clean audio however often we edit
+        for index in (0, 2):
+            start, end = manifest.bounds[index]
+            old_start, old_end = first.bounds[index]
+            assert end - start == old_end - old_start
+            np.testing.assert_array_equal(
+                manifest.audio[start:end], first.audio[old_start:old_end]
+            )
+        assert len(edited) == len(audio)
@@ -0,0 +1,27 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def markup(models):
+    return importlib.import_module("markup")
+
+
+def test_paragraphs_stay_separate(markup):
+    plan = markup.parse_markup("<speak><p>One</p><p>Two</p></speak>", "af_bella")
+    assert plan == [markup.Segment("One\nTwo", "af_bella", 1.0)]
+
+
+def test_sentences_and_spaces_are_kept(markup):
+    plan = markup.parse_markup("<s>Hello there.</s><s>Bye now.</s>", "af_bella")
+    assert [entry.text for entry in plan] == ["Hello there.\nBye now."]
+
+
+def test_whitespace_between_voices_creates_no_segment(markup):
+    text = '<voice name="bm_george">Hi</voice> <voice name="af_bella">Yo</voice>'
+    plan = markup.parse_markup(text, "af_bella")
+    assert [(entry.text, entry.voice) for entry in plan] == [
+        ("Hi", "bm_george"),
+        ("Yo", "af_bella"),
+    ]
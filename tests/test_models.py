@@ -0,0 +1,156 @@
+"""Concurrency tests for models.py against stubbed Kokoro classes"""
+
+import threading
+import time
+
+
+def test_suspended_stream_does_not_hold_a_pipeline(models):
+    model = models.build_model("kokoro-v1_0.pth", "cpu", threads=None)
+    assert models.MAX_CONCURRENCY == 1
+    segments = models.stream_speech(
+        model, "One. Two. Three.", "af_bella", prompts=False
+    )
+    next(segments)  # the consumer stops here, holding the generator open
+
+    acquired = []
+
+    def other_request():
+        with models.acquire_pipeline("a", timeout=1.0) as pipeline:
+            acquired.append(pipeline)
+
+    thread = threading.Thread(target=other_request)
+    thread.start()
+    thread.join()
+    assert acquired == [model]
+    assert len(list(segments)) == 2
+
+
+def _run_together(target, count):
+    """Start count threads on target at the same moment and wait for them"""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def run(index):
+        barrier.wait()
+        try:
+            target(index)
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_concurrent_build_model_builds_once(models):
+    from kokoro_stubs import FakeKModel
+
+    built = [None] * 8
+
+    def build(index):
+        built[index] = models.build_model("kokoro-v1_0.pth", "cpu", threads=None)
+
+    _run_together(build, len(built))
+    assert FakeKModel.builds == 1
+    assert all(pipeline is built[0] for pipeline in built)
+
+
+def test_pipeline_pool_never_exceeds_its_size(models):
+    model = models.build_model("kokoro-v1_0.pth", "cpu", threads=None)
+    pool = models.PipelinePool(model, 3)
+    lock = threading.Lock()
+    active = set()
+    peak = [0]
+    seen = set()
+
+    def worker(index):
+        for _ in range(20):
+            with pool.acquire(timeout=5.0) as pipeline:
+                with lock:
+                    assert pipeline not in active, "pipeline checked out twice"
+                    active.add(pipeline)
+                    seen.add(id(pipeline))
+                    peak[0] = max(peak[0], len(active))
+                time.sleep(0.001)
+                with lock:
+                    active.discard(pipeline)
+
+    _run_together(worker, 12)
+    assert peak[0] <= 3
+    assert len(seen) <= 3
+
+
+def test_concurrent_voice_loads_share_one_tensor(models, monkeypatch):
+    model = models.build_model("kokoro-v1_0.pth", "cpu", threads=None)
+    pipeline = models._new_pipeline("a", model.model, {})
+    original_load = models.torch.load
+
+    def slow_load(*args, **kwargs):
+        time.sleep(0.02)  # let every thread miss the cache first
+        return original_load(*args, **kwargs)
+
+    monkeypatch.setattr(models.torch, "load", slow_load)
+    loaded = [None] * 8
+
+    def load(index):
+        loaded[index] = pipeline.load_voice("voices/af_bella.pt")
+
+    _run_together(load, len(loaded))
+    assert all(voice is loaded[0] for voice in loaded)
+    assert pipeline.voices["af_bella"] is loaded[0]
+
+
+def test_cached_voice_skips_the_filesystem(models, monkeypatch):
+    model = models.build_model("kokoro-v1_0.pth", "cpu", threads=None)
+    voice = model.load_voice("voices/af_bella.pt")
+
+    def no_filesystem(path):
+        raise AssertionError(f"filesystem checked for cached voice {path}")
+
+    monkeypatch.setattr(models.os.path, "exists", no_filesystem)
+    assert model.load_voice("voices/af_bella.pt") is voice
+
+
+def test_cancel_stops_waiting_for_a_pipeline(models):
+    from cancellation import CancelToken, Cancelled, DeadlineExceeded
+
+    token = CancelToken()
+    model = models.build_model("kokoro-v1_0.pth", "cpu", threads=None)
+    raised = []
+
+    def waiter():
+        try:
+            with models.acquire_pipeline("a", cancel=token):
+                raised.append(None)
+        except Exception as e:
+            raised.append(e)
+
+    with models.acquire_pipeline("a") as pipeline:
+        assert pipeline is model
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.05)
+        token.cancel("client cancelled")
+        thread.join(timeout=1.0)
+        assert not thread.is_alive()
+    assert len(raised) == 1 and isinstance(raised[0], Cancelled)
+    assert not isinstance(raised[0], DeadlineExceeded)
+
+
+def test_expired_deadline_raises_deadline_exceeded(models):
+    from cancellation import CancelToken, DeadlineExceeded
+
+    model = models.build_model("kokoro-v1_0.pth", "cpu", threads=None)
+    with models.acquire_pipeline("a") as pipeline:
+        assert pipeline is model
+        token = CancelToken(timeout=0.05)
+        start = time.monotonic()
+        try:
+            with models.acquire_pipeline("a", cancel=token):
+                raise AssertionError("the pool has no free pipeline")
+        except DeadlineExceeded:
+            pass
+        assert time.monotonic() - start < 1.0
@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("num2words")
+
+from normalize import normalize_text  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("I paid $5", "I paid five dollars"),
+        ("I paid $1", "I paid one dollar"),
+        ("It cost $1.5 million.", "It cost one point five million dollars."),
+        ("$1.50", "one dollar, fifty cents"),
+        ("¥300", "three hundred yen"),
+        ("pi is 3.10", "pi is three point one zero"),
+        ("version 3.10.2", "version three point ten point two"),
+        ("See www.example.com.", "See www dot example dot com."),
+        ("Up 12.5%", "Up twelve point five percent"),
+        ("-7 degrees", "minus seven degrees"),
+        ("At 9:30 PM", "At nine thirty p m"),
+        ("On 2024-03-15", "On March fifteenth, twenty twenty-four"),
+        ("the 3rd one", "the third one"),
+        # Plain integers and years are left to the G2P
+        ("Born in 1999.", "Born in 1999."),
+        ("There are 1,234 cats", "There are 1,234 cats"),
+        ("Call 555-1234.", "Call five five five, one two three four."),
+        ("Meet at 9:30 am. Then go.", "Meet at nine thirty a m. Then go."),
+        ("At 9:30 a.m. tomorrow", "At nine thirty a m tomorrow"),
+    ],
+)
+def test_normalize_english(text, expected):
+    assert normalize_text(text, "a") == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Il fait -5 degrés.", "Il fait moins cinq degrés."),
+        ("Né en 1999.", "Né en mille neuf cent quatre-vingt-dix-neuf."),
+        ("Il est 9:30 am.", "Il est 9:30 am."),
+        ("Voir www.exemple.fr", "Voir www point exemple point fr"),
+        ("Écrire à a@b.fr", "Écrire à a arobase b point fr"),
+        ("Plus 5%", "Plus cinq pour cent"),
+    ],
+)
+def test_normalize_french(text, expected):
+    assert normalize_text(text, "f") == expected
+
+
+def test_plain_text_is_unchanged():
+    text = "Nothing to expand here."
+    assert normalize_text(text) is text
@@ -0,0 +1,30 @@
+"""ONNX/torch parity, run only where onnxruntime and the weights exist"""
+
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+REQUIRED = ["kokoro.onnx", "kokoro-v1_0.pth", "config.json", "voices/af_bella.pt"]
+missing = [name for name in REQUIRED if not (ROOT / name).exists()]
+
+
+def test_parity_failures_thresholds():
+    onnx_backend = pytest.importorskip("onnx_backend", exc_type=ImportError)
+    stats = {"torch_samples": 48000.0, "onnx_samples": 48600.0, "correlation": 0.995}
+    assert onnx_backend.parity_failures(stats) == []
+    stats.update(onnx_samples=48601.0, correlation=0.98)
+    assert len(onnx_backend.parity_failures(stats)) == 2
+    stats.update(correlation=float("nan"))
+    assert any("correlation" in f for f in onnx_backend.parity_failures(stats))
+
+
+@pytest.mark.skipif(bool(missing), reason=f"missing {', '.join(missing)}")
+def test_onnx_matches_torch(monkeypatch):
+    pytest.importorskip("onnxruntime")
+    onnx_backend = pytest.importorskip("onnx_backend", exc_type=ImportError)
+    monkeypatch.chdir(ROOT)
+    stats = onnx_backend.check_parity(
+        str(ROOT / "kokoro.onnx"), "af_bella", model_path=str(ROOT / "kokoro-v1_0.pth")
+    )
+    assert onnx_backend.parity_failures(stats) == []
@@ -0,0 +1,37 @@
+import os
+
+import output_store
+from output_store import OutputStore
+
+
+def _put(store, text, size):
+    with store.write(text, "af_bella", 1.0, "wav") as tmp_path:
+        with open(tmp_path, "wb") as f:
+            f.write(b"\0" * size)
+    return store.get(text, "af_bella", 1.0, "wav")
+
+
+def test_entry_over_budget_is_kept_after_write(tmp_path):
+    store = OutputStore(tmp_path, max_bytes=100)
+    path = _put(store, "big", 200)
+    assert path is not None and os.path.exists(path)
+    store.close()
+
+
+def test_older_entries_are_evicted_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(output_store, "MIN_AGE", 0.0)
+    store = OutputStore(tmp_path, max_bytes=250)
+    first = _put(store, "first", 200)
+    second = _put(store, "second", 200)
+    assert second is not None and os.path.exists(second)
+    assert store.get("first", "af_bella", 1.0, "wav") is None
+    assert not os.path.exists(first)
+    store.close()
+
+
+def test_recently_used_entries_survive_eviction(tmp_path):
+    store = OutputStore(tmp_path, max_bytes=250)
+    first = _put(store, "first", 200)
+    _put(store, "second", 200)
+    assert store.get("first", "af_bella", 1.0, "wav") == first
+    store.close()
@@ -0,0 +1,97 @@
+"""PlaybackEngine on the null backend: ordering, skip, stop and failures"""
+
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from view.playback import NullOutputStream, PlaybackEngine  # noqa: E402
+
+RATE = 8000
+
+
+class RecordingEngine(PlaybackEngine):
+    """Engine whose null stream keeps every block it pulls"""
+
+    def __init__(self):
+        super().__init__(sample_rate=RATE, backend="null", blocksize=256)
+
+    def _open_stream(self):
+        return NullOutputStream(
+            self.sample_rate, self.channels, self.blocksize, self._callback, record=True
+        )
+
+    def played(self) -> np.ndarray:
+        stream = self._stream
+        blocks = list(stream.blocks) if stream is not None else []
+        return np.concatenate(blocks)[:, 0] if blocks else np.zeros(0, np.float32)
+
+
+@pytest.fixture
+def engine():
+    engine = RecordingEngine()
+    yield engine
+    engine.close()
+
+
+def _clip(value: float, seconds: float) -> np.ndarray:
+    return np.full(int(RATE * seconds), value, dtype=np.float32)
+
+
+def test_clips_play_back_to_back(engine):
+    first = engine.enqueue(_clip(1.0, 0.5), RATE)
+    second = engine.enqueue(_clip(2.0, 0.5), RATE)
+    assert engine.wait(timeout=5)
+    assert first.done.is_set() and second.done.is_set()
+    played = engine.played()
+    start = np.flatnonzero(played)[0]
+    expected = np.concatenate([_clip(1.0, 0.5), _clip(2.0, 0.5)])
+    np.testing.assert_array_equal(played[start:start + len(expected)], expected)
+
+
+def test_skip_moves_on_to_the_next_clip(engine):
+    first = engine.enqueue(_clip(1.0, 3.0), RATE)
+    second = engine.enqueue(_clip(2.0, 0.2), RATE)
+    time.sleep(0.2)
+    engine.skip()
+    assert first.done.is_set()
+    assert engine.wait(timeout=2)
+    assert second.done.is_set()
+    played = engine.played()
+    assert np.count_nonzero(played == 1.0) < len(_clip(1.0, 3.0))
+    assert np.count_nonzero(played == 2.0) == len(_clip(2.0, 0.2))
+
+
+def test_stop_drops_every_queued_clip(engine):
+    clips = [engine.enqueue(_clip(1.0, 2.0), RATE) for _ in range(3)]
+    engine.stop()
+    assert all(clip.done.is_set() for clip in clips)
+    assert not engine.playing
+    assert engine.wait(timeout=0)
+
+
+def test_failed_device_does_not_leave_a_waiting_clip():
+    class BrokenEngine(PlaybackEngine):
+        def _open_stream(self):
+            raise OSError("no output device")
+
+    engine = BrokenEngine(sample_rate=RATE, backend="null")
+    with pytest.raises(OSError):
+        engine.enqueue(_clip(1.0, 0.1), RATE)
+    assert engine.queued == 0
+
+    errors = []
+
+    def play():
+        try:
+            engine.play(_clip(1.0, 0.1), RATE)
+        except OSError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=play)
+    thread.start()
+    thread.join(timeout=2)
+    assert not thread.is_alive(), "play() hung after the device failed to open"
+    assert len(errors) == 1
@@ -0,0 +1,44 @@
+"""Scheduler segmentation against stubbed Kokoro classes"""
+
+from limits import max_chars
+
+
+def test_long_paragraph_is_split_into_chunks(models):
+    from scheduler import Job
+
+    sentence = "This sentence is part of one very long paragraph. "
+    job = Job(sentence * 40, "af_bella", 1.0, priority=1, tenant="batch")
+    assert len(job.segments) > 1
+    assert all(len(segment) <= max_chars() for segment in job.segments)
+    assert all(segment.endswith(".") for segment in job.segments)
+    assert "".join(job.segments).replace(" ", "") == (sentence * 40).replace(" ", "")
+
+
+def test_scheduler_runs_jobs_on_a_backend(models):
+    from daemon import StubBackend
+    from scheduler import Scheduler
+
+    backend = StubBackend(seconds_per_char=0.0)
+    scheduler = Scheduler(None, backend.device, workers=2, backend=backend)
+    try:
+        audio = scheduler.submit("First paragraph.\nSecond one.", "af_bella").result(5)
+    finally:
+        scheduler.shutdown()
+    expected = [
+        clip
+        for paragraph in ("First paragraph.", "Second one.")
+        for clip in backend.stream(paragraph, "af_bella")
+    ]
+    assert len(audio) == sum(len(clip) for clip in expected)
+
+
+def test_default_workers_follow_set_max_concurrency(models):
+    from daemon import StubBackend
+    from scheduler import Scheduler
+
+    models.set_max_concurrency(3)
+    scheduler = Scheduler(None, "stub", backend=StubBackend(seconds_per_char=0.0))
+    try:
+        assert len(scheduler._workers) == 3
+    finally:
+        scheduler.shutdown()
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from cancellation import CancelToken, Cancelled
+from singleflight import SingleFlight
+
+
+def _slow_job(started, cancel=None):
+    started.set()
+    for _ in range(50):
+        if cancel.cancelled:
+            return "cancelled"
+        time.sleep(0.01)
+    return "done"
+
+
+def _attach(flight, key, fn, token, results, name):
+    try:
+        results[name] = flight.do(key, fn, cancel=token)
+    except Cancelled:
+        results[name] = None
+
+
+def test_leader_cancel_does_not_cancel_followers():
+    flight = SingleFlight()
+    started = threading.Event()
+    leader, follower = CancelToken(), CancelToken()
+    results = {}
+    job = lambda cancel: _slow_job(started, cancel)  # noqa: E731
+    threads = [
+        threading.Thread(target=_attach, args=(flight, "k", job, t, results, name))
+        for name, t in (("leader", leader), ("follower", follower))
+    ]
+    threads[0].start()
+    started.wait()
+    threads[1].start()
+    time.sleep(0.05)
+    leader.cancel("client cancelled")
+    for thread in threads:
+        thread.join()
+    assert results == {"leader": None, "follower": "done"}
+    assert flight.stats()["executed"] == 1
+
+
+def test_job_is_cancelled_once_every_caller_cancels():
+    flight = SingleFlight()
+    started = threading.Event()
+    seen = []
+
+    def job(cancel=None):
+        seen.append(cancel)
+        return _slow_job(started, cancel)
+
+    tokens = [CancelToken(), CancelToken(timeout=0.1)]
+    results = {}
+    threads = [
+        threading.Thread(target=_attach, args=(flight, "k", job, t, results, i))
+        for i, t in enumerate(tokens)
+    ]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    tokens[0].cancel()
+    for thread in threads:
+        thread.join()
+    assert results == {0: None, 1: None}
+    deadline = time.monotonic() + 1
+    while not seen[0].cancelled and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert seen[0].cancelled
+
+
+def test_error_reaches_every_caller():
+    flight = SingleFlight()
+
+    def job(cancel=None):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", job, cancel=CancelToken())
@@ -0,0 +1,106 @@
+"""WSOLA time-stretching for Kokoro TTS Local
+
+Derives other speech speeds from audio already synthesized at speed 1.0, so
+speed variants of cached text cost a few milliseconds instead of a full
+inference. Each frame's similarity search scores every candidate offset in
+a single matrix-vector product, and overlap-add is done with two reshaped
+adds, so the only Python loop is one short iteration per 20 ms frame.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SAMPLE_RATE = 24000
+
+# Beyond this ratio WSOLA artifacts become audible; synthesize instead
+MAX_STRETCH = 1.3
+
+
+def can_stretch(rate: float, max_stretch: float = MAX_STRETCH) -> bool:
+    """Return True if a speed ratio is within the stretch quality threshold"""
+    return 1.0 / max_stretch <= rate <= max_stretch
+
+
+def time_stretch(
+    audio: np.ndarray,
+    rate: float,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: float = 40.0,
+    search_ms: float = 8.0,
+) -> np.ndarray:
+    """Change the duration of audio by 1/rate without changing its pitch
+
+    Args:
+        audio: Mono float audio
+        rate: Speed factor (>1 is faster and shorter)
+        sample_rate: Sample rate of the audio
+        frame_ms: Analysis frame length
+        search_ms: Maximum shift searched around each nominal frame position
+    """
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    if rate == 1.0 or len(audio) == 0:
+        return audio.copy()
+
+    frame = 2 * max(1, int(sample_rate * frame_ms / 2000))
+    hop = frame // 2
+    search = max(1, int(sample_rate * search_ms / 1000))
+    n_out = int(round(len(audio) / rate))
+    n_frames = -(-n_out // hop) + 1
+
+    # Nominal analysis positions, padded so every window stays in range
+    nominal = np.round(np.arange(n_frames) * hop * rate).astype(np.int64)
+    right = int(nominal[-1]) + frame + 2 * search + hop - len(audio)
+    padded = np.pad(audio, (search, max(0, right) + frame))
+    windows = sliding_window_view(padded, frame)
+
+    # Window energies for all offsets at once, used to normalize the search
+    squares = np.square(padded, dtype=np.float64)
+    cumulative = np.concatenate([[0.0], np.cumsum(squares)])
+    norms = np.sqrt(cumulative[frame:] - cumulative[:-frame] + 1e-9)
+
+    # Frame i is the window within nominal[i] +/- search that best continues
+    # frame i-1; all candidates are scored with one matrix-vector product
+    positions = np.empty(n_frames, dtype=np.int64)
+    positions[0] = search
+    for i in range(1, n_frames):
+        template = windows[positions[i - 1] + hop]
+        start, end = nominal[i], nominal[i] + 2 * search + 1
+        scores = windows[start:end] @ template
+        positions[i] = start + np.argmax(scores / norms[start:end])
+
+    # Overlap-add Hann-windowed frames at 50% overlap: even and odd frames
+    # each tile the output without overlapping, so two reshaped adds suffice
+    window = np.hanning(frame + 1)[:-1].astype(np.float32)
+    frames = windows[positions] * window
+    out = np.zeros((n_frames + 2) * hop, dtype=np.float32)
+    even, odd = frames[0::2].reshape(-1), frames[1::2].reshape(-1)
+    out[: len(even)] += even
+    out[hop : hop + len(odd)] += odd
+    return out[:n_out]
+
+
+class StretchCache:
+    """Small LRU cache of base-speed audio used as stretch sources"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: object):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
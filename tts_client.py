@@ -0,0 +1,159 @@
+"""Thin command-line client for the Kokoro TTS daemon
+
+Sends one request over the daemon's Unix domain socket and streams the
+audio back, so a one-shot synthesis skips torch import and model loading.
+Only the standard library is imported.
+
+Usage:
+    python daemon.py &                        # start the daemon once
+    python tts_client.py "Hello there." --voice af_bella --output hello.wav
+    python tts_client.py "Hello." --output - | aplay -f S16_LE -r 24000
+
+Protocol (shared with daemon.py): the client sends one JSON line; the
+daemon answers with one JSON header line, then audio frames, each a uint32
+byte length followed by the samples. A zero length ends the stream and is
+followed by a JSON line of server timings (queue and compute seconds); a
+length of ERROR_FRAME is followed by a JSON line describing the error.
+"""
+
+import argparse
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+import time
+import wave
+from typing import Iterator, Optional
+
+DEFAULT_SOCKET = os.environ.get(
+    "KOKORO_SOCKET",
+    os.path.join(tempfile.gettempdir(), f"kokoro-tts-{os.getuid()}.sock")
+    if hasattr(os, "getuid")
+    else os.path.join(tempfile.gettempdir(), "kokoro-tts.sock"),
+)
+FRAME = struct.Struct("<I")
+ERROR_FRAME = 0xFFFFFFFF
+MAX_REQUEST = 1 << 20
+
+
+class DaemonError(Exception):
+    """Raised when the daemon reports an error or cannot be reached"""
+
+
+def _read_exact(stream, n: int) -> bytes:
+    data = stream.read(n)
+    if len(data) != n:
+        raise DaemonError("Connection closed by daemon")
+    return data
+
+
+def read_frames(stream) -> Iterator[bytes]:
+    """Yield audio frames until the end marker, raising on error frames"""
+    while True:
+        (length,) = FRAME.unpack(_read_exact(stream, FRAME.size))
+        if length == 0:
+            return
+        if length == ERROR_FRAME:
+            error = json.loads(stream.readline(MAX_REQUEST) or b"{}")
+            raise DaemonError(error.get("error", "Unknown daemon error"))
+        yield _read_exact(stream, length)
+
+
+def write_frame(stream, payload: bytes):
+    stream.write(FRAME.pack(len(payload)))
+    stream.write(payload)
+
+
+def request(message: dict, socket_path: str = DEFAULT_SOCKET, timeout=None):
+    """Send a request and return (header, file object positioned at frames)"""
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonError("Unix domain sockets are not available on this platform")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError as e:
+        sock.close()
+        raise DaemonError(f"Cannot reach daemon at {socket_path}: {e}")
+    stream = sock.makefile("rwb")
+    sock.close()  # the file object keeps the connection open
+    stream.write(json.dumps(message).encode("utf-8") + b"\n")
+    stream.flush()
+    header = json.loads(stream.readline(MAX_REQUEST) or b"{}")
+    if not header.get("ok"):
+        stream.close()
+        raise DaemonError(header.get("error", "Daemon closed the connection"))
+    return header, stream
+
+
+def synthesize(
+    text: str,
+    voice: Optional[str] = None,
+    speed: float = 1.0,
+    encoding: str = "pcm16",
+    socket_path: str = DEFAULT_SOCKET,
+):
+    """Yield (sample_rate, frame bytes) for each synthesized segment"""
+    message = {"cmd": "synthesize", "text": text, "speed": speed, "encoding": encoding}
+    if voice:
+        message["voice"] = voice
+    header, stream = request(message, socket_path)
+    with stream:
+        for frame in read_frames(stream):
+            yield header["sample_rate"], frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kokoro TTS daemon client")
+    parser.add_argument("text", nargs="?", help="Text to speak (default: stdin)")
+    parser.add_argument("--voice", default=None)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument(
+        "--output", default="output.wav", help="WAV file, or - for raw PCM on stdout"
+    )
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--ping", action="store_true", help="Check the daemon")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        if args.ping:
+            header, stream = request({"cmd": "ping"}, args.socket, timeout=5)
+            stream.close()
+            print(json.dumps(header))
+            return 0
+
+        text = args.text if args.text is not None else sys.stdin.read()
+        chunks = synthesize(text, args.voice, args.speed, "pcm16", args.socket)
+        if args.output == "-":
+            out = sys.stdout.buffer
+            for _, frame in chunks:
+                out.write(frame)
+                out.flush()
+        else:
+            wav = None
+            try:
+                for rate, frame in chunks:
+                    if wav is None:
+                        wav = wave.open(args.output, "wb")
+                        wav.setnchannels(1)
+                        wav.setsampwidth(2)
+                        wav.setframerate(rate)
+                    wav.writeframes(frame)
+            finally:
+                if wav is not None:
+                    wav.close()
+            if wav is None:
+                print("No audio generated", file=sys.stderr)
+                return 1
+            print(f"Audio path: {args.output} ({time.perf_counter() - start:.2f}s)")
+    except DaemonError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
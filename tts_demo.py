@@ -3,7 +3,12 @@ try:
     import torch
     from typing import List
     from typing import cast
-    from models import build_model, generate_speech, list_available_voices
+    from capture import capture_output
+    from models import (
+        build_model,
+        list_available_voices,
+        stream_speech,
+    )
     from tqdm.auto import tqdm
     from numbers import Number
     from pathlib import Path
@@ -11,8 +16,6 @@ try:
     import soundfile as sf
     import numpy as np
     import time
-    import sys
-    import os
 except ImportError as e:
     print(f"Error importing modules: {e}")
     print(
@@ -148,13 +151,8 @@ def main(debug: bool = False) -> None:
 
         # Build model
         print("\nInitializing model...", end="")
-        if not debug:
-            sys.stdout = open(os.devnull, "w")
-            sys.stderr = open(os.devnull, "w")
-        model = build_model(DEFAULT_MODEL_PATH, device)
-        if not debug:
-            sys.stdout = sys.__stdout__
-            sys.stderr = sys.__stderr__
+        with capture_output(enabled=not debug):
+            model = build_model(DEFAULT_MODEL_PATH, device)
         if not model:
             print("ERROR: Failed to initialize model")
             raise (KeyboardInterrupt)
@@ -197,21 +195,16 @@ def main(debug: bool = False) -> None:
                 print(f"Using voice: {voice}")
                 print(f"Speed: {speed}x")
 
-                # Generate speech
+                # Generate speech through the shared path: normalization,
+                # chunk limits, the pipeline pool and the memory guard
                 all_audio = []
-                generator = model(
-                    text, voice=f"voices/{voice}.pt", speed=speed, split_pattern=r"\n+"
-                )
-
+                gs = ps = ""
                 with tqdm(desc="Generating speech") as pbar:
-                    for gs, ps, audio in generator:
-                        if audio is not None:
-                            if isinstance(audio, np.ndarray):
-                                audio = torch.from_numpy(audio).float()
-                            all_audio.append(audio)
-                            pbar.update(1)
-
-                all_audio, ps, gs = generate_speech(model, text, voice, device, speed)
+                    for gs, ps, audio in stream_speech(
+                        model, text, voice, device, speed
+                    ):
+                        all_audio.append(audio)
+                        pbar.update(1)
 
                 print(f"\nGenerated segment: {gs}")
                 print(f"Phonemes: {ps}")
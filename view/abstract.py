@@ -3,12 +3,40 @@ from typing import Dict, Tuple
 from pathlib import Path
 import numpy as np
 from torch import Tensor
+from view.playback import PlaybackEngine, get_engine
 
 
 class AbstractView(ABC):
     def set_voices(self, voices: list):
         self.voices = voices
 
+    @property
+    def playback(self) -> PlaybackEngine:
+        """
+        Playback engine shared by every view, with one open output stream.
+        """
+        if getattr(self, "_playback", None) is None:
+            self._playback = get_engine()
+        return self._playback
+
+    def queue_audio(self, audio: np.ndarray, sample_rate: int):
+        """
+        Queue audio to play after anything already playing, without blocking.
+        """
+        return self.playback.enqueue(audio, sample_rate)
+
+    def skip_audio(self):
+        """
+        Skip the clip that is playing.
+        """
+        self.playback.skip()
+
+    def stop_audio(self):
+        """
+        Stop playback and clear the queue.
+        """
+        self.playback.stop()
+
     @abstractmethod
     def get_params(self, voice: str, speed: float, text: str) -> Tuple:
         """
@@ -4,7 +4,6 @@ from prompt_toolkit.shortcuts import confirm
 from pathlib import Path
 import numpy as np
 import soundfile as sf
-import sounddevice as sd
 from view.abstract import AbstractView
 
 
@@ -52,8 +51,7 @@ class CLIView(AbstractView):
 
     def play_audio(self, audio: np.ndarray, sample_rate: int):
         try:
-            sd.play(audio, sample_rate, blocksize=2048)
-            sd.wait()
+            self.playback.play(audio, sample_rate)
             print("")
         except Exception as e:
             print(f"Error playing audio: {e}")
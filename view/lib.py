@@ -1,7 +1,6 @@
 from pathlib import Path
 import numpy as np
 import soundfile as sf
-import sounddevice as sd
 from typing import Dict
 from view.abstract import AbstractView
 
@@ -28,13 +27,12 @@ class NoView(AbstractView):
 
     def prompt_play_audio(self) -> bool:
         """Always returns False since this is a library class."""
-        return True
+        return False
 
     def play_audio(self, audio: np.ndarray, sample_rate: int):
         """Plays audio without user confirmation."""
         try:
-            sd.play(audio, sample_rate, blocksize=2048)
-            sd.wait()
+            self.playback.play(audio, sample_rate)
         except Exception as e:
             raise RuntimeError(f"Error playing audio: {e}")
 
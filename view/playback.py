@@ -0,0 +1,283 @@
+"""Persistent audio playback for Kokoro TTS Local views
+
+sd.play opens and closes the output device for every clip, which costs
+tens of milliseconds and leaves audible gaps between consecutive clips. The
+engine here keeps one output stream open for the life of the process and
+feeds it from a queue of clips from its callback, so clips play back to
+back without gaps. Control calls (enqueue, skip, stop) never block.
+
+Backends:
+    "sounddevice"  a long-lived sd.OutputStream (default)
+    "null"         a thread that consumes audio in real time without a
+                   device, for tests and headless machines
+Set KOKORO_AUDIO_BACKEND to choose the backend of the shared engine.
+
+Example:
+    engine = get_engine()
+    engine.enqueue(first, 24000)
+    engine.enqueue(second, 24000)  # starts on the sample after `first` ends
+    engine.wait()
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+import numpy as np
+
+from postprocess import resample
+
+SAMPLE_RATE = 24000
+BLOCKSIZE = 2048
+DEFAULT_BACKEND = os.environ.get("KOKORO_AUDIO_BACKEND", "sounddevice")
+
+
+class Clip:
+    """Handle for one queued clip"""
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+        self.position = 0
+        self.done = threading.Event()
+
+    @property
+    def remaining(self) -> int:
+        return len(self.data) - self.position
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the clip has played, been skipped or stopped"""
+        return self.done.wait(timeout)
+
+
+class NullOutputStream:
+    """Stand-in for sd.OutputStream that pulls audio without a device
+
+    Args:
+        realtime: Pace callbacks at the sample rate; False pulls as fast as
+            possible
+        record: Keep every block pulled, in `blocks`
+    """
+
+    def __init__(
+        self,
+        samplerate: int,
+        channels: int,
+        blocksize: int,
+        callback,
+        realtime: bool = True,
+        record: bool = False,
+    ):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.callback = callback
+        self.realtime = realtime
+        self.record = record
+        self.blocks: List[np.ndarray] = []
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> bool:
+        return self._running.is_set()
+
+    def _run(self):
+        period = self.blocksize / self.samplerate
+        deadline = time.monotonic()
+        while self._running.is_set():
+            block = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+            self.callback(block, self.blocksize, None, None)
+            if self.record:
+                self.blocks.append(block)
+            if self.realtime:
+                deadline += period
+                time.sleep(max(0.0, deadline - time.monotonic()))
+
+    def start(self):
+        if self.active:
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def close(self):
+        self.stop()
+
+
+class PlaybackEngine:
+    """Gapless clip queue played through one long-lived output stream
+
+    Args:
+        sample_rate: Rate of the output stream; other clips are resampled
+        channels: Channels of the output stream; clips are mixed to match
+        backend: "sounddevice" or "null"
+        blocksize: Frames per stream callback
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        channels: int = 1,
+        backend: str = DEFAULT_BACKEND,
+        blocksize: int = BLOCKSIZE,
+    ):
+        if backend not in ("sounddevice", "null"):
+            raise ValueError(f"Unknown playback backend: {backend}")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.backend = backend
+        self.blocksize = blocksize
+        self._queue: Deque[Clip] = deque()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._stream = None
+        self._stream_lock = threading.Lock()
+
+    def _open_stream(self):
+        if self.backend == "null":
+            return NullOutputStream(
+                self.sample_rate, self.channels, self.blocksize, self._callback
+            )
+        import sounddevice as sd
+
+        return sd.OutputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            blocksize=self.blocksize,
+            dtype="float32",
+            callback=self._callback,
+        )
+
+    def _ensure_stream(self):
+        with self._stream_lock:
+            if self._stream is None:
+                self._stream = self._open_stream()
+            if not self._stream.active:
+                self._stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        """Fill the device buffer from the queue, then pad with silence"""
+        if status:
+            logging.debug(f"Playback status: {status}")
+        filled = 0
+        with self._lock:
+            while filled < frames and self._queue:
+                clip = self._queue[0]
+                n = min(frames - filled, clip.remaining)
+                outdata[filled:filled + n] = clip.data[clip.position:clip.position + n]
+                clip.position += n
+                filled += n
+                if clip.remaining == 0:
+                    self._queue.popleft()
+                    clip.done.set()
+            if not self._queue:
+                self._idle.notify_all()
+        outdata[filled:] = 0
+
+    def _prepare(self, audio, sample_rate: int) -> np.ndarray:
+        """Convert audio to float32 frames at the stream's rate and channels"""
+        data = np.asarray(audio, dtype=np.float32)
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        elif data.shape[0] < data.shape[1]:
+            data = data.T
+        if data.shape[1] != self.channels:
+            data = np.repeat(data.mean(axis=1, keepdims=True), self.channels, axis=1)
+        if sample_rate != self.sample_rate:
+            rate = self.sample_rate
+            data = np.stack([resample(c, sample_rate, rate) for c in data.T], axis=1)
+        return np.ascontiguousarray(data)
+
+    def enqueue(self, audio, sample_rate: int = SAMPLE_RATE) -> Clip:
+        """Queue a clip to start right after the ones before it"""
+        clip = Clip(self._prepare(audio, sample_rate))
+        with self._lock:
+            if len(clip.data):
+                self._queue.append(clip)
+            else:
+                clip.done.set()
+        if not clip.done.is_set():
+            try:
+                self._ensure_stream()
+            except BaseException:
+                # No device: withdraw the clip so nobody waits on it forever
+                with self._lock:
+                    if clip in self._queue:
+                        self._queue.remove(clip)
+                    if not self._queue:
+                        self._idle.notify_all()
+                clip.done.set()
+                raise
+        return clip
+
+    def play(self, audio, sample_rate: int = SAMPLE_RATE):
+        """Queue a clip and block until it has played"""
+        clip = self.enqueue(audio, sample_rate)
+        try:
+            clip.wait()
+        except KeyboardInterrupt:
+            self.stop()
+            raise
+
+    def skip(self):
+        """Drop the clip that is playing; the next one starts at once"""
+        with self._lock:
+            if self._queue:
+                self._queue.popleft().done.set()
+            if not self._queue:
+                self._idle.notify_all()
+
+    def stop(self):
+        """Drop every queued clip"""
+        with self._lock:
+            while self._queue:
+                self._queue.popleft().done.set()
+            self._idle.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the queue is empty; False if the timeout passed first"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._queue, timeout)
+
+    @property
+    def playing(self) -> bool:
+        with self._lock:
+            return bool(self._queue)
+
+    @property
+    def queued(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def close(self):
+        """Stop playback and release the output device"""
+        self.stop()
+        with self._stream_lock:
+            if self._stream is not None:
+                self._stream.stop()
+                self._stream.close()
+                self._stream = None
+
+
+_engine: Optional[PlaybackEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> PlaybackEngine:
+    """Return the process-wide engine, creating it on first use"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PlaybackEngine()
+            atexit.register(_engine.close)
+        return _engine
@@ -0,0 +1,150 @@
+"""Voice registry for Kokoro TTS Local
+
+Scans the voices directory once and keeps an in-memory index of the voice
+files, so request paths can validate a voice and look up its metadata with
+a dictionary lookup instead of filesystem calls. A background thread polls
+the directory's modification time and rescans only when it changes.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+VOICES_DIR = "voices"
+POLL_INTERVAL = 2.0
+
+# Language and gender implied by the two-letter voice name prefix
+LANGUAGES = {
+    "a": "American English",
+    "b": "British English",
+    "e": "Spanish",
+    "f": "French",
+    "h": "Hindi",
+    "i": "Italian",
+    "j": "Japanese",
+    "p": "Brazilian Portuguese",
+    "z": "Mandarin Chinese",
+}
+GENDERS = {"f": "female", "m": "male"}
+
+
+class VoiceInfo(NamedTuple):
+    name: str
+    path: str
+    lang_code: str
+    language: str
+    gender: str
+    size: int
+
+
+def _voice_info(entry: os.DirEntry) -> VoiceInfo:
+    name = entry.name[: -len(".pt")]
+    lang_code = name[:1].lower()
+    return VoiceInfo(
+        name=name,
+        path=entry.path,
+        lang_code=lang_code,
+        language=LANGUAGES.get(lang_code, "Unknown"),
+        gender=GENDERS.get(name[1:2].lower(), "unknown"),
+        size=entry.stat().st_size,
+    )
+
+
+class VoiceRegistry:
+    """In-memory index of the voice files in a directory"""
+
+    def __init__(
+        self, directory: str = VOICES_DIR, poll_interval: float = POLL_INTERVAL
+    ):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._voices: Dict[str, VoiceInfo] = {}
+        self._mtime_ns: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rescan the directory if it changed, returning True if it was rescanned"""
+        with self._lock:
+            try:
+                mtime_ns = os.stat(self.directory).st_mtime_ns
+            except FileNotFoundError:
+                logging.debug(
+                    f"Creating voices directory at {Path(self.directory).absolute()}"
+                )
+                os.makedirs(self.directory, exist_ok=True)
+                mtime_ns = os.stat(self.directory).st_mtime_ns
+            if not force and mtime_ns == self._mtime_ns:
+                return False
+
+            voices = {}
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".pt") and entry.is_file():
+                        info = _voice_info(entry)
+                        voices[info.name] = info
+
+            added = voices.keys() - self._voices.keys()
+            removed = self._voices.keys() - voices.keys()
+            if added or removed:
+                logging.debug(
+                    f"Voice registry updated: +{sorted(added)} -{sorted(removed)}"
+                )
+            # Swap in a new dict so readers never see a partially built index
+            self._voices = voices
+            self._mtime_ns = mtime_ns
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.debug(f"Warning: Failed to refresh voice registry: {e}")
+
+    def start_watching(self):
+        """Start polling the directory for changes in a daemon thread"""
+        if self._watcher is None or not self._watcher.is_alive():
+            self._stop.clear()
+            self._watcher = threading.Thread(
+                target=self._watch, name="voice-registry", daemon=True
+            )
+            self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._voices
+
+    def __len__(self) -> int:
+        return len(self._voices)
+
+    def get(self, name: str) -> Optional[VoiceInfo]:
+        return self._voices.get(name)
+
+    def names(self) -> List[str]:
+        return sorted(self._voices)
+
+
+_registry: Optional[VoiceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_voice_registry() -> VoiceRegistry:
+    """Return the process-wide registry, creating and starting it on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = VoiceRegistry()
+                registry.start_watching()
+                _registry = registry
+    return _registry